@@ -2,15 +2,41 @@
 from airflow.models import BaseOperator
 from airflow.utils.decorators import apply_defaults
 from airflow.exceptions import AirflowException
-from typing import Dict, List, Any, Optional
-import json
+from typing import Dict, List, Any, Iterable, Iterator, Optional
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
+import functools
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Offres écrites par bloc dans l'export CSV (mémoire bornée en mode streaming)
+CSV_CHUNK_ROWS = 10000
+
+
+def _run_registry(context, config):
+    """Registre des artefacts du run (voir scripts/data_processors/registry.py)"""
+    from scripts.data_processors.registry import DatasetRegistry
+    return DatasetRegistry(config.RUNS_DIR, context['run_id'])
+
+
+def _measured(stage_name: str, records=None):
+    """Mesure `execute` comme une étape du run (mêmes mesures que les tâches du DAG)"""
+    def decorator(execute):
+        @functools.wraps(execute)
+        def wrapper(self, context):
+            from scripts.pipeline.common import task_stage
+            with task_stage(context, stage_name, getattr(self, 'source', None)) as metrics:
+                result = execute(self, context)
+                if records is not None:
+                    metrics.records = records(result)
+                elif isinstance(result, int):
+                    metrics.records = result
+            return result
+        return wrapper
+    return decorator
+
 # ============================================
 # OPÉRATEURS D'EXTRACTION
 # ============================================
@@ -19,19 +45,23 @@ class DataExtractionOperator(BaseOperator):
     """Opérateur pour l'extraction des données par source"""
     
     @apply_defaults
-    def __init__(self, source: str, *args, **kwargs):
+    def __init__(self, source: str, transform_workers: Optional[int] = None,
+                 chunk_size: Optional[int] = None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.source = source
+        self.transform_workers = transform_workers
+        self.chunk_size = chunk_size
         
+    @_measured('extract')
     def execute(self, context):
         self.log.info(f"📥 Extraction des données {self.source.upper()}")
         
         try:
             # Importer dynamiquement pour éviter les problèmes de circular imports
-            from config.pipeline_config import PipelineConfig
+            from config.pipeline_config import get_config
             
-            # Configuration
-            config = PipelineConfig()
+            # Configuration partagée du processus
+            config = get_config()
             
             # Détection des fichiers
             source_files = self._detect_source_files(config, self.source)
@@ -44,35 +74,56 @@ class DataExtractionOperator(BaseOperator):
             if not extractor:
                 raise AirflowException(f"Extracteur non trouvé pour {self.source}")
             
-            all_data = []
+            from scripts.data_processors.parallel import transform_records
+            from scripts.data_processors.memo import log_cache_stats, reset_cache_stats
+            from scripts.data_processors.manifest import FileManifest
+            from scripts.data_processors.instrumentation import record_read
             
-            for file_path in source_files:
-                self.log.info(f"Traitement de {file_path.name}")
-                data = extractor.extract(file_path)
-                all_data.extend(data)
+            reset_cache_stats()
             
-            # Transformation des données
+            workers = self.transform_workers or config.TRANSFORM_WORKERS
+            chunk_size = self.chunk_size or config.TRANSFORM_CHUNK_SIZE
+            
+            # Sorties transformées en cache par fichier brut (fichiers inchangés réutilisés)
+            manifest = FileManifest(config.CACHE_DIR / "operator" / self.source,
+                                    f"{type(extractor).__name__}.transform")
+            
+            # Lecture en flux et transformation par blocs (parallèle si workers > 1)
             transformed_data = []
-            for item in all_data:
-                try:
-                    transformed = extractor.transform(item)
-                    if transformed:
-                        transformed_data.append(transformed)
-                except Exception as e:
-                    self.log.warning(f"Erreur transformation produit {self.source}: {e}")
+            
+            for file_path in source_files:
+                cached = manifest.load_cached(file_path)
+                if cached is not None:
+                    self.log.info(f"♻️ {file_path.name} inchangé, {len(cached)} produits en cache")
+                    transformed_data.extend(cached)
                     continue
+                
+                self.log.info(f"Traitement de {file_path.name}")
+                record_read(file_path.stat().st_size)
+                file_products = []
+                records = extractor.iter_json_file(file_path)
+                for transformed in transform_records(records, extractor.transform, workers, chunk_size):
+                    if transformed:
+                        file_products.append(transformed)
+                
+                manifest.record(file_path, file_products)
+                transformed_data.extend(file_products)
             
-            # Sauvegarde temporaire
-            output_path = config.PROCESSED_DATA_DIR / f"{self.source}_transformed.json"
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(transformed_data, f, ensure_ascii=False, indent=2)
+            manifest.prune(source_files)
+            manifest.save()
+            self.log.info(f"🗂️ {self.source.upper()}: {manifest.summary()}")
+            
+            # Sauvegarde dans le registre du run
+            dataset = f"{self.source}_transformed"
+            _run_registry(context, config).save_dataset(dataset, transformed_data, config.OUTPUT_FORMAT)
             
             self.log.info(f"✅ {self.source.upper()}: {len(transformed_data)} produits transformés")
+            log_cache_stats(self.log)
             
-            # Passage des données aux tâches suivantes
+            # Passage du nom de l'artefact aux tâches suivantes
             context['task_instance'].xcom_push(
-                key=f'{self.source}_data_path',
-                value=str(output_path)
+                key=f'{self.source}_dataset',
+                value=dataset
             )
             
             return len(transformed_data)
@@ -90,11 +141,10 @@ class DataExtractionOperator(BaseOperator):
             self.log.warning(f"📁 Dossier {config.RAW_DATA_DIR} n'existe pas")
             return files
         
-        for file_path in config.RAW_DATA_DIR.glob("*"):
-            if file_path.is_file():
-                filename_lower = file_path.name.lower()
-                if any(pattern in filename_lower for pattern in patterns):
-                    files.append(file_path)
+        for file_path in config.raw_files():
+            filename_lower = file_path.name.lower()
+            if any(pattern in filename_lower for pattern in patterns):
+                files.append(file_path)
         
         self.log.info(f"📁 {len(files)} fichier(s) trouvé(s) pour {source}")
         return files
@@ -123,30 +173,42 @@ class DataMergingOperator(BaseOperator):
     """Opérateur pour la fusion et déduplication des données"""
     
     @apply_defaults
-    def __init__(self, *args, **kwargs):
+    def __init__(self, incremental: Optional[bool] = None, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.incremental = incremental
         
+    @_measured('merge')
     def execute(self, context):
         self.log.info("🔄 Fusion et déduplication des données")
         
         try:
-            from config.pipeline_config import PipelineConfig
-            config = PipelineConfig()
+            from config.pipeline_config import get_config
+            from scripts.data_processors.columnar import load_dataset
+            config = get_config()
+            registry = _run_registry(context, config)
             
-            # Récupération des données de toutes les sources
-            all_products = []
             sources = ['jumia', 'avito', 'electroplanet']
-            
+            data_paths = {}
             for source in sources:
-                data_path = context['task_instance'].xcom_pull(
+                dataset = context['task_instance'].xcom_pull(
                     task_ids=f'extract_{source}_data',
-                    key=f'{source}_data_path'
+                    key=f'{source}_dataset'
                 )
+                data_paths[source] = registry.path(dataset) if dataset else None
+            
+            incremental = self.incremental if self.incremental is not None else config.MERGE_MODE == 'incremental'
+            if incremental:
+                return self._execute_incremental(context, config, registry, sources, data_paths)
+            
+            # Récupération des données de toutes les sources
+            all_products = []
+            
+            for source in sources:
+                data_path = data_paths[source]
                 
-                if data_path and Path(data_path).exists():
-                    with open(data_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        all_products.extend(data)
+                if data_path is not None:
+                    data = load_dataset(data_path)
+                    all_products.extend(data)
                     self.log.info(f"📁 {source}: {len(data)} produits chargés")
                 else:
                     self.log.warning(f"⚠️ Fichier {source} non trouvé ou vide")
@@ -162,15 +224,13 @@ class DataMergingOperator(BaseOperator):
             final_products = self._remove_duplicates(merged_products)
             
             # Sauvegarde finale
-            output_path = config.PROCESSED_DATA_DIR / "marketeye_final.json"
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(final_products, f, ensure_ascii=False, indent=2)
+            registry.save_dataset('marketeye_final', final_products, config.OUTPUT_FORMAT)
             
             self.log.info(f"✅ Fusion terminée: {len(final_products)} produits uniques")
             
             context['task_instance'].xcom_push(
-                key='final_data_path',
-                value=str(output_path)
+                key='final_dataset',
+                value='marketeye_final'
             )
             
             return len(final_products)
@@ -179,6 +239,29 @@ class DataMergingOperator(BaseOperator):
             self.log.error(f"❌ Erreur fusion: {e}")
             raise AirflowException(f"Fusion échouée: {e}")
     
+    def _execute_incremental(self, context, config, registry, sources: List[str],
+                             data_paths: Dict[str, Optional[Path]]) -> int:
+        """Fusion incrémentale: seuls les produits des sources modifiées sont refusionnés"""
+        from scripts.data_processors.incremental_merge import IncrementalMerger
+        
+        merger = IncrementalMerger(
+            config.MERGE_STATE_DIR, sources,
+            merge_fn=lambda products: self._remove_duplicates(self._merge_products(products))
+        )
+        final_products, _ = merger.merge(data_paths)
+        
+        # Catalogue propre au run, même si aucune source n'a changé
+        registry.save_dataset('marketeye_final', final_products, config.OUTPUT_FORMAT)
+        
+        self.log.info(f"✅ Fusion terminée: {len(final_products)} produits uniques")
+        
+        context['task_instance'].xcom_push(
+            key='final_dataset',
+            value='marketeye_final'
+        )
+        
+        return len(final_products)
+    
     def _merge_products(self, products: List[Dict]) -> List[Dict]:
         """Fusionne les produits identiques"""
         merged_dict = {}
@@ -242,118 +325,95 @@ class StatisticsOperator(BaseOperator):
     """Opérateur pour le calcul des statistiques"""
     
     @apply_defaults
-    def __init__(self, *args, **kwargs):
+    def __init__(self, streaming: Optional[bool] = None, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # None: suit config.STATS_MODE
+        self.streaming = streaming
         
+    @_measured('statistics', records=lambda summary: summary['total_offers'])
     def execute(self, context):
         self.log.info("📊 Calcul des statistiques")
         
         try:
-            from config.pipeline_config import PipelineConfig
-            config = PipelineConfig()
+            from config.pipeline_config import get_config
+            config = get_config()
+            registry = _run_registry(context, config)
             
-            data_path = context['task_instance'].xcom_pull(
+            dataset = context['task_instance'].xcom_pull(
                 task_ids='merge_data',
-                key='final_data_path'
+                key='final_dataset'
             )
             
-            if not data_path or not Path(data_path).exists():
-                self.log.warning("⚠️ Fichier de données final non trouvé, génération de stats vides")
-                products = []
+            if not dataset or registry.path(dataset) is None:
+                self.log.warning("⚠️ Catalogue final absent du run, génération de stats vides")
+                reader = None
             else:
-                with open(data_path, 'r', encoding='utf-8') as f:
-                    products = json.load(f)
+                # Lecteur paresseux: le catalogue n'est lu qu'au premier accès
+                reader = registry.open(dataset)
             
-            stats = self._calculate_statistics(products)
+            streaming = self.streaming if self.streaming is not None else config.STATS_MODE == 'streaming'
+            if streaming and reader is not None:
+                stats = self._calculate_streaming_statistics(reader.path)
+            else:
+                stats = self._calculate_statistics(reader)
             
-            # Sauvegarde des statistiques
-            stats_path = config.PROCESSED_DATA_DIR / "dataset_statistics.json"
-            with open(stats_path, 'w', encoding='utf-8') as f:
-                json.dump(stats, f, ensure_ascii=False, indent=2)
+            # Sauvegarde des statistiques dans le registre du run
+            registry.write_json('dataset_statistics', stats)
             
-            # Génération CSV
-            csv_success = self._generate_csv(products, config)
+            # Génération CSV (mode streaming: produits lus un par un, sans charger le catalogue)
+            if reader is None:
+                products = []
+            else:
+                products = reader.iter_products() if streaming else reader.products()
+            self._generate_csv(products, registry)
             
             self.log.info(f"✅ Statistiques calculées: {stats['total_products']} produits")
             
+            # XCom: nom de l'artefact et résumé, pas les statistiques complètes
             context['task_instance'].xcom_push(
                 key='statistics',
-                value=stats
+                value='dataset_statistics'
             )
             
-            return stats
+            return {'total_products': stats['total_products'], 'total_offers': stats['total_offers']}
             
         except Exception as e:
             self.log.error(f"❌ Erreur calcul statistiques: {e}")
             raise AirflowException(f"Calcul statistiques échoué: {e}")
     
-    def _calculate_statistics(self, products: List[Dict]) -> Dict:
-        """Calcule les statistiques du dataset"""
-        all_prices = []
-        brand_count = {}
-        source_count = {}
-        condition_count = {}
-        
-        for product in products:
-            brand = product.get('brand', 'Unknown')
-            brand_count[brand] = brand_count.get(brand, 0) + 1
-            
-            for offer in product.get('offers', []):
-                source = offer.get('source', 'Unknown')
-                source_count[source] = source_count.get(source, 0) + 1
-                
-                condition = offer.get('condition', 'Inconnu')
-                condition_count[condition] = condition_count.get(condition, 0) + 1
-                
-                price = offer.get('price', 0)
-                if price and price > 0:
-                    all_prices.append(price)
-        
-        stats = {
-            "total_products": len(products),
-            "total_offers": sum(len(p.get('offers', [])) for p in products),
-            "sources_count": source_count,
-            "brand_distribution": dict(sorted(brand_count.items(), key=lambda x: x[1], reverse=True)),
-            "condition_distribution": condition_count,
-            "price_stats": {
-                'min': min(all_prices) if all_prices else 0,
-                'max': max(all_prices) if all_prices else 0,
-                'avg': sum(all_prices) / len(all_prices) if all_prices else 0,
-                'total_offers': len(all_prices)
-            },
-            "generated_at": datetime.now().isoformat()
-        }
-        
-        return stats
+    def _calculate_statistics(self, reader) -> Dict:
+        """Calcule les statistiques du dataset (moteur vectorisé, colonnes utiles seulement)"""
+        from scripts.data_processors.statistics import compute_statistics
+        return compute_statistics(reader)
     
-    def _generate_csv(self, products: List[Dict], config) -> bool:
-        """Génère un fichier CSV pour analyse"""
+    def _calculate_streaming_statistics(self, data_path: Path) -> Dict:
+        """Calcule les statistiques en une passe, mémoire bornée (quantiles approchés)"""
+        from scripts.data_processors.streaming_stats import StreamingStats
+        return StreamingStats.from_dataset(data_path).result()
+    
+    def _generate_csv(self, products: Iterable[Dict], registry) -> bool:
+        """Génère un fichier CSV pour analyse, écrit par blocs de CSV_CHUNK_ROWS offres"""
         try:
+            csv_file = registry.subdir('exports') / "marketeye_clean.csv"
             csv_data = []
-            
-            for product in products:
-                for offer in product.get('offers', []):
-                    row = {
-                        'product_id': product.get('product_id', ''),
-                        'brand': product.get('brand', ''),
-                        'model': product.get('model', ''),
-                        'product_name': product.get('product_name', ''),
-                        'source': offer.get('source', ''),
-                        'price': offer.get('price', 0),
-                        'currency': offer.get('currency', 'MAD'),
-                        'condition': offer.get('condition', 'N/A'),
-                        'rating': offer.get('rating', 'N/A'),
-                        'url': offer.get('url', 'N/A'),
-                        'seller_type': offer.get('seller_type', 'N/A'),
-                        'storage': product.get('specifications', {}).get('storage', 'N/A'),
-                        'ram': product.get('specifications', {}).get('ram', 'N/A')
-                    }
-                    csv_data.append(row)
-            
+            rows = 0
+            schema = None
+            
+            for row in self._csv_rows(products):
+                csv_data.append(row)
+                if len(csv_data) >= CSV_CHUNK_ROWS:
+                    chunk_schema = self._append_csv(csv_data, csv_file, header=rows == 0)
+                    schema = schema or chunk_schema
+                    rows += len(csv_data)
+                    csv_data = []
             if csv_data:
-                df = pd.DataFrame(csv_data)
-                csv_file = config.PROCESSED_DATA_DIR / "marketeye_clean.csv"
-                df.to_csv(csv_file, index=False, encoding='utf-8')
+                chunk_schema = self._append_csv(csv_data, csv_file, header=rows == 0)
+                schema = schema or chunk_schema
+                rows += len(csv_data)
+            
+            if rows:
+                registry.register('marketeye_clean', csv_file, 'csv', rows={'offers': rows},
+                                  schema={'offers': schema})
                 self.log.info(f"📄 Fichier CSV généré: {csv_file}")
                 return True
             else:
@@ -363,6 +423,34 @@ class StatisticsOperator(BaseOperator):
         except Exception as e:
             self.log.error(f"❌ Erreur génération CSV: {e}")
             return False
+    
+    @staticmethod
+    def _csv_rows(products: Iterable[Dict]) -> Iterator[Dict]:
+        """Une ligne CSV par offre"""
+        for product in products:
+            for offer in product.get('offers', []):
+                yield {
+                    'product_id': product.get('product_id', ''),
+                    'brand': product.get('brand', ''),
+                    'model': product.get('model', ''),
+                    'product_name': product.get('product_name', ''),
+                    'source': offer.get('source', ''),
+                    'price': offer.get('price', 0),
+                    'currency': offer.get('currency', 'MAD'),
+                    'condition': offer.get('condition', 'N/A'),
+                    'rating': offer.get('rating', 'N/A'),
+                    'url': offer.get('url', 'N/A'),
+                    'seller_type': offer.get('seller_type', 'N/A'),
+                    'storage': product.get('specifications', {}).get('storage', 'N/A'),
+                    'ram': product.get('specifications', {}).get('ram', 'N/A')
+                }
+    
+    @staticmethod
+    def _append_csv(csv_data: List[Dict], csv_file: Path, header: bool) -> Dict[str, str]:
+        """Écrit (premier bloc) ou complète le CSV, retourne les types du bloc"""
+        df = pd.DataFrame(csv_data)
+        df.to_csv(csv_file, mode='w' if header else 'a', header=header, index=False, encoding='utf-8')
+        return {column: str(dtype) for column, dtype in df.dtypes.items()}
 
 # ============================================
 # OPÉRATEUR DE RAPPORT
@@ -375,17 +463,20 @@ class ReportOperator(BaseOperator):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         
+    @_measured('report')
     def execute(self, context):
         self.log.info("📄 Génération du rapport")
         
         try:
-            from config.pipeline_config import PipelineConfig
-            config = PipelineConfig()
+            from config.pipeline_config import get_config
+            config = get_config()
+            registry = _run_registry(context, config)
             
-            stats = context['task_instance'].xcom_pull(
+            artifact = context['task_instance'].xcom_pull(
                 task_ids='calculate_statistics',
                 key='statistics'
             )
+            stats = registry.load_json(artifact) if artifact and registry.path(artifact) else None
             
             if not stats:
                 self.log.warning("⚠️ Statistiques non disponibles, génération rapport vide")
@@ -400,10 +491,8 @@ class ReportOperator(BaseOperator):
             
             report = self._generate_report(stats)
             
-            # Sauvegarde du rapport
-            report_path = config.REPORTS_DIR / f"etl_report_{datetime.now().strftime('%Y%m%d_%H%M')}.txt"
-            with open(report_path, 'w', encoding='utf-8') as f:
-                f.write(report)
+            # Sauvegarde du rapport (un par run: pas de collision entre backfills de la même minute)
+            report_path = registry.write_text('etl_report', report)
             
             self.log.info(f"✅ Rapport généré: {report_path}")
             
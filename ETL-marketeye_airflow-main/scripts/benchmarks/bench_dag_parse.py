@@ -0,0 +1,123 @@
+# scripts/benchmarks/bench_dag_parse.py
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+DAGS_DIR = current_dir / "dags"
+DAG_FILE = DAGS_DIR / "marketeye_etl_dag.py"
+PIPELINE_MODULES = ['extract', 'avito', 'jumia', 'electroplanet', 'catalogue', 'storage', 'metrics']
+REPEAT = 5
+TOP_IMPORTS = 15
+
+# Modules qui ne doivent pas être chargés par le parsing du DAG
+HEAVY_MODULES = ['pandas', 'numpy', 'pyarrow', 'sqlalchemy', 'pymongo', 'scripts.pipeline',
+                 'scripts.data_processors', 'scripts.storage']
+
+
+def run_python(code: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    """Exécute `code` dans un interpréteur neuf (aucun module déjà importé)"""
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    return subprocess.run(command, cwd=current_dir, capture_output=True, text=True)
+
+
+def import_profile(stderr: str):
+    """Temps cumulés (µs) des imports de premier niveau, depuis la sortie de -X importtime"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len('import time:'):].split('|')]
+        # Indentation de 1 espace: import fait directement par le fichier mesuré
+        if name == name.lstrip() or len(name) - len(name.lstrip()) == 1:
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)
+
+
+def profile_dag_file():
+    """Profil d'import du fichier DAG et modules lourds chargés au parsing"""
+    code = (f"import runpy, sys, json; runpy.run_path({str(DAG_FILE)!r}); "
+            f"print(json.dumps(sorted(sys.modules)))")
+    result = run_python(code, importtime=True)
+    if result.returncode != 0:
+        print(f"  ❌ Parsing impossible: {result.stderr.strip().splitlines()[-1]}")
+        return
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    imports = import_profile(result.stderr)
+    total = sum(cumulative for cumulative, _ in imports)
+    print(f"  Imports de premier niveau: {total / 1000:8.1f} ms ({len(loaded)} modules chargés)")
+    for cumulative, name in imports[:TOP_IMPORTS]:
+        print(f"    {cumulative / 1000:8.1f} ms  {name}")
+    heavy = sorted({module for module in loaded for prefix in HEAVY_MODULES
+                    if module == prefix or module.startswith(prefix + '.')})
+    if heavy:
+        print(f"  ⚠️ Modules lourds chargés au parsing: {', '.join(heavy[:10])}")
+    else:
+        print("  ✅ Aucun module lourd chargé au parsing")
+
+
+def time_dagbag():
+    """Durée de chargement du dossier dags/ par une DagBag (comme le scheduler)"""
+    code = (
+        "import time\n"
+        "from airflow.models import DagBag\n"
+        "start = time.perf_counter()\n"
+        f"bag = DagBag(dag_folder={str(DAGS_DIR)!r}, include_examples=False)\n"
+        "print(time.perf_counter() - start, len(bag.dags), len(bag.import_errors))\n"
+    )
+    timings = []
+    for _ in range(REPEAT):
+        result = run_python(code)
+        if result.returncode != 0:
+            print(f"  ❌ DagBag indisponible: {result.stderr.strip().splitlines()[-1]}")
+            return
+        seconds, dags, errors = result.stdout.strip().splitlines()[-1].split()
+        timings.append(float(seconds))
+    timings.sort()
+    print(f"  DagBag: {timings[len(timings) // 2] * 1000:8.1f} ms (médiane sur {REPEAT}), "
+          f"min {timings[0] * 1000:.1f} ms, {dags} DAG(s), {errors} erreur(s) d'import")
+
+
+def time_task_modules():
+    """Coût d'import des tâches, payé à l'exécution d'une tâche et non plus au parsing"""
+    baseline = min(_interpreter_startup() for _ in range(REPEAT))
+    for module in PIPELINE_MODULES:
+        timings = []
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            result = run_python(f"import scripts.pipeline.{module}")
+            elapsed = time.perf_counter() - start
+            if result.returncode != 0:
+                print(f"  ❌ scripts.pipeline.{module}: {result.stderr.strip().splitlines()[-1]}")
+                break
+            timings.append(elapsed)
+        else:
+            print(f"  scripts.pipeline.{module:<14} {(sorted(timings)[len(timings) // 2] - baseline) * 1000:8.1f} ms")
+
+
+def _interpreter_startup() -> float:
+    start = time.perf_counter()
+    run_python("pass")
+    return time.perf_counter() - start
+
+
+def run_benchmark():
+    print("🗂️ BENCHMARK PARSING DU DAG")
+    print("=" * 70)
+    print(f"Fichier: {DAG_FILE.name} ({len(DAG_FILE.read_text(encoding='utf-8').splitlines())} lignes)")
+    print("\n1. Profil d'import (python -X importtime)")
+    profile_dag_file()
+    print("\n2. Chargement DagBag")
+    time_dagbag()
+    print("\n3. Import des tâches (hors parsing)")
+    time_task_modules()
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_benchmark()
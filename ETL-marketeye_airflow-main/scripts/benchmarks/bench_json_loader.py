@@ -0,0 +1,73 @@
+# scripts/benchmarks/bench_json_loader.py
+import sys
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+from scripts.data_processors.json_loader import JSON_BACKEND, iter_json_records, load_json_file
+
+DEFAULT_FILE = current_dir / "data" / "raw" / "electroplanet_data.json"
+REPEAT = 20
+
+
+def legacy_load_json_file(file_path: Path):
+    """Ancien chargeur du DAG: lecture texte complète puis json.loads"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read().strip()
+        if content.startswith('['):
+            return json.loads(content)
+        return [json.loads(line) for line in content.split('\n') if line.strip()]
+
+
+def stream_count(file_path: Path) -> int:
+    """Consomme le flux sans garder les enregistrements"""
+    return sum(1 for _ in iter_json_records(file_path))
+
+
+def forced_stream_count(file_path: Path) -> int:
+    """Consomme le flux en forçant le décodage élément par élément"""
+    return sum(1 for _ in iter_json_records(file_path, stream_threshold=0))
+
+
+def measure(label: str, func, file_path: Path):
+    """Temps moyen et pic mémoire d'un chargeur"""
+    func(file_path)  # Chauffe (cache disque)
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func(file_path)
+    elapsed_ms = (time.perf_counter() - start) / REPEAT * 1000
+
+    tracemalloc.start()
+    func(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"  {label:<32} {elapsed_ms:8.2f} ms   pic mémoire {peak / 1024:9.1f} Ko")
+    return elapsed_ms
+
+
+def run_benchmark(file_path: Path = DEFAULT_FILE):
+    """Compare l'ancien chargeur texte aux chargeurs bytes du BaseExtractor"""
+    size_kb = file_path.stat().st_size / 1024
+    print(f"📊 BENCHMARK CHARGEMENT JSON - {file_path.name} ({size_kb:.1f} Ko)")
+    print(f"   Backend: {JSON_BACKEND}, {REPEAT} répétitions")
+    print("=" * 60)
+
+    legacy = measure("ancien (texte + json.loads)", legacy_load_json_file, file_path)
+    full = measure("load_json_file (bytes)", load_json_file, file_path)
+    stream = measure("iter_json_records (flux)", stream_count, file_path)
+    measure("iter_json_records (flux forcé)", forced_stream_count, file_path)
+
+    print("=" * 60)
+    print(f"⚡ Gain load_json_file: x{legacy / full:.2f}")
+    print(f"⚡ Gain iter_json_records: x{legacy / stream:.2f}")
+
+
+if __name__ == "__main__":
+    run_benchmark(Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_FILE)
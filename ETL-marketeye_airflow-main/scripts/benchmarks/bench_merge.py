@@ -0,0 +1,105 @@
+# scripts/benchmarks/bench_merge.py
+import sys
+import copy
+import random
+import time
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+from scripts.data_processors.merge import merge_products
+
+TOTAL_OFFERS = 1_000_000
+LEGACY_OFFERS = 20_000     # La version quadratique devient inutilisable au-delà
+PRODUCT_IDS = 2_000
+SOURCES = ['Avito', 'Jumia', 'Electroplanet']
+
+
+# ============================================
+# RÉFÉRENCE: ANCIENNE FUSION (BOUCLE IMBRIQUÉE)
+# ============================================
+
+def legacy_merge(products):
+    """Fusion des offres de merge_data avant l'index par produit"""
+    merged_dict = {}
+    for product in products:
+        pid = product.get('product_id')
+        if not pid:
+            continue
+        if pid in merged_dict:
+            existing = merged_dict[pid]
+            for new_offer in product.get('offers', []):
+                offer_exists = False
+                for existing_offer in existing['offers']:
+                    if (new_offer.get('source') == existing_offer.get('source') and
+                            new_offer.get('url') == existing_offer.get('url')):
+                        offer_exists = True
+                        break
+                if not offer_exists:
+                    existing['offers'].append(new_offer)
+        else:
+            merged_dict[pid] = product
+    return list(merged_dict.values())
+
+
+# ============================================
+# DONNÉES SYNTHÉTIQUES
+# ============================================
+
+def make_products(total_offers: int, seed: int = 42):
+    """
+    Produits transformés à une offre chacun, répartis selon une loi de Zipf:
+    quelques modèles populaires (type apple_iphone11) concentrent des milliers d'offres.
+    ~10% des offres réutilisent l'URL d'une offre précédente.
+    """
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, PRODUCT_IDS + 1)]
+    pids = rng.choices([f"brand_model{i}" for i in range(PRODUCT_IDS)], weights=weights, k=total_offers)
+    products = []
+    for i, pid in enumerate(pids):
+        url_id = rng.randrange(i) if i and rng.random() < 0.1 else i
+        source = SOURCES[url_id % len(SOURCES)]
+        products.append({
+            'product_id': pid,
+            'product_name': pid.replace('_', ' '),
+            'offers': [{'source': source, 'price': float(url_id % 5000), 'url': f"https://example.ma/{url_id}"}],
+            'specifications': {},
+            'metadata': {'sources': [source]},
+        })
+    return products
+
+
+def timed(func, products):
+    data = copy.deepcopy(products)
+    start = time.perf_counter()
+    result = func(data)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark():
+    """Temps de fusion avant/après l'index d'offres, puis passage à l'échelle sur 1M d'offres"""
+    print(f"📊 BENCHMARK FUSION - {LEGACY_OFFERS} puis {TOTAL_OFFERS} offres, {PRODUCT_IDS} produits")
+    print("=" * 60)
+
+    sample = make_products(LEGACY_OFFERS)
+    legacy, legacy_time = timed(legacy_merge, sample)
+    indexed, indexed_time = timed(merge_products, sample)
+    assert [p['offers'] for p in legacy] == [p['offers'] for p in indexed], "Résultats différents!"
+    print(f"  {LEGACY_OFFERS:>9} offres  boucle imbriquée  {legacy_time:8.3f} s")
+    print(f"  {LEGACY_OFFERS:>9} offres  index par produit {indexed_time:8.3f} s")
+    print(f"⚡ Gain: x{legacy_time / indexed_time:.1f}")
+    print("-" * 60)
+
+    for size in (TOTAL_OFFERS // 10, TOTAL_OFFERS):
+        products = make_products(size)
+        merged, elapsed = timed(merge_products, products)
+        kept = sum(len(p['offers']) for p in merged)
+        print(f"  {size:>9} offres  index par produit {elapsed:8.3f} s "
+              f"({size / elapsed:,.0f} offres/s, {kept} offres uniques, {len(merged)} produits)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
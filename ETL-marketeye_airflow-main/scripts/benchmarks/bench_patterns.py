@@ -0,0 +1,150 @@
+# scripts/benchmarks/bench_patterns.py
+import sys
+import re
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+from scripts.data_processors.json_loader import load_json_file
+from scripts.data_processors.jumia_extractor import JumiaExtractor
+from scripts.data_processors.avito_extractor import AvitoExtractor
+
+DATA_DIR = current_dir / "data"
+REPEAT = 20
+
+
+# ============================================
+# RÉFÉRENCE: ANCIENNES VERSIONS À MOTIFS CHAÎNE
+# ============================================
+
+def legacy_extract_model_from_title(title: str, brand: str) -> str:
+    """BaseExtractor.extract_model_from_title avant le registre"""
+    title_clean = title.lower().replace(brand.lower(), "").strip()
+    samsung_patterns = [r'galaxy\s+([a-z]\d+\w*\s*\d*\w*)', r'([a-z]\d+\w*\s*\d*\w*)\s+']
+    generic_patterns = [r'(\d+\s*go|\d+\s*gb)', r'(\d+\s*go\s+\d+\s*go\s+ram)', r'([a-z]+\s*\d+\w*)']
+    patterns = samsung_patterns + generic_patterns if 'samsung' in brand.lower() else generic_patterns
+    for pattern in patterns:
+        match = re.search(pattern, title_clean)
+        if match:
+            return re.sub(r'\s+', ' ', match.group(1).upper()).strip()
+    return "Unknown"
+
+
+def legacy_create_product_id(brand: str, model: str, title: str) -> str:
+    """BaseExtractor.create_product_id avant le registre"""
+    clean_brand = re.sub(r'[^a-z0-9]', '', brand.lower())
+    clean_model = re.sub(r'[^a-z0-9]', '', model.lower())
+    if clean_model == "unknown":
+        words = re.sub(r'[^a-z0-9]', ' ', title.lower()).split()
+        if len(words) > 1:
+            clean_model = words[1]
+    return f"{clean_brand}_{clean_model}"
+
+
+def legacy_extract_specs(title: str) -> dict:
+    """JumiaExtractor.extract_specs_jumia (partie titre) avant le registre"""
+    specs = {}
+    full_text = (title + " ").lower()
+    storage_match = re.search(r'(\d+)\s*(go|gb|go ram)', full_text)
+    if storage_match:
+        specs['storage'] = f"{storage_match.group(1)} {storage_match.group(2).upper()}"
+    ram_match = re.search(r'(\d+)\s*go\s*ram', full_text)
+    if ram_match:
+        specs['ram'] = f"{ram_match.group(1)} Go"
+    screen_match = re.search(r'(\d+[.,]?\d*)"', full_text)
+    if screen_match:
+        specs['screen_size'] = f"{screen_match.group(1)}\""
+    return specs
+
+
+def legacy_extract_model_avito(title: str, brand: str) -> str:
+    """AvitoExtractor._extract_model_fixed (partie titre) avant le registre"""
+    title = title.upper().replace(brand.upper(), "")
+    patterns = [
+        r'([A-Z]+\s*\d+\s*[A-Z]*\s*\d*\s*[A-Z]*)', r'(\d+\s*[A-Z]+\s*\d*)',
+        r'([A-Z]+\s*\d+)', r'(\d+\s*[A-Z]{2,})', r'([A-Z]{2,}\s*\d+)',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, title)
+        if match:
+            model = re.sub(r'\b(ULTRA|PRO|PLUS|MAX|MINI|LITE)\b', '', match.group(1).strip(), flags=re.IGNORECASE)
+            model = re.sub(r'\s+', ' ', model).strip().upper()
+            if model and len(model) > 1:
+                return model
+    words = [w for w in title.split()[:3] if len(w) > 2 and not w.isdigit()]
+    return ' '.join(words).upper() if words else "Unknown"
+
+
+def legacy_clean_price(price: str) -> float:
+    """BaseExtractor.clean_price avant le registre"""
+    price_clean = re.sub(r'[^\d,.]', '', str(price)).replace(',', '.')
+    numbers = re.findall(r'\d+\.?\d*', price_clean)
+    return float(numbers[0]) if numbers else 0.0
+
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def load_samples():
+    """Titres, marques et prix des fichiers d'exemple (Electroplanet brut, titres Jumia)"""
+    samples = []
+    for item in load_json_file(DATA_DIR / "raw" / "electroplanet_data.json"):
+        samples.append((item.get('name') or '', item.get('brand') or '', item.get('price') or ''))
+    jumia_path = DATA_DIR / "processed" / "jumia_transformed.json"
+    if jumia_path.exists():
+        for product in load_json_file(jumia_path):
+            samples.append((product.get('product_name') or '', product.get('brand') or '', '1 299,00 Dhs'))
+    return samples
+
+
+def parse_legacy(samples):
+    out = []
+    for title, brand, price in samples:
+        model = legacy_extract_model_from_title(title, brand)
+        out.append((model, legacy_create_product_id(brand, model, title), legacy_extract_specs(title),
+                    legacy_extract_model_avito(title, brand), legacy_clean_price(price)))
+    return out
+
+
+def parse_registry(samples, jumia: JumiaExtractor, avito: AvitoExtractor):
+    out = []
+    for title, brand, price in samples:
+        model = jumia.extract_model_from_title(title, brand)
+        out.append((model, jumia.create_product_id(brand, model, title), jumia.extract_specs_jumia({'title': title}),
+                    avito._extract_model_fixed({'title': title}, brand), jumia.clean_price(price)))
+    return out
+
+
+def per_record_us(func, samples) -> float:
+    func()  # Chauffe
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func()
+    return (time.perf_counter() - start) / REPEAT / len(samples) * 1e6
+
+
+def run_benchmark():
+    """Coût par enregistrement du parsing titre/spécifications avant et après le registre"""
+    config = SimpleNamespace(brand_mapping={})
+    jumia, avito = JumiaExtractor(config), AvitoExtractor(config)
+    samples = load_samples()
+
+    assert parse_legacy(samples) == parse_registry(samples, jumia, avito), "Résultats différents!"
+
+    print(f"📊 BENCHMARK REGEX - {len(samples)} titres, {REPEAT} répétitions")
+    print("=" * 60)
+    before = per_record_us(lambda: parse_legacy(samples), samples)
+    after = per_record_us(lambda: parse_registry(samples, jumia, avito), samples)
+    print(f"  avant (motifs chaîne)      {before:8.2f} µs/enregistrement")
+    print(f"  après (registre compilé)   {after:8.2f} µs/enregistrement")
+    print("=" * 60)
+    print(f"⚡ Gain: x{before / after:.2f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,90 @@
+# scripts/benchmarks/bench_shards.py
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+from scripts.data_processors.json_loader import iter_json_records
+from scripts.data_processors.shards import compute_shards, iter_shard_records
+
+TOTAL_RECORDS = 200_000
+SHARD_MB = 16
+SLOTS = min(8, os.cpu_count() or 1)
+
+
+def make_ads(count: int):
+    """Annonces Avito synthétiques (titres, prix et états variés, texte non ASCII)"""
+    rng = random.Random(42)
+    brands = ['SAMSUNG', 'Apple', 'NULL', 'Xiaomi', 'oppo']
+    return [{
+        'ad_id': str(i),
+        'title': f"{rng.choice(brands)} Galaxy A{rng.randint(10, 99)} {rng.choice(['128Go', '256Go'])} état neuf",
+        'brand': rng.choice(brands),
+        'model': 'NULL',
+        'price': f"{rng.randint(500, 15000)} DH",
+        'condition': rng.choice(['NEUF', 'Bon', 'Excellent', 'Moyen']),
+        'city': rng.choice(['Casablanca', 'Rabat', 'Fès']),
+        'url': f"https://www.avito.ma/vi/{i}.htm",
+        'list_time': '2025-12-14T12:52:03Z',
+        'description': 'Téléphone en très bon état, vendu avec boîte et chargeur. ' * rng.randint(1, 6),
+    } for i in range(count)]
+
+
+def transform_range(args):
+    """Tâche mappée simulée: transforme une plage (ou le fichier entier si start est None)"""
+    from scripts.pipeline.avito import transform_avito_item
+
+    path, start, end = args
+    records = iter_json_records(path) if start is None else iter_shard_records(path, start, end)
+    return sum(1 for record in records if transform_avito_item(record))
+
+
+def run_benchmark():
+    """Un gros fichier: calcul des plages puis transformation sur N slots vs une seule tâche"""
+    print("✂️ BENCHMARK DÉCOUPAGE EN PLAGES")
+    print("=" * 70)
+    ads = make_ads(TOTAL_RECORDS)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        files = {'tableau JSON': tmp / "avito_big.json", 'JSON Lines': tmp / "avito_big.jsonl"}
+        with open(files['tableau JSON'], 'w', encoding='utf-8') as f:
+            json.dump(ads, f, ensure_ascii=False, indent=2)
+        with open(files['JSON Lines'], 'w', encoding='utf-8') as f:
+            for ad in ads:
+                f.write(json.dumps(ad, ensure_ascii=False) + '\n')
+        del ads
+
+        for layout, path in files.items():
+            size_mb = path.stat().st_size / 1024 / 1024
+            start = time.perf_counter()
+            shards = compute_shards(path, SHARD_MB * 1024 * 1024)
+            shard_time = time.perf_counter() - start
+            print(f"\n{layout}: {size_mb:.0f} Mo, {len(shards)} plages de ~{SHARD_MB} Mo "
+                  f"calculées en {shard_time:.3f} s ({size_mb / max(shard_time, 1e-9):.0f} Mo/s)")
+
+            start = time.perf_counter()
+            serial = transform_range((path, None, None))
+            serial_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=SLOTS) as executor:
+                counts = list(executor.map(transform_range, [(path, s, e) for s, e in shards]))
+            parallel_time = time.perf_counter() - start
+
+            assert sum(counts) == serial, f"{sum(counts)} produits par plages, {serial} en une tâche"
+            print(f"  Une tâche          {serial_time:7.2f} s  {serial / serial_time:9.0f} produits/s")
+            print(f"  {SLOTS} slots, plages   {parallel_time:7.2f} s  {serial / parallel_time:9.0f} produits/s "
+                  f"(x{serial_time / parallel_time:.1f}, min/max par plage {min(counts)}/{max(counts)})")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_benchmark()
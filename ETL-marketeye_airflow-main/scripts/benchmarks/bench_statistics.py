@@ -0,0 +1,119 @@
+# scripts/benchmarks/bench_statistics.py
+import sys
+import math
+import random
+import tempfile
+import time
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+from scripts.data_processors.columnar import DatasetReader, save_dataset
+from scripts.data_processors.json_loader import load_json_file
+from scripts.data_processors.statistics import compute_statistics
+
+SIZES = (100_000, 1_000_000)
+BRANDS = ['Samsung', 'Apple', 'Xiaomi', 'Oppo', 'Realme', 'Tecno', 'Infinix', 'Huawei']
+SOURCES = ['Avito', 'Jumia', 'Electroplanet']
+CONDITIONS = ['new', 'Très bon', 'Bon', 'Correct']
+
+
+# ============================================
+# RÉFÉRENCE: ANCIEN CALCUL (BOUCLES IMBRIQUÉES)
+# ============================================
+
+def legacy_statistics(products):
+    """StatisticsOperator._calculate_statistics avant le moteur vectorisé"""
+    all_prices = []
+    brand_count, source_count, condition_count = {}, {}, {}
+    for product in products:
+        brand = product.get('brand', 'Unknown')
+        brand_count[brand] = brand_count.get(brand, 0) + 1
+        for offer in product.get('offers', []):
+            source = offer.get('source', 'Unknown')
+            source_count[source] = source_count.get(source, 0) + 1
+            condition = offer.get('condition', 'Inconnu')
+            condition_count[condition] = condition_count.get(condition, 0) + 1
+            price = offer.get('price', 0)
+            if price and price > 0:
+                all_prices.append(price)
+    return {
+        "total_products": len(products),
+        "total_offers": sum(len(p.get('offers', [])) for p in products),
+        "sources_count": source_count,
+        "brand_distribution": brand_count,
+        "condition_distribution": condition_count,
+        "price_stats": {
+            'min': min(all_prices) if all_prices else 0,
+            'max': max(all_prices) if all_prices else 0,
+            'avg': sum(all_prices) / len(all_prices) if all_prices else 0,
+            'total_offers': len(all_prices)
+        },
+    }
+
+
+# ============================================
+# DONNÉES SYNTHÉTIQUES
+# ============================================
+
+def make_products(total_offers: int, offers_per_product: int = 5, seed: int = 42):
+    rng = random.Random(seed)
+    products = []
+    for i in range(total_offers // offers_per_product):
+        brand = rng.choice(BRANDS)
+        products.append({
+            'product_id': f"{brand.lower()}_model{i % 500}",
+            'brand': brand,
+            'model': f"MODEL {i % 500}",
+            'offers': [{
+                'source': rng.choice(SOURCES),
+                'price': round(rng.lognormvariate(8, 0.6), 2) if rng.random() > 0.02 else 0.0,
+                'condition': rng.choice(CONDITIONS),
+                'url': f"https://example.ma/{i}/{j}",
+            } for j in range(offers_per_product)],
+        })
+    return products
+
+
+def check_same(legacy, engine):
+    for key in ('total_products', 'total_offers', 'sources_count', 'brand_distribution', 'condition_distribution'):
+        assert legacy[key] == engine[key], f"Résultats différents: {key}"
+    for key in ('min', 'max', 'avg', 'total_offers'):
+        assert math.isclose(legacy['price_stats'][key], engine['price_stats'][key], rel_tol=1e-9), key
+
+
+def run_benchmark():
+    """Temps du calcul de statistiques, lecture du fichier incluse: boucles Python vs moteur vectorisé"""
+    print("📊 BENCHMARK STATISTIQUES")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            products = make_products(size)
+            json_path = save_dataset(products, Path(tmp) / f"bench_{size}", 'json')
+            parquet_path = save_dataset(products, Path(tmp) / f"bench_{size}", 'parquet')
+            del products
+
+            start = time.perf_counter()
+            legacy = legacy_statistics(load_json_file(json_path))
+            legacy_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            engine = compute_statistics(DatasetReader(parquet_path))
+            engine_time = time.perf_counter() - start
+            check_same(legacy, engine)
+
+            start = time.perf_counter()
+            compute_statistics(DatasetReader(json_path))
+            engine_json_time = time.perf_counter() - start
+
+            print(f"  {size:>9} offres  JSON + boucles {legacy_time:7.3f} s | "
+                  f"JSON + moteur {engine_json_time:7.3f} s | Parquet + moteur {engine_time:7.3f} s")
+            print(f"            médiane {engine['price_stats']['median']:.2f} MAD, "
+                  f"{len(engine['price_by_brand'])} marques, {len(engine['price_by_model'])} bandes modèle")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_benchmark()
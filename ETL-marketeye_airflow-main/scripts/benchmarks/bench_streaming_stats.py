@@ -0,0 +1,65 @@
+# scripts/benchmarks/bench_streaming_stats.py
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+from scripts.benchmarks.bench_statistics import make_products
+from scripts.data_processors.columnar import DatasetReader, save_dataset
+from scripts.data_processors.statistics import compute_statistics
+from scripts.data_processors.streaming_stats import StreamingStats, combine_source_partials, write_source_partial
+
+TOTAL_OFFERS = 1_000_000
+SOURCES = ['avito', 'jumia', 'electroplanet']
+
+
+def measure(function):
+    """Durée et pic mémoire Python d'un appel"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+def run_benchmark():
+    """Statistiques du catalogue fusionné: moteur vectorisé vs flux vs fusion des partiels par source"""
+    print("📊 BENCHMARK STATISTIQUES EN FLUX")
+    print("=" * 70)
+    products = make_products(TOTAL_OFFERS)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        final_path = save_dataset(products, tmp / "marketeye_final", 'json')
+
+        # Une source par tiers du catalogue, comme les tâches d'extraction
+        source_paths = {}
+        third = len(products) // len(SOURCES) + 1
+        for i, source in enumerate(SOURCES):
+            part = products[i * third:(i + 1) * third]
+            source_paths[source] = save_dataset(part, tmp / f"{source}_transformed", 'json')
+            write_source_partial(part, source_paths[source], tmp / "stats", source)
+        del products
+
+        exact, vectorized_time, vectorized_peak = measure(lambda: compute_statistics(DatasetReader(final_path)))
+        streamed, stream_time, stream_peak = measure(lambda: StreamingStats.from_dataset(final_path).result())
+        combined, combine_time, combine_peak = measure(
+            lambda: combine_source_partials(tmp / "stats", source_paths).result())
+
+        print(f"  Vectorisé (pandas)    {vectorized_time:7.3f} s  pic {vectorized_peak:8.1f} Mo")
+        print(f"  Flux (un produit)     {stream_time:7.3f} s  pic {stream_peak:8.1f} Mo")
+        print(f"  Partiels fusionnés    {combine_time:7.3f} s  pic {combine_peak:8.1f} Mo")
+        for name in ('p5', 'median', 'p95'):
+            print(f"  {name:>6}: exact {exact['price_stats'][name]:9.2f} | flux {streamed['price_stats'][name]:9.2f} "
+                  f"| partiels {combined['price_stats'][name]:9.2f} MAD")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -1,14 +1,61 @@
 # scripts/data_processors/avito_extractor.py
 import json
-import re
+import hashlib
 import logging
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from .base_extractor import BaseExtractor
+from . import patterns
+from .memo import memoized
 
 logger = logging.getLogger(__name__)
 
+CONDITION_MAP = {
+    'neuf': 'new', 'new': 'new', 'nouveau': 'new',
+    'bon': 'good', 'good': 'good', 'excellent': 'good',
+    'moyen': 'fair', 'fair': 'fair', 'acceptable': 'fair',
+    'mauvais': 'poor', 'poor': 'poor', 'endommagé': 'poor',
+    'comme neuf': 'like new', 'like new': 'like new',
+    'refurbished': 'refurbished', 'reconditionné': 'refurbished'
+}
+
+
+@memoized('avito.price')
+def _parse_avito_price(price_str: str) -> float:
+    """Convertit un prix Avito texte en float (mémoïsé: les formats se répètent)"""
+    # Formats supportés: "250 DH", "1,200.50 MAD", "3500", "4.500,00"
+    price_clean = patterns.PRICE_NOISE.sub('', price_str)
+    
+    # Gérer format européen 4.500,00 → 4500.00
+    if ',' in price_clean and '.' in price_clean:
+        # Format: 1.200,50
+        price_clean = price_clean.replace('.', '')
+        price_clean = price_clean.replace(',', '.')
+    elif ',' in price_clean:
+        # Format: 4,500 → 4500
+        price_clean = price_clean.replace(',', '')
+    
+    # Extraire le premier nombre
+    number = patterns.FIRST_NUMBER.search(price_clean)
+    if number:
+        try:
+            return float(number.group())
+        except ValueError:
+            return 0.0
+    
+    return 0.0
+
+
+@memoized('avito.condition')
+def _map_condition(cond_str: str) -> str:
+    """Mappe un état Avito libre vers la condition normalisée"""
+    for key, value in CONDITION_MAP.items():
+        if key in cond_str:
+            return value
+    
+    return 'used'
+
 class AvitoExtractor(BaseExtractor):
     """Extracteur spécialisé pour Avito - STRUCTURE 2024"""
     
@@ -92,55 +139,20 @@ class AvitoExtractor(BaseExtractor):
         # 1. Depuis le champ 'brand'
         brand_field = product.get('brand')
         if brand_field and str(brand_field).strip().upper() not in ['', 'NULL', 'NONE', 'INCONNU']:
-            brand = str(brand_field).strip().upper()
-            
-            # Mapping des marques
-            brand_mapping = {
-                'APPLE': 'Apple', 'IPHONE': 'Apple',
-                'SAMSUNG': 'Samsung', 'SAMSG': 'Samsung',
-                'XIAOMI': 'Xiaomi', 'REDMI': 'Xiaomi', 'POCO': 'Xiaomi',
-                'HUAWEI': 'Huawei', 'HONOR': 'Huawei',
-                'OPPO': 'Oppo', 'REALME': 'Realme',
-                'NOKIA': 'Nokia', 'TECNO': 'Tecno',
-                'INFINIX': 'Infinix', 'VIVO': 'Vivo',
-                'MOTOROLA': 'Motorola', 'MOTO': 'Motorola',
-                'ONEPLUS': 'OnePlus', 'SONY': 'Sony',
-                'LG': 'LG', 'GOOGLE': 'Google', 'PIXEL': 'Google'
-            }
-            
-            for key, value in brand_mapping.items():
-                if key in brand:
-                    return value
-            
-            return brand.title()
+            brand = str(brand_field).strip()
+            return self.brand_matcher.match(brand) or brand.upper().title()
         
         # 2. Depuis le titre (fallback)
-        title = product.get('title', '').upper()
-        
-        # Liste exhaustive des marques
-        brands_in_title = [
-            ('APPLE', 'Apple'), ('IPHONE', 'Apple'),
-            ('SAMSUNG', 'Samsung'), ('GALAXY', 'Samsung'),
-            ('XIAOMI', 'Xiaomi'), ('REDMI', 'Xiaomi'), ('POCO', 'Xiaomi'),
-            ('HUAWEI', 'Huawei'), ('HONOR', 'Huawei'),
-            ('OPPO', 'Oppo'), ('REALME', 'Realme'),
-            ('NOKIA', 'Nokia'), ('TECNO', 'Tecno'),
-            ('INFINIX', 'Infinix'), ('VIVO', 'Vivo'),
-            ('MOTOROLA', 'Motorola'), ('MOTO', 'Motorola'),
-            ('ONEPLUS', 'OnePlus'), ('SONY', 'Sony'),
-            ('LG', 'LG'), ('GOOGLE', 'Google'), ('PIXEL', 'Google')
-        ]
-        
-        for brand_key, brand_value in brands_in_title:
-            if brand_key in title:
-                return brand_value
+        brand = self.brand_matcher.match(product.get('title', ''))
+        if brand:
+            return brand
         
         # 3. Depuis le modèle
         model_field = product.get('model', '')
         if model_field:
-            for brand_key, brand_value in brands_in_title:
-                if brand_key in str(model_field).upper():
-                    return brand_value
+            brand = self.brand_matcher.match(str(model_field))
+            if brand:
+                return brand
         
         return "Unknown"
     
@@ -151,8 +163,8 @@ class AvitoExtractor(BaseExtractor):
         if model_field and str(model_field).strip().upper() not in ['', 'NULL', 'NONE', 'UNKNOWN']:
             model = str(model_field).strip().upper()
             # Nettoyer le modèle
-            model = re.sub(r'[^\w\s]', ' ', model)  # Garder lettres, chiffres, espaces
-            model = re.sub(r'\s+', ' ', model).strip()
+            model = patterns.NON_WORD_SPACE.sub(' ', model)  # Garder lettres, chiffres, espaces
+            model = patterns.MULTI_SPACE.sub(' ', model).strip()
             return model if model else "Unknown"
         
         # 2. Depuis le titre (extraction intelligente)
@@ -164,21 +176,13 @@ class AvitoExtractor(BaseExtractor):
             title = title.replace(brand.upper(), "")
         
         # Patterns pour extraire le modèle
-        patterns = [
-            r'([A-Z]+\s*\d+\s*[A-Z]*\s*\d*\s*[A-Z]*)',  # S24 ULTRA, 12T PRO
-            r'(\d+\s*[A-Z]+\s*\d*)',                    # 12 PRO, 14 PLUS
-            r'([A-Z]+\s*\d+)',                         # GALAXY S21, REDMI NOTE 12
-            r'(\d+\s*[A-Z]{2,})',                      # 256GB, 512 GO
-            r'([A-Z]{2,}\s*\d+)',                      # NOTE 10, TAB S9
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, title)
+        for pattern in patterns.AVITO_MODEL_PATTERNS:
+            match = pattern.search(title)
             if match:
                 model_found = match.group(1).strip()
                 # Nettoyer
-                model_found = re.sub(r'\b(ULTRA|PRO|PLUS|MAX|MINI|LITE)\b', '', model_found, flags=re.IGNORECASE)
-                model_found = re.sub(r'\s+', ' ', model_found).strip().upper()
+                model_found = patterns.MODEL_VARIANT_SUFFIX.sub('', model_found)
+                model_found = patterns.MULTI_SPACE.sub(' ', model_found).strip().upper()
                 if model_found and len(model_found) > 1:
                     return model_found
         
@@ -205,30 +209,7 @@ class AvitoExtractor(BaseExtractor):
         if isinstance(price_data, (int, float)):
             return float(price_data)
         
-        # Convertir en string
-        price_str = str(price_data)
-        
-        # Formats supportés: "250 DH", "1,200.50 MAD", "3500", "4.500,00"
-        price_clean = re.sub(r'[^\d,.]', '', price_str)
-        
-        # Gérer format européen 4.500,00 → 4500.00
-        if ',' in price_clean and '.' in price_clean:
-            # Format: 1.200,50
-            price_clean = price_clean.replace('.', '')
-            price_clean = price_clean.replace(',', '.')
-        elif ',' in price_clean:
-            # Format: 4,500 → 4500
-            price_clean = price_clean.replace(',', '')
-        
-        # Extraire le premier nombre
-        numbers = re.findall(r'\d+\.?\d*', price_clean)
-        if numbers:
-            try:
-                return float(numbers[0])
-            except ValueError:
-                return 0.0
-        
-        return 0.0
+        return _parse_avito_price(str(price_data))
     
     def _extract_specs_fixed(self, product: Dict) -> Dict:
         """Extrait les spécifications"""
@@ -251,7 +232,7 @@ class AvitoExtractor(BaseExtractor):
     def _create_product_id_fixed(self, brand: str, model: str, product: Dict) -> str:
         """Crée un ID produit UNIQUE et STABLE"""
         # Nettoyer la marque
-        clean_brand = re.sub(r'[^a-z0-9]', '', brand.lower())
+        clean_brand = patterns.NON_ALNUM_LOWER.sub('', brand.lower())
         if not clean_brand or clean_brand == "unknown":
             clean_brand = "unknown"
         
@@ -259,14 +240,13 @@ class AvitoExtractor(BaseExtractor):
         if model == "Unknown":
             # Fallback: utiliser les premiers mots du titre
             title = product.get('title', '')
-            words = re.findall(r'\b[a-z]+\d+\w*\b', title.lower())
-            clean_model = words[0] if words else "unknown"
+            word = patterns.MODEL_TOKEN.search(title.lower())
+            clean_model = word.group() if word else "unknown"
         else:
-            clean_model = re.sub(r'[^a-z0-9]', '', model.lower())
+            clean_model = patterns.NON_ALNUM_LOWER.sub('', model.lower())
         
         # Si toujours unknown, utiliser un hash du titre
         if clean_model == "unknown":
-            import hashlib
             title = product.get('title', '')
             title_hash = hashlib.md5(title.encode()).hexdigest()[:8]
             clean_model = f"title_{title_hash}"
@@ -286,22 +266,7 @@ class AvitoExtractor(BaseExtractor):
         if not condition or str(condition).upper() in ['NULL', 'NONE', '']:
             return 'used'  # Par défaut pour Avito
         
-        cond_str = str(condition).lower()
-        
-        condition_map = {
-            'neuf': 'new', 'new': 'new', 'nouveau': 'new',
-            'bon': 'good', 'good': 'good', 'excellent': 'good',
-            'moyen': 'fair', 'fair': 'fair', 'acceptable': 'fair',
-            'mauvais': 'poor', 'poor': 'poor', 'endommagé': 'poor',
-            'comme neuf': 'like new', 'like new': 'like new',
-            'refurbished': 'refurbished', 'reconditionné': 'refurbished'
-        }
-        
-        for key, value in condition_map.items():
-            if key in cond_str:
-                return value
-        
-        return 'used'
+        return _map_condition(str(condition).lower())
     
     def _build_url_fixed(self, product: Dict) -> str:
         """Construit l'URL correcte"""
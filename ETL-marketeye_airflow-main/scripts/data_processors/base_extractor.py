@@ -1,19 +1,60 @@
 # scripts/data_processors/base_extractor.py
 import json
-import re
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from abc import ABC, abstractmethod
+from .json_loader import iter_json_records, load_json_file
+from . import patterns
+from .brand_matcher import BrandMatcher, get_brand_matcher
+from .memo import memoized
 
 logger = logging.getLogger(__name__)
 
+
+# ============================================
+# NORMALISATIONS PURES MÉMOÏSÉES
+# ============================================
+
+@memoized('extract_model_from_title')
+def _model_from_title(title_str: str, brand_str: str) -> str:
+    """Extrait le modèle d'un titre (mémoïsé: les titres se répètent d'une annonce à l'autre)"""
+    title_clean = title_str.lower()
+    brand_lower = brand_str.lower()
+    title_clean = title_clean.replace(brand_lower, "").strip()
+    
+    if 'samsung' in brand_lower:
+        model_patterns = patterns.SAMSUNG_MODEL_PATTERNS + patterns.GENERIC_MODEL_PATTERNS
+    else:
+        model_patterns = patterns.GENERIC_MODEL_PATTERNS
+        
+    for pattern in model_patterns:
+        match = pattern.search(title_clean)
+        if match:
+            model = match.group(1).upper()
+            model = patterns.MULTI_SPACE.sub(' ', model).strip()
+            return model
+            
+    return "Unknown"
+
+
+@memoized('clean_price')
+def _parse_price(price_str: str) -> float:
+    """Convertit un prix texte ("7 800 DH") en float"""
+    price_clean = patterns.PRICE_NOISE.sub('', price_str)
+    price_clean = price_clean.replace(',', '.')
+    
+    number = patterns.FIRST_NUMBER.search(price_clean)
+    return float(number.group()) if number else 0.0
+
+
 class BaseExtractor(ABC):
     """Classe de base pour tous les extracteurs"""
     
     def __init__(self, config):
         self.config = config
+        self._brand_matcher: Optional[BrandMatcher] = None
         self.master_schema = {
             "product_id": None,
             "brand": None,
@@ -29,6 +70,14 @@ class BaseExtractor(ABC):
             }
         }
     
+    def load_json_file(self, file_path: Path) -> List[Dict]:
+        """Charge un fichier brut complet (tableau JSON ou JSON Lines)"""
+        return load_json_file(file_path)
+    
+    def iter_json_file(self, file_path: Path) -> Iterator[Dict]:
+        """Itère sur les enregistrements d'un fichier brut sans le charger en entier"""
+        return iter_json_records(file_path)
+    
     def safe_string(self, value: Any) -> str:
         """Convertit n'importe quelle valeur en string de manière sécurisée"""
         if value is None:
@@ -37,54 +86,27 @@ class BaseExtractor(ABC):
             return str(value)
         return str(value)
     
+    @property
+    def brand_matcher(self) -> BrandMatcher:
+        """Matcher de marques partagé, construit depuis config.brand_mapping"""
+        if self._brand_matcher is None:
+            self._brand_matcher = get_brand_matcher(self.config.brand_mapping)
+        return self._brand_matcher
+    
     def normalize_brand(self, brand: Optional[str]) -> str:
         """Normalise le nom des marques"""
         if not brand:
             return "Unknown"
         
         brand_str = self.safe_string(brand)
-        brand_lower = brand_str.lower().strip()
-        
-        for key, value in self.config.brand_mapping.items():
-            if key in brand_lower:
-                return value
-        return brand_str.title()
+        return self.brand_matcher.match(brand_str.strip()) or brand_str.title()
     
     def extract_model_from_title(self, title: Any, brand: Any) -> str:
         """Extrait le modèle depuis le titre du produit"""
         if not title:
             return "Unknown"
             
-        title_str = self.safe_string(title)
-        brand_str = self.safe_string(brand)
-        title_clean = title_str.lower()
-        brand_lower = brand_str.lower()
-        title_clean = title_clean.replace(brand_lower, "").strip()
-        
-        samsung_patterns = [
-            r'galaxy\s+([a-z]\d+\w*\s*\d*\w*)',
-            r'([a-z]\d+\w*\s*\d*\w*)\s+',
-        ]
-        
-        generic_patterns = [
-            r'(\d+\s*go|\d+\s*gb)',
-            r'(\d+\s*go\s+\d+\s*go\s+ram)',
-            r'([a-z]+\s*\d+\w*)',
-        ]
-        
-        if 'samsung' in brand_lower:
-            patterns = samsung_patterns + generic_patterns
-        else:
-            patterns = generic_patterns
-            
-        for pattern in patterns:
-            match = re.search(pattern, title_clean)
-            if match:
-                model = match.group(1).upper()
-                model = re.sub(r'\s+', ' ', model).strip()
-                return model
-                
-        return "Unknown"
+        return _model_from_title(self.safe_string(title), self.safe_string(brand))
     
     def clean_price(self, price_str: Any) -> float:
         """Nettoie et convertit les prix en float"""
@@ -94,19 +116,15 @@ class BaseExtractor(ABC):
         if isinstance(price_str, (int, float)):
             return float(price_str)
             
-        price_clean = re.sub(r'[^\d,.]', '', self.safe_string(price_str))
-        price_clean = price_clean.replace(',', '.')
-        
-        numbers = re.findall(r'\d+\.?\d*', price_clean)
-        return float(numbers[0]) if numbers else 0.0
+        return _parse_price(self.safe_string(price_str))
     
     def create_product_id(self, brand: str, model: str, title: str) -> str:
         """Crée un ID produit unique"""
-        clean_brand = re.sub(r'[^a-z0-9]', '', self.safe_string(brand).lower())
-        clean_model = re.sub(r'[^a-z0-9]', '', self.safe_string(model).lower())
+        clean_brand = patterns.NON_ALNUM_LOWER.sub('', self.safe_string(brand).lower())
+        clean_model = patterns.NON_ALNUM_LOWER.sub('', self.safe_string(model).lower())
         
         if clean_model == "unknown":
-            title_clean = re.sub(r'[^a-z0-9]', ' ', self.safe_string(title).lower())
+            title_clean = patterns.NON_ALNUM_LOWER.sub(' ', self.safe_string(title).lower())
             words = title_clean.split()
             if len(words) > 1:
                 clean_model = words[1]
@@ -130,7 +148,7 @@ class BaseExtractor(ABC):
             return 0.0
             
         # Supprimer tout sauf les chiffres, points et virgules
-        price_clean = re.sub(r'[^\d,.]', '', str(price_str))
+        price_clean = patterns.PRICE_NOISE.sub('', str(price_str))
         price_clean = price_clean.replace(',', '')
         
         try:
@@ -144,8 +162,8 @@ class BaseExtractor(ABC):
             return "Unknown"
         
         # Supprimer les caractères spéciaux, garder lettres, chiffres, espaces
-        cleaned = re.sub(r'[^a-zA-Z0-9\s]', ' ', str(model))
+        cleaned = patterns.NON_ALNUM_SPACE.sub(' ', str(model))
         # Supprimer les espaces multiples
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip().upper()
+        cleaned = patterns.MULTI_SPACE.sub(' ', cleaned).strip().upper()
         
         return cleaned if cleaned else "Unknown"
\ No newline at end of file
@@ -0,0 +1,65 @@
+# scripts/data_processors/brand_matcher.py
+import re
+from typing import Dict, Optional, Tuple
+
+from .memo import DEFAULT_CACHE_SIZE, LRUCache
+
+# Une marque doit être un mot entier: pas de lettre avant ni après ("iphone13" reste valide)
+_LETTER_BEFORE = r'(?<![^\W\d_])'
+_LETTER_AFTER = r'(?![^\W\d_])'
+_NOT_CACHED = object()
+
+
+def _trie_pattern(words) -> str:
+    """Construit une alternance factorisée en trie: une seule passe sur le texte"""
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        is_end = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        # Quantificateur gourmand: la clé la plus longue est essayée en premier
+        alternation = '(?:' + '|'.join(branches) + ')'
+        return alternation + '?' if is_end else alternation
+
+    return build(trie)
+
+
+class BrandMatcher:
+    """Reconnaît une marque dans un texte avec une regex multi-motifs compilée une fois"""
+
+    def __init__(self, brand_mapping: Dict[str, str], cache_size: int = DEFAULT_CACHE_SIZE):
+        self.brand_mapping = {key.lower(): value for key, value in brand_mapping.items()}
+        self.pattern = re.compile(_LETTER_BEFORE + '(?:' + _trie_pattern(self.brand_mapping) + ')' + _LETTER_AFTER)
+        self._cache = LRUCache('brand_matcher', cache_size)
+
+    def match(self, text: Optional[str]) -> Optional[str]:
+        """Marque normalisée de la première clé trouvée dans le texte, None sinon"""
+        if not text:
+            return None
+        brand = self._cache.get(text, _NOT_CACHED)
+        if brand is _NOT_CACHED:
+            found = self.pattern.search(text.lower())
+            brand = self.brand_mapping[found.group()] if found else None
+            self._cache.put(text, brand)
+        return brand
+
+
+_matchers: Dict[Tuple, BrandMatcher] = {}
+
+
+def get_brand_matcher(brand_mapping: Dict[str, str]) -> BrandMatcher:
+    """Retourne le matcher partagé pour ce mapping (construit au premier appel)"""
+    key = tuple(sorted(brand_mapping.items()))
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = _matchers[key] = BrandMatcher(brand_mapping)
+    return matcher
@@ -0,0 +1,280 @@
+# scripts/data_processors/columnar.py
+"""
+Format colonnaire des jeux de données (produits transformés et catalogue final).
+
+Un jeu de données `<nom>.parquet` est un dossier contenant deux tables Parquet:
+- products.parquet: une ligne par produit
+- offers.parquet: une ligne par offre, reliée à son produit par `product_row`
+
+Les colonnes au type irrégulier d'une source à l'autre (rating, reviews_count, location...)
+sont conservées dans une colonne JSON `extra`: la reconstruction des produits est sans perte
+(types compris: un prix entier est aussi gardé dans `extra`, une clé `offers` absente y est notée).
+"""
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .json_loader import iter_json_records, load_json_file
+from .manifest import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+PARQUET_COMPRESSION = 'zstd'
+# Offres relues par lot lors d'un parcours produit par produit (`DatasetReader.iter_products`)
+OFFER_BATCH_ROWS = 64 * 1024
+
+# Colonnes typées (les autres clés vont dans `extra`)
+PRODUCT_STRING_COLUMNS = ('product_id', 'brand', 'model', 'product_name')
+PRODUCT_JSON_COLUMNS = ('specifications', 'metadata')
+OFFER_STRING_COLUMNS = ('source', 'currency', 'condition', 'seller_type', 'url', 'scraped_at')
+OFFER_FLOAT_COLUMNS = ('price',)
+
+# Colonnes à faible cardinalité encodées par dictionnaire
+DICTIONARY_COLUMNS = ['brand', 'source', 'condition', 'currency', 'seller_type']
+
+
+def dataset_path(stem: Path, output_format: str = 'json') -> Path:
+    """Chemin du jeu de données `stem` dans le format demandé ('json' ou 'parquet')"""
+    return Path(stem).with_suffix('.parquet' if output_format == 'parquet' else '.json')
+
+
+def is_columnar(path) -> bool:
+    return Path(path).suffix == '.parquet'
+
+
+def _typed_column(records: List[Dict], key: str) -> List:
+    """Colonne typée `key` (None si la valeur est absente ou hors type, comme dans `extra`)"""
+    values = [record.get(key) for record in records]
+    if key in PRODUCT_JSON_COLUMNS:
+        return [None if value is None else json.dumps(value, ensure_ascii=False) for value in values]
+    if key in OFFER_FLOAT_COLUMNS:
+        return [value if type(value) is float else float(value) if type(value) is int else None
+                for value in values]
+    return [value if type(value) is str else None for value in values]
+
+
+def _split_typed(record: Dict, string_columns, float_columns=(), json_columns=()) -> Tuple[Dict, Dict]:
+    """
+    Sépare les valeurs qui respectent le type de leur colonne du reste (extra).
+    Les None explicites vont aussi dans extra: une colonne nulle signifie une clé absente.
+    """
+    row, extra = {}, {}
+    for key, value in record.items():
+        if key in string_columns and isinstance(value, str):
+            row[key] = value
+        elif (key in float_columns and isinstance(value, (int, float))
+              and not isinstance(value, bool)):
+            row[key] = float(value)
+            if type(value) is not float:
+                extra[key] = value  # Entier restitué tel quel à la lecture
+        elif key in json_columns and value is not None:
+            row[key] = json.dumps(value, ensure_ascii=False)
+        else:
+            extra[key] = value
+    return row, extra
+
+
+def flatten_products(products: List[Dict]) -> Tuple[Dict[str, List], Dict[str, List]]:
+    """Colonnes des tables products et offers pour une liste de produits"""
+    product_names = PRODUCT_STRING_COLUMNS + PRODUCT_JSON_COLUMNS + ('extra',)
+    offer_names = ('product_row', 'product_id') + OFFER_STRING_COLUMNS + OFFER_FLOAT_COLUMNS + ('extra',)
+    product_cols = {name: [] for name in product_names}
+    offer_cols = {name: [] for name in offer_names}
+
+    for row_number, product in enumerate(products):
+        fields = {key: value for key, value in product.items() if key != 'offers'}
+        row, extra = _split_typed(fields, PRODUCT_STRING_COLUMNS, json_columns=PRODUCT_JSON_COLUMNS)
+        if 'offers' not in product:
+            extra['offers'] = None  # Clé absente, retirée à la lecture
+        for name in PRODUCT_STRING_COLUMNS + PRODUCT_JSON_COLUMNS:
+            product_cols[name].append(row.get(name))
+        product_cols['extra'].append(json.dumps(extra, ensure_ascii=False) if extra else None)
+
+        for offer in product.get('offers', []):
+            row, extra = _split_typed(offer, OFFER_STRING_COLUMNS, OFFER_FLOAT_COLUMNS)
+            offer_cols['product_row'].append(row_number)
+            offer_cols['product_id'].append(product.get('product_id'))
+            for name in OFFER_STRING_COLUMNS + OFFER_FLOAT_COLUMNS:
+                offer_cols[name].append(row.get(name))
+            offer_cols['extra'].append(json.dumps(extra, ensure_ascii=False) if extra else None)
+
+    return product_cols, offer_cols
+
+
+def write_parquet_dataset(products: List[Dict], path: Path) -> Path:
+    """Écrit les tables products/offers compressées dans le dossier `path`"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    product_cols, offer_cols = flatten_products(products)
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    product_schema = pa.schema(
+        [(name, pa.string()) for name in PRODUCT_STRING_COLUMNS + PRODUCT_JSON_COLUMNS + ('extra',)]
+    )
+    offer_schema = pa.schema(
+        [('product_row', pa.int32()), ('product_id', pa.string())]
+        + [(name, pa.string()) for name in OFFER_STRING_COLUMNS]
+        + [(name, pa.float64()) for name in OFFER_FLOAT_COLUMNS]
+        + [('extra', pa.string())]
+    )
+    for name, columns, schema in (('products', product_cols, product_schema),
+                                  ('offers', offer_cols, offer_schema)):
+        table = pa.table(columns, schema=schema)
+        dictionary = [column for column in DICTIONARY_COLUMNS if column in columns]
+        tmp_path = path / f"{name}.parquet.tmp"
+        pq.write_table(table, tmp_path, compression=PARQUET_COMPRESSION, use_dictionary=dictionary)
+        tmp_path.replace(path / f"{name}.parquet")
+    return path
+
+
+def save_dataset(products: List[Dict], stem: Path, output_format: str = 'json') -> Path:
+    """Sauvegarde un jeu de données en JSON (écriture atomique) ou en Parquet, retourne son chemin"""
+    path = dataset_path(stem, output_format)
+    if output_format == 'parquet':
+        return write_parquet_dataset(products, path)
+    write_json_atomic(path, products)
+    return path
+
+
+class DatasetReader:
+    """Lecture d'un jeu de données JSON ou Parquet, colonne par colonne"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.columnar = is_columnar(self.path)
+        self._products: Optional[List[Dict]] = None
+        self._flat: Optional[Tuple[Dict, Dict]] = None
+        self._json_cache: Dict[Tuple[str, str], List] = {}
+        # Lecteur partagé entre threads (destinations de stockage): un seul décodage
+        self._lock = threading.RLock()
+
+    def _json_products(self) -> List[Dict]:
+        with self._lock:
+            if self._products is None:
+                self._products = load_json_file(self.path)
+            return self._products
+
+    def _extract_json_columns(self, table: str, names: List[str]):
+        """Extrait en une passe les colonnes demandées des produits JSON (`extra` aplatit tout)"""
+        products = self._json_products()
+        if 'extra' in names:
+            if self._flat is None:
+                self._flat = flatten_products(products)
+            flat = self._flat[0 if table == 'products' else 1]
+            for name in names:
+                self._json_cache[(table, name)] = flat[name]
+            return
+
+        if table == 'products':
+            columns = {name: _typed_column(products, name) for name in names}
+        else:
+            offers = [offer for product in products for offer in product.get('offers', ())]
+            columns = {name: _typed_column(offers, name) for name in names
+                       if name not in ('product_row', 'product_id')}
+            if 'product_row' in names:
+                columns['product_row'] = [row for row, product in enumerate(products)
+                                          for _ in product.get('offers', ())]
+            if 'product_id' in names:
+                columns['product_id'] = [product.get('product_id') for product in products
+                                         for _ in product.get('offers', ())]
+        for name in names:
+            self._json_cache[(table, name)] = columns[name]
+
+    def num_rows(self, table: str) -> int:
+        """Nombre de lignes d'une table (métadonnées Parquet seulement)"""
+        if self.columnar:
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(self.path / f"{table}.parquet").metadata.num_rows
+        if table == 'products':
+            return len(self._json_products())
+        return sum(len(product.get('offers', [])) for product in self._json_products())
+
+    def columns(self, table: str, columns: List[str]) -> Dict[str, List]:
+        """Colonnes demandées de la table 'products' ou 'offers' (les autres ne sont pas lues)"""
+        if self.columnar:
+            import pyarrow.parquet as pq
+            return pq.read_table(self.path / f"{table}.parquet", columns=columns, memory_map=True).to_pydict()
+        with self._lock:
+            missing = [name for name in columns if (table, name) not in self._json_cache]
+            if missing:
+                self._extract_json_columns(table, missing)
+            return {name: self._json_cache[(table, name)] for name in columns}
+
+    def frame(self, table: str, columns: List[str]):
+        """Colonnes demandées sous forme de DataFrame (Parquet: sans passer par des listes Python)"""
+        import pandas as pd
+        if self.columnar:
+            import pyarrow.parquet as pq
+            return pq.read_table(self.path / f"{table}.parquet", columns=columns, memory_map=True).to_pandas()
+        return pd.DataFrame(self.columns(table, columns))
+
+    def products(self) -> List[Dict]:
+        """Produits complets avec leurs offres imbriquées"""
+        if not self.columnar:
+            return self._json_products()
+        with self._lock:
+            if self._products is None:
+                self._products = list(self._iter_columnar_products())
+            return self._products
+
+    def iter_products(self) -> Iterator[Dict]:
+        """Produits un par un sans garder le catalogue (Parquet: offres lues par lots)"""
+        if self._products is not None:
+            return iter(self._products)
+        if not self.columnar:
+            return iter_json_records(self.path)
+        return self._iter_columnar_products(batch_size=OFFER_BATCH_ROWS)
+
+    def _iter_columnar_products(self, batch_size: Optional[int] = None) -> Iterator[Dict]:
+        """Produits reconstruits dans l'ordre des lignes (les offres suivent `product_row`)"""
+        import pyarrow.parquet as pq
+        products_cols = self.columns('products', list(PRODUCT_STRING_COLUMNS + PRODUCT_JSON_COLUMNS) + ['extra'])
+        offer_names = ['product_row'] + list(OFFER_STRING_COLUMNS + OFFER_FLOAT_COLUMNS) + ['extra']
+        if batch_size is None:
+            batches = [self.columns('offers', offer_names)]
+        else:
+            offers_file = pq.ParquetFile(self.path / "offers.parquet")
+            batches = (batch.to_pydict() for batch in offers_file.iter_batches(batch_size, columns=offer_names))
+
+        total = len(products_cols['product_id'])
+        next_row, current = 0, None
+        for offers_cols in batches:
+            for i, row in enumerate(offers_cols['product_row']):
+                while next_row <= row:
+                    if current is not None:
+                        yield current
+                    current = _columnar_product(products_cols, next_row)
+                    next_row += 1
+                offer = {name: offers_cols[name][i] for name in OFFER_STRING_COLUMNS + OFFER_FLOAT_COLUMNS
+                         if offers_cols[name][i] is not None}
+                if offers_cols['extra'][i]:
+                    offer.update(json.loads(offers_cols['extra'][i]))
+                current['offers'].append(offer)
+        if current is not None:
+            yield current
+        for row in range(next_row, total):
+            yield _columnar_product(products_cols, row)
+
+
+def _columnar_product(products_cols: Dict[str, List], row: int) -> Dict:
+    """Produit de la ligne `row` de la table products, offres à compléter"""
+    product = {}
+    for name in PRODUCT_STRING_COLUMNS + PRODUCT_JSON_COLUMNS:
+        value = products_cols[name][row]
+        if value is not None:
+            product[name] = json.loads(value) if name in PRODUCT_JSON_COLUMNS else value
+    product['offers'] = []
+    if products_cols['extra'][row]:
+        product.update(json.loads(products_cols['extra'][row]))
+    if product['offers'] is None:
+        del product['offers']
+    return product
+
+
+def load_dataset(path) -> List[Dict]:
+    """Produits d'un jeu de données JSON ou Parquet"""
+    return DatasetReader(path).products()
@@ -3,6 +3,9 @@ from .base_extractor import BaseExtractor
 from typing import Dict, List, Any  # ⬅️ IMPORT MANQUANT !
 from pathlib import Path
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 class ElectroplanetExtractor(BaseExtractor):
     """Extracteur spécialisé pour Electroplanet"""
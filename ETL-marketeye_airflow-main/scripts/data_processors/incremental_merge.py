@@ -0,0 +1,190 @@
+# scripts/data_processors/incremental_merge.py
+import copy
+import logging
+import shutil
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .columnar import load_dataset
+from .json_loader import json_loads
+from .manifest import file_fingerprint, file_lock, write_json_atomic
+from .merge import merge_products
+
+logger = logging.getLogger(__name__)
+
+MERGE_STATE_VERSION = 2
+# Compartiments (crc32 du product_id) de l'état fusionné et des contributions par source:
+# une fusion ne lit et ne réécrit que les compartiments des produits touchés
+MERGE_BUCKETS = 64
+
+
+def bucket_of(pid: str) -> str:
+    """Compartiment d'un product_id (stable d'un processus à l'autre, contrairement à hash())"""
+    return f"{zlib.crc32(pid.encode('utf-8')) % MERGE_BUCKETS:02d}"
+
+
+class IncrementalMerger:
+    """
+    Fusion incrémentale du catalogue: l'état fusionné (par product_id), les contributions
+    de chaque source et leurs empreintes sont persistés dans `state_dir`, les deux premiers
+    répartis en MERGE_BUCKETS compartiments JSON (`merged/<n>.json`, `partials/<source>/<n>.json`).
+    Seules les sources dont le fichier a changé sont rechargées; leurs contributions sont
+    comparées à l'état précédent et seuls les produits réellement modifiés (ajoutés, changés
+    ou retirés) sont refusionnés. Seuls leurs compartiments sont lus et réécrits; le catalogue
+    retourné est assemblé en lisant les compartiments fusionnés, sans les réécrire.
+
+    L'état est partagé par tous les runs: `merge` le lit et le réécrit sous un verrou de
+    fichier, deux runs concurrents (backfills) fusionnent l'un après l'autre. Un run qui
+    suit un backfill voit des empreintes différentes et refusionne les sources concernées.
+    """
+
+    def __init__(self, state_dir: Path, sources: List[str],
+                 merge_fn: Callable[[List[Dict]], List[Dict]] = merge_products,
+                 prepare: Optional[Callable[[List[Dict]], None]] = None):
+        self.state_dir = Path(state_dir)
+        self.sources = list(sources)  # Ordre canonique de fusion
+        self.merge_fn = merge_fn
+        self.prepare = prepare
+        self.state_path = self.state_dir / "state.json"
+        self.merged_dir = self.state_dir / "merged"
+        self.partials_dir = self.state_dir / "partials"
+        self.lock_path = self.state_dir / ".lock"
+
+    def _merged_path(self, bucket: str) -> Path:
+        return self.merged_dir / f"{bucket}.json"
+
+    def _partial_path(self, source: str, bucket: str) -> Path:
+        return self.partials_dir / source / f"{bucket}.json"
+
+    @staticmethod
+    def _load_bucket(path: Path) -> Dict:
+        return json_loads(path.read_bytes()) if path.exists() else {}
+
+    @staticmethod
+    def _write_bucket(path: Path, data: Dict):
+        """Réécrit un compartiment (supprimé s'il devient vide)"""
+        if data:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(path, data)
+        elif path.exists():
+            path.unlink()
+
+    def _load_state(self) -> Optional[Dict]:
+        """État persistant, None s'il est absent, illisible ou d'une autre version"""
+        if not self.state_path.exists():
+            return None
+        try:
+            state = json_loads(self.state_path.read_bytes())
+        except Exception as e:
+            logger.warning(f"⚠️ État de fusion illisible, reconstruction complète: {e}")
+            return None
+        if (state.get('version') != MERGE_STATE_VERSION or state.get('sources') != self.sources
+                or state.get('buckets') != MERGE_BUCKETS):
+            logger.info("🔁 État de fusion obsolète, reconstruction complète")
+            return None
+        return state
+
+    def _reset(self):
+        """Efface l'état précédent (compartiments, fichiers de l'ancien format)"""
+        for directory in (self.merged_dir, self.partials_dir):
+            if directory.exists():
+                shutil.rmtree(directory)
+        for legacy in [self.state_dir / "merged.json", *self.state_dir.glob("*_partial.json")]:
+            legacy.unlink(missing_ok=True)
+
+    def _read_source(self, source: str, path: Optional[Path]) -> Dict[str, List[Dict]]:
+        """Contributions d'une source regroupées par product_id, dans l'ordre du fichier"""
+        if not path or not Path(path).exists():
+            logger.warning(f"⚠️ Fichier {source} non trouvé")
+            return {}
+        products = load_dataset(path)
+        if self.prepare:
+            self.prepare(products)
+        partial: Dict[str, List[Dict]] = {}
+        for product in products:
+            pid = product.get('product_id')
+            if not pid:
+                logger.warning("Produit sans ID, ignoré")
+                continue
+            partial.setdefault(pid, []).append(product)
+        logger.info(f"📁 {source}: {len(products)} produits chargés")
+        return partial
+
+    def merge(self, source_paths: Dict[str, Optional[Path]]) -> Tuple[List[Dict], List[str]]:
+        """Catalogue fusionné à jour et liste des sources qui ont changé depuis le dernier run"""
+        with file_lock(self.lock_path):
+            return self._merge(source_paths)
+
+    def _merge(self, source_paths: Dict[str, Optional[Path]]) -> Tuple[List[Dict], List[str]]:
+        state = self._load_state()
+        fingerprints = {source: file_fingerprint(source_paths.get(source)) for source in self.sources}
+
+        if state is None:
+            state = {'fingerprints': {}, 'index': {}}
+            self._reset()
+
+        changed = [s for s in self.sources if state['fingerprints'].get(s, '') != fingerprints[s]]
+        for source in self.sources:
+            if source not in changed:
+                logger.info(f"♻️ {source}: inchangé, état réutilisé")
+        if not changed:
+            return self._ordered(state['index']), []
+
+        # 1. Recharger les sources modifiées, comparer leurs contributions compartiment par compartiment
+        fresh: Dict[str, Dict[str, Dict[str, List[Dict]]]] = {}
+        touched: Dict[str, Set[str]] = {}
+        for source in changed:
+            partial = self._read_source(source, source_paths.get(source))
+            buckets: Dict[str, Dict[str, List[Dict]]] = {}
+            for pid, contributions in partial.items():
+                buckets.setdefault(bucket_of(pid), {})[pid] = contributions
+            previous = {bucket_of(pid) for pid in state['index'].get(source, [])}
+            for bucket in previous.union(buckets):
+                old = self._load_bucket(self._partial_path(source, bucket)) if bucket in previous else {}
+                new = buckets.get(bucket, {})
+                modified = {pid for pid in old.keys() | new.keys() if old.get(pid) != new.get(pid)}
+                if modified:
+                    touched.setdefault(bucket, set()).update(modified)
+                    self._write_bucket(self._partial_path(source, bucket), new)
+            fresh[source] = buckets
+            state['index'][source] = list(partial)
+
+        # 2. Refusionner uniquement les produits touchés, dans l'ordre canonique des sources
+        for bucket, pids in touched.items():
+            partials = {source: fresh[source].get(bucket, {}) if source in fresh
+                        else self._load_bucket(self._partial_path(source, bucket))
+                        for source in self.sources}
+            merged = self._load_bucket(self._merged_path(bucket))
+            for pid in pids:
+                contributions = [product
+                                 for source in self.sources
+                                 for product in partials[source].get(pid, [])]
+                result = self.merge_fn(copy.deepcopy(contributions)) if contributions else []
+                if result:
+                    merged[pid] = result[0]
+                else:
+                    merged.pop(pid, None)
+            self._write_bucket(self._merged_path(bucket), merged)
+
+        state.update(version=MERGE_STATE_VERSION, sources=self.sources, buckets=MERGE_BUCKETS,
+                     fingerprints=fingerprints)
+        write_json_atomic(self.state_path, state)
+
+        logger.info(f"🔄 Fusion incrémentale: {len(changed)} source(s) modifiée(s), "
+                    f"{sum(len(pids) for pids in touched.values())} produits refusionnés "
+                    f"({len(touched)}/{MERGE_BUCKETS} compartiments réécrits)")
+        return self._ordered(state['index']), changed
+
+    def _ordered(self, index: Dict[str, List[str]]) -> List[Dict]:
+        """Produits dans l'ordre d'une fusion complète (première apparition par source)"""
+        merged: Dict[str, Dict] = {}
+        for path in sorted(self.merged_dir.glob("*.json")) if self.merged_dir.exists() else []:
+            merged.update(json_loads(path.read_bytes()))
+        products, seen = [], set()
+        for source in self.sources:
+            for pid in index.get(source, []):
+                if pid not in seen and pid in merged:
+                    seen.add(pid)
+                    products.append(merged[pid])
+        return products
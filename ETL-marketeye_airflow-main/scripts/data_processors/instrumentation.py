@@ -0,0 +1,322 @@
+# scripts/data_processors/instrumentation.py
+"""
+Mesures par étape du pipeline: temps mur, temps CPU, enregistrements/s, octets lus et
+écrits, pic de mémoire (RSS).
+
+Une étape est un bloc `with stage('extract', source='avito') as metrics:`. Les octets sont
+comptés par `record_read` / `record_written` sur l'étape active (le registre des artefacts
+les appelle lui-même). À la sortie, la mesure est:
+- journalisée (une ligne ⏱️),
+- envoyée en StatsD (UDP, sans attente ni erreur bloquante) si un client est fourni,
+- écrite en JSON dans `output_dir`: `summarize_stages` agrège ensuite les mesures de toutes
+  les tâches du run, `to_openmetrics` les expose au format texte OpenMetrics.
+
+Le pic RSS est celui du processus depuis le début de l'étape de premier niveau (Linux:
+compteur VmHWM remis à zéro via /proc/self/clear_refs), sinon depuis le début du processus.
+Le temps CPU est celui du processus et des processus enfants terminés; dans un thread
+secondaire (destinations de stockage en parallèle), celui du thread seul.
+"""
+import contextvars
+import logging
+import os
+import re
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .json_loader import json_loads
+from .manifest import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+# Mesures agrégées par étape et par source, dans l'ordre d'exposition
+SUMMED_FIELDS = ('wall_seconds', 'cpu_seconds', 'records', 'bytes_read', 'bytes_written')
+
+_current: contextvars.ContextVar = contextvars.ContextVar('marketeye_stage', default=None)
+_active_lock = threading.Lock()
+_active_stages = 0
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """Pic RSS du processus (VmHWM sous Linux, ru_maxrss ailleurs)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return None
+
+
+def _reset_peak_rss():
+    """Remet le pic RSS au niveau actuel (Linux ≥ 4.0), sans effet ailleurs"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _cpu_seconds(main_thread: bool) -> float:
+    if not main_thread:
+        return time.thread_time()
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class StageMetrics:
+    """Mesures d'une exécution d'étape (une tâche, une source, éventuellement un fichier)"""
+
+    def __init__(self, stage: str, source: Optional[str] = None, labels: Optional[Dict[str, str]] = None):
+        self.stage = stage
+        self.source = source
+        self.labels = dict(labels or {})
+        self.records = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss_bytes: Optional[int] = None
+        self.status = 'running'
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def add_read(self, size: int):
+        with self._lock:
+            self.bytes_read += size
+
+    def add_written(self, size: int):
+        with self._lock:
+            self.bytes_written += size
+
+    @property
+    def records_per_sec(self) -> Optional[float]:
+        return self.records / self.wall_seconds if self.records and self.wall_seconds > 0 else None
+
+    def to_dict(self) -> Dict:
+        return {
+            'stage': self.stage,
+            'source': self.source,
+            'labels': self.labels,
+            'status': self.status,
+            'started_at': self.started_at,
+            'wall_seconds': round(self.wall_seconds, 4),
+            'cpu_seconds': round(self.cpu_seconds, 4),
+            'records': self.records,
+            'records_per_sec': round(self.records_per_sec, 1) if self.records_per_sec else None,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'peak_rss_bytes': self.peak_rss_bytes,
+        }
+
+    def describe(self) -> str:
+        name = f"{self.stage}[{self.source}]" if self.source else self.stage
+        rate = f" ({self.records_per_sec:.0f}/s)" if self.records_per_sec else ""
+        rss = f", RSS max {self.peak_rss_bytes / 1024 / 1024:.0f} Mo" if self.peak_rss_bytes else ""
+        return (f"{name}: {self.wall_seconds:.2f}s mur, {self.cpu_seconds:.2f}s CPU, "
+                f"{self.records} enregistrements{rate}, lu {self.bytes_read / 1024 / 1024:.1f} Mo, "
+                f"écrit {self.bytes_written / 1024 / 1024:.1f} Mo{rss}")
+
+
+def current_stage() -> Optional[StageMetrics]:
+    """Étape active dans le contexte courant (None hors d'une étape)"""
+    return _current.get()
+
+
+def record_read(size: int):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_read(size)
+
+
+def record_written(size: int):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_written(size)
+
+
+class StatsdClient:
+    """Client StatsD minimal: un paquet UDP par étape, les erreurs réseau sont ignorées"""
+
+    def __init__(self, host: str, port: int = 8125, prefix: str = 'marketeye'):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, metrics: StageMetrics):
+        name = '.'.join(_metric_part(part) for part in (self.prefix, metrics.stage, metrics.source) if part)
+        lines = [
+            f"{name}.wall_ms:{metrics.wall_seconds * 1000:.1f}|ms",
+            f"{name}.cpu_ms:{metrics.cpu_seconds * 1000:.1f}|ms",
+            f"{name}.records:{metrics.records}|c",
+            f"{name}.bytes_read:{metrics.bytes_read}|c",
+            f"{name}.bytes_written:{metrics.bytes_written}|c",
+        ]
+        if metrics.records_per_sec:
+            lines.append(f"{name}.records_per_sec:{metrics.records_per_sec:.1f}|g")
+        if metrics.peak_rss_bytes:
+            lines.append(f"{name}.peak_rss_bytes:{metrics.peak_rss_bytes}|g")
+        if metrics.status != 'success':
+            lines.append(f"{name}.failed:1|c")
+        try:
+            self._socket.sendto('\n'.join(lines).encode('utf-8'), self.address)
+        except OSError as e:
+            logger.debug(f"StatsD indisponible ({self.address}): {e}")
+
+
+@lru_cache(maxsize=None)
+def get_statsd(host: str, port: int, prefix: str) -> Optional[StatsdClient]:
+    """Client StatsD partagé du processus (None si aucun hôte n'est configuré)"""
+    return StatsdClient(host, port, prefix) if host else None
+
+
+def _metric_part(value: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', str(value))
+
+
+@contextmanager
+def stage(name: str, source: Optional[str] = None, output_dir: Optional[Path] = None,
+          statsd: Optional[StatsdClient] = None, **labels) -> Iterator[StageMetrics]:
+    """Mesure le bloc comme une étape `name` (optionnellement par source)"""
+    global _active_stages
+    metrics = StageMetrics(name, source, {key: str(value) for key, value in labels.items()})
+    main_thread = threading.current_thread() is threading.main_thread()
+    with _active_lock:
+        # Pic RSS remis à zéro par l'étape de premier niveau seulement: les étapes imbriquées le partagent
+        if _active_stages == 0:
+            _reset_peak_rss()
+        _active_stages += 1
+    token = _current.set(metrics)
+    wall_start = time.perf_counter()
+    cpu_start = _cpu_seconds(main_thread)
+    try:
+        yield metrics
+        metrics.status = 'success'
+    except BaseException:
+        metrics.status = 'failed'
+        raise
+    finally:
+        metrics.wall_seconds = time.perf_counter() - wall_start
+        metrics.cpu_seconds = _cpu_seconds(main_thread) - cpu_start
+        metrics.peak_rss_bytes = _peak_rss_bytes()
+        _current.reset(token)
+        with _active_lock:
+            _active_stages -= 1
+        _publish(metrics, output_dir, statsd)
+
+
+def _publish(metrics: StageMetrics, output_dir: Optional[Path], statsd: Optional[StatsdClient]):
+    """Les mesures ne font jamais échouer l'étape mesurée"""
+    logger.info(f"⏱️ {metrics.describe()}")
+    try:
+        if statsd is not None:
+            statsd.send(metrics)
+        if output_dir is not None:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            parts = [metrics.stage, metrics.source, *metrics.labels.values(), str(os.getpid()), str(time.time_ns())]
+            write_json_atomic(output_dir / f"{'-'.join(_metric_part(part) for part in parts if part)}.json",
+                              metrics.to_dict())
+    except Exception as e:
+        logger.warning(f"⚠️ Mesures de {metrics.stage} non publiées: {e}")
+
+
+def _aggregate(records: List[Dict]) -> Dict:
+    totals = {field: sum(record[field] or 0 for record in records) for field in SUMMED_FIELDS}
+    peaks = [record['peak_rss_bytes'] for record in records if record.get('peak_rss_bytes')]
+    starts = [record['started_at'] for record in records]
+    ends = [record['started_at'] + record['wall_seconds'] for record in records]
+    totals.update(
+        wall_seconds=round(totals['wall_seconds'], 4),
+        cpu_seconds=round(totals['cpu_seconds'], 4),
+        # Durée de bout en bout (tâches mappées en parallèle: inférieure à la somme des temps mur)
+        span_seconds=round(max(ends) - min(starts), 4),
+        records_per_sec=round(totals['records'] / totals['wall_seconds'], 1)
+        if totals['records'] and totals['wall_seconds'] > 0 else None,
+        peak_rss_bytes=max(peaks) if peaks else None,
+        tasks=len(records),
+        failed=sum(1 for record in records if record['status'] != 'success'),
+    )
+    return totals
+
+
+def summarize_stages(metrics_dir: Path, run_id: Optional[str] = None) -> Dict:
+    """Résumé du run: mesures agrégées par étape, puis par source, dans l'ordre d'exécution"""
+    metrics_dir = Path(metrics_dir)
+    records = [json_loads(path.read_bytes()) for path in metrics_dir.glob("*.json")] if metrics_dir.exists() else []
+    records.sort(key=lambda record: record['started_at'])
+
+    stages: Dict[str, Dict] = {}
+    by_stage: Dict[str, List[Dict]] = {}
+    for record in records:
+        by_stage.setdefault(record['stage'], []).append(record)
+    for name, stage_records in by_stage.items():
+        summary = _aggregate(stage_records)
+        by_source: Dict[str, List[Dict]] = {}
+        for record in stage_records:
+            if record.get('source'):
+                by_source.setdefault(record['source'], []).append(record)
+        if by_source:
+            summary['sources'] = {source: _aggregate(source_records) for source, source_records in by_source.items()}
+        stages[name] = summary
+
+    return {
+        'run_id': run_id,
+        'generated_at': datetime.now().isoformat(),
+        'stages': stages,
+        'totals': _aggregate(records) if records else {},
+    }
+
+
+# Mesures exposées en OpenMetrics: (nom, clé du résumé, aide)
+OPENMETRICS_FIELDS = (
+    ('wall_seconds', 'wall_seconds', "Temps mur cumulé des tâches de l'étape"),
+    ('span_seconds', 'span_seconds', "Durée de bout en bout de l'étape"),
+    ('cpu_seconds', 'cpu_seconds', "Temps CPU cumulé de l'étape"),
+    ('records', 'records', "Enregistrements produits par l'étape"),
+    ('records_per_second', 'records_per_sec', "Débit en enregistrements par seconde de temps mur"),
+    ('read_bytes', 'bytes_read', "Octets lus"),
+    ('written_bytes', 'bytes_written', "Octets écrits"),
+    ('peak_rss_bytes', 'peak_rss_bytes', "Pic de mémoire résidente"),
+    ('tasks', 'tasks', "Tâches mesurées"),
+    ('failed_tasks', 'failed', "Tâches en échec"),
+)
+
+
+def _label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_openmetrics(summary: Dict, prefix: str = 'marketeye') -> str:
+    """Résumé au format texte OpenMetrics (une série par étape et par source)"""
+    rows = []
+    for name, stage_summary in summary['stages'].items():
+        rows.append(({'stage': name}, stage_summary))
+        for source, source_summary in stage_summary.get('sources', {}).items():
+            rows.append(({'stage': name, 'source': source}, source_summary))
+
+    lines = []
+    for metric, key, help_text in OPENMETRICS_FIELDS:
+        family = f"{prefix}_stage_{metric}"
+        lines.append(f"# TYPE {family} gauge")
+        lines.append(f"# HELP {family} {help_text}")
+        for labels, values in rows:
+            if values.get(key) is None:
+                continue
+            labels = {'run_id': summary.get('run_id') or '', **labels}
+            label_text = ','.join(f'{label}="{_label_value(value)}"' for label, value in labels.items())
+            lines.append(f"{family}{{{label_text}}} {values[key]}")
+    lines.append("# EOF")
+    return '\n'.join(lines) + '\n'
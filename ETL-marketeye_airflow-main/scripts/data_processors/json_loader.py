@@ -0,0 +1,233 @@
+# scripts/data_processors/json_loader.py
+import json
+import re
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Décodeur JSON le plus rapide disponible (tous acceptent des bytes)
+try:
+    import orjson
+    JSON_BACKEND = 'orjson'
+    json_loads = orjson.loads
+except ImportError:
+    try:
+        import ujson
+        JSON_BACKEND = 'ujson'
+        json_loads = ujson.loads
+    except ImportError:
+        JSON_BACKEND = 'json'
+        json_loads = json.loads
+
+JSON_READ_CHUNK_SIZE = 256 * 1024
+# En dessous de cette taille, un tableau est décodé d'un bloc par le backend rapide
+JSON_STREAM_THRESHOLD = 8 * 1024 * 1024
+
+# Les éléments d'un tableau sont décodés par le scanner C de la stdlib (raw_decode),
+# plus rapide qu'un découpage des éléments en Python suivi d'un appel au backend
+_ARRAY_DECODER = json.JSONDecoder()
+_JSON_SEPARATORS = re.compile(r'[\s,]*')
+# Caractères structurants parcourus pour sauter un élément invalide
+_SKIP_TOKENS = re.compile(r'[][{}",\\]')
+# Caractères de fin de buffer où une erreur peut venir d'un élément coupé (ex: '\u00', 'fal', '1.5e')
+_TRUNCATION_MARGIN = 32
+_NEED_MORE = object()
+
+
+def detect_layout(file_path: Path) -> str:
+    """Détecte le format d'un fichier: 'array', 'jsonl' ou 'empty'"""
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(JSON_READ_CHUNK_SIZE)
+            if not chunk:
+                return 'empty'
+            stripped = chunk.lstrip()
+            if stripped:
+                return 'array' if stripped[:1] == b'[' else 'jsonl'
+
+
+def load_json_file(file_path: Path) -> List[Dict]:
+    """Charge un fichier JSON complet (tableau ou JSON Lines) en une liste, vide si illisible"""
+    try:
+        return _read_records(file_path)
+    except OSError as e:
+        logger.error(f"Erreur chargement {file_path.name}: {e}")
+        return []
+
+
+def _read_records(file_path: Path) -> List[Dict]:
+    """Comme `load_json_file`, mais une erreur de lecture est propagée"""
+    content = file_path.read_bytes()
+
+    if not content.strip():
+        logger.warning(f"Fichier vide: {file_path.name}")
+        return []
+
+    if content.lstrip()[:1] == b'[':
+        try:
+            return json_loads(content)
+        except ValueError as e:
+            # Repli sur la lecture élément par élément pour isoler les éléments invalides
+            logger.warning(f"Tableau JSON invalide {file_path.name}: {e}")
+            del content
+            return list(iter_json_records(file_path, stream_threshold=0))
+
+    del content
+    return list(iter_json_records(file_path, stream_threshold=0))
+
+
+def iter_json_records(file_path: Path, chunk_size: int = JSON_READ_CHUNK_SIZE,
+                      stream_threshold: int = JSON_STREAM_THRESHOLD) -> Iterator[Any]:
+    """Itère sur les enregistrements d'un fichier JSON (tableau ou JSON Lines) sans le charger en entier"""
+    try:
+        layout = detect_layout(file_path)
+
+        if layout == 'empty':
+            logger.warning(f"Fichier vide: {file_path.name}")
+            return
+
+        if layout == 'array' and file_path.stat().st_size <= stream_threshold:
+            records = _read_records(file_path)
+            # Libérer chaque enregistrement dès qu'il a été consommé
+            records.reverse()
+            while records:
+                yield records.pop()
+        elif layout == 'array':
+            with open(file_path, 'r', encoding='utf-8') as f:
+                yield from _iter_json_array(f, file_path, chunk_size)
+        else:
+            with open(file_path, 'rb') as f:
+                yield from _iter_json_lines(f, file_path)
+    except Exception as e:
+        # Propager: une lecture interrompue ne doit pas passer pour la fin du fichier (ni être mise en cache)
+        logger.error(f"Erreur chargement {file_path.name}: {e}")
+        raise
+
+
+def _iter_json_lines(f, file_path: Path) -> Iterator[Any]:
+    """Format ligne par ligne: un objet JSON par ligne"""
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json_loads(line)
+        except ValueError as e:
+            logger.warning(f"Ligne JSON invalide {file_path.name}:{line_number}: {e}")
+            continue
+        yield record
+
+
+def _is_truncated(error: json.JSONDecodeError, buffer: str, eof: bool) -> bool:
+    """
+    Vrai si l'erreur peut venir de la fin du buffer (élément coupé), pas d'un élément invalide.
+    Avant la fin du fichier, une erreur dans les derniers caractères (littéral, nombre ou
+    \\uXXXX coupé) est relue avec la suite; à la fin du fichier, seule la fin du texte compte.
+    """
+    if error.msg.startswith('Unterminated string'):
+        return True
+    return error.pos >= len(buffer) - (0 if eof else _TRUNCATION_MARGIN)
+
+
+def _skip_invalid_element(f, buffer: str, pos: int, chunk_size: int) -> Tuple[str, int, int, int]:
+    """
+    Avance de l'élément invalide en `pos` jusqu'à la ',' ou au ']' de premier niveau qui le suit,
+    en lisant la suite du fichier si besoin (le texte parcouru est abandonné: mémoire bornée).
+    Renvoie (buffer, position du séparateur, caractères abandonnés, lignes abandonnées).
+    """
+    depth = 0
+    in_string = False
+    escaped = False
+    discarded = 0
+    newlines = 0
+    while True:
+        i = pos
+        if escaped:
+            i += 1
+            escaped = False
+        while True:
+            match = _SKIP_TOKENS.search(buffer, i)
+            if match is None:
+                break
+            char = match.group()
+            i = match.end()
+            if in_string:
+                if char == '\\':
+                    if i >= len(buffer):
+                        escaped = True
+                    i += 1
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in '[{':
+                depth += 1
+            elif char in ']}':
+                if depth == 0:
+                    if char == ']':
+                        return buffer, match.start(), discarded, newlines
+                else:
+                    depth -= 1
+            elif char == ',' and depth == 0:
+                return buffer, match.start(), discarded, newlines
+        chunk = f.read(chunk_size)
+        if not chunk:
+            raise ValueError("Tableau JSON non terminé après un élément invalide")
+        discarded += len(buffer)
+        newlines += buffer.count('\n')
+        buffer = chunk
+        pos = 0
+
+
+def _iter_json_array(f, file_path: Path, chunk_size: int) -> Iterator[Any]:
+    """Format tableau: décode les éléments un par un depuis un buffer glissant"""
+    buffer = f.read(chunk_size)
+    pos = buffer.index('[') + 1
+    lines_before = 0
+    element_number = 0
+    eof = False
+
+    while True:
+        pos = _JSON_SEPARATORS.match(buffer, pos).end()
+
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+
+        record = _NEED_MORE
+        if pos < len(buffer):
+            try:
+                record, end = _ARRAY_DECODER.raw_decode(buffer, pos)
+                # Un élément collé à la fin du buffer peut être tronqué (nombre, littéral)
+                if end == len(buffer) and not eof:
+                    record = _NEED_MORE
+            except json.JSONDecodeError as e:
+                if eof and _is_truncated(e, buffer, eof):
+                    raise ValueError(f"Tableau JSON non terminé: {file_path.name}") from e
+                if not _is_truncated(e, buffer, eof):
+                    # Élément invalide: ignoré, la lecture reprend à l'élément suivant
+                    element_number += 1
+                    line_number = lines_before + buffer.count('\n', 0, pos) + 1
+                    logger.warning(
+                        f"Élément JSON invalide #{element_number} "
+                        f"{file_path.name}:{line_number}: {e}"
+                    )
+                    buffer, pos, _, newlines = _skip_invalid_element(f, buffer, pos, chunk_size)
+                    lines_before += newlines
+                    continue
+
+        if record is _NEED_MORE:
+            if eof:
+                raise ValueError(f"Tableau JSON non terminé: {file_path.name}")
+            # Garder l'élément en cours et lire la suite (taille doublée pour les gros éléments)
+            lines_before += buffer.count('\n', 0, pos)
+            chunk = f.read(max(chunk_size, len(buffer) - pos))
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        element_number += 1
+        yield record
+        pos = end
@@ -1,9 +1,12 @@
 # scripts/data_processors/jumia_extractor.py
 from .base_extractor import BaseExtractor
-import re
+from . import patterns
 from typing import Dict, List, Any  # ⬅️ IMPORT MANQUANT !
 from pathlib import Path
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 class JumiaExtractor(BaseExtractor):
     """Extracteur spécialisé pour Jumia"""
@@ -63,15 +66,15 @@ class JumiaExtractor(BaseExtractor):
             
         rating_str = self.safe_string(rating_data)
         
-        out_of_match = re.search(r'(\d+\.?\d*)\s*out of\s*\d+', rating_str)
+        out_of_match = patterns.RATING_OUT_OF.search(rating_str)
         if out_of_match:
             return float(out_of_match.group(1))
             
-        slash_match = re.search(r'(\d+\.?\d*)\s*/\s*\d+', rating_str)
+        slash_match = patterns.RATING_SLASH.search(rating_str)
         if slash_match:
             return float(slash_match.group(1))
             
-        decimal_match = re.search(r'(\d+\.?\d*)', rating_str)
+        decimal_match = patterns.DECIMAL_NUMBER.search(rating_str)
         if decimal_match:
             return float(decimal_match.group(1))
             
@@ -85,15 +88,15 @@ class JumiaExtractor(BaseExtractor):
         description = self.safe_string(product.get('description', ''))
         full_text = (title + " " + description).lower()
         
-        storage_match = re.search(r'(\d+)\s*(go|gb|go ram)', full_text)
+        storage_match = patterns.STORAGE_SPEC.search(full_text)
         if storage_match:
             specs['storage'] = f"{storage_match.group(1)} {storage_match.group(2).upper()}"
         
-        ram_match = re.search(r'(\d+)\s*go\s*ram', full_text)
+        ram_match = patterns.RAM_SPEC.search(full_text)
         if ram_match:
             specs['ram'] = f"{ram_match.group(1)} Go"
             
-        screen_match = re.search(r'(\d+[.,]?\d*)"', full_text)
+        screen_match = patterns.SCREEN_SPEC.search(full_text)
         if screen_match:
             specs['screen_size'] = f"{screen_match.group(1)}\""
             
@@ -0,0 +1,198 @@
+# scripts/data_processors/manifest.py
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .json_loader import json_loads, load_json_file
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter quand les fonctions de transformation changent: invalide tous les caches
+TRANSFORM_VERSION = 1
+FINGERPRINT_CHUNK_SIZE = 1024 * 1024
+
+
+def file_fingerprint(path: Optional[Path]) -> Optional[str]:
+    """Empreinte sha256 du contenu d'un fichier ou d'un dossier Parquet (None s'il n'existe pas)"""
+    if not path or not Path(path).exists():
+        return None
+    path = Path(path)
+    digest = hashlib.sha256()
+    files = sorted(p for p in path.iterdir() if p.is_file()) if path.is_dir() else [path]
+    for file_path in files:
+        if path.is_dir():
+            digest.update(file_path.name.encode('utf-8'))
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(FINGERPRINT_CHUNK_SIZE), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def range_fingerprint(path: Path, start: int, end: int) -> str:
+    """Empreinte sha256 des octets [start, end) d'un fichier (seule la plage est lue)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(FINGERPRINT_CHUNK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def _fingerprint(file_path: Path, byte_range: Optional[Tuple[int, int]]) -> str:
+    return file_fingerprint(file_path) if byte_range is None else range_fingerprint(file_path, *byte_range)
+
+
+def write_json_atomic(path: Path, data):
+    """Écrit un JSON via un fichier temporaire: jamais de fichier à moitié écrit"""
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def file_lock(path: Path):
+    """
+    Verrou exclusif entre processus (flock) sur `path`: sérialise les runs concurrents
+    (backfills) qui lisent puis réécrivent un même état partagé. Non réentrant.
+    """
+    import fcntl
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info(f"⏳ {path.parent.name}: utilisé par un autre run, attente du verrou")
+            start = time.perf_counter()
+            fcntl.flock(f, fcntl.LOCK_EX)
+            logger.info(f"🔓 {path.parent.name}: verrou obtenu après {time.perf_counter() - start:.1f}s")
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class FileManifest:
+    """
+    Manifeste des fichiers bruts d'une source: taille, mtime, sha256 et chemin de la
+    sortie transformée en cache. Un fichier dont la taille et le mtime n'ont pas changé
+    est réutilisé sans relecture; si seul le mtime change, le sha256 tranche.
+
+    Pour une plage d'octets d'un gros fichier (`byte_range`), le sha256 ne porte que sur la
+    plage: chaque tâche ne relit que ses octets, et une plage inchangée d'un fichier modifié
+    ailleurs (ex: JSON Lines complété) reste en cache.
+    """
+
+    def __init__(self, cache_dir: Path, transform_id: str, version: int = TRANSFORM_VERSION):
+        self.cache_dir = Path(cache_dir)
+        self.transform_id = transform_id
+        self.version = version
+        self.path = self.cache_dir / "manifest.json"
+        self.entries: Dict[str, Dict] = self._load()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            manifest = json_loads(self.path.read_bytes())
+        except Exception as e:
+            logger.warning(f"⚠️ Manifeste illisible, cache ignoré: {e}")
+            return {}
+        if manifest.get('version') != self.version or manifest.get('transform') != self.transform_id:
+            logger.info(f"🔁 Manifeste {self.cache_dir.name} obsolète, cache ignoré")
+            return {}
+        return manifest.get('files', {})
+
+    def _is_unchanged(self, file_path: Path, entry: Dict, byte_range: Optional[Tuple[int, int]]) -> bool:
+        if entry.get('range') != (list(byte_range) if byte_range else None):
+            return False
+        stat = file_path.stat()
+        if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']:
+            return True
+        if byte_range is None and stat.st_size != entry['size']:
+            return False
+        if byte_range is not None and stat.st_size < byte_range[1]:
+            return False
+        # Fichier touché mais peut-être identique (ou plage intacte): le contenu fait foi
+        if _fingerprint(file_path, byte_range) != entry['sha256']:
+            return False
+        entry['size'] = stat.st_size
+        entry['mtime_ns'] = stat.st_mtime_ns
+        return True
+
+    def cached_output(self, file_path: Path, byte_range: Optional[Tuple[int, int]] = None) -> Optional[Path]:
+        """Chemin de la sortie en cache pour ce fichier (sans la lire), None s'il est nouveau ou modifié"""
+        entry = self.entries.get(str(file_path))
+        if entry is not None and self._is_unchanged(file_path, entry, byte_range):
+            output_path = self.cache_dir / entry['output']
+            if output_path.exists():
+                self.hits += 1
+                return output_path
+        self.misses += 1
+        return None
+
+    def load_cached(self, file_path: Path) -> Optional[List[Dict]]:
+        """Produits transformés en cache pour ce fichier, None s'il est nouveau ou modifié"""
+        output_path = self.cached_output(file_path)
+        return load_json_file(output_path) if output_path is not None else None
+
+    def output_count(self, file_path: Path) -> Optional[int]:
+        """Nombre de produits de la sortie en cache (None pour un manifeste antérieur)"""
+        return self.entries.get(str(file_path), {}).get('count')
+
+    def record(self, file_path: Path, products: List[Dict],
+               byte_range: Optional[Tuple[int, int]] = None) -> Path:
+        """Enregistre la sortie transformée d'un fichier ou d'une plage (adressée par son contenu); retourne son chemin"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        stat = file_path.stat()
+        sha256 = _fingerprint(file_path, byte_range)
+        output = f"{sha256[:16]}.json"
+        write_json_atomic(self.cache_dir / output, products)
+        self.entries[str(file_path)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': sha256,
+            'range': list(byte_range) if byte_range else None,
+            'output': output,
+            'count': len(products),
+        }
+        return self.cache_dir / output
+
+    def prune(self, present_files: Iterable[Path]) -> int:
+        """Oublie les fichiers disparus et supprime les sorties en cache orphelines"""
+        present = {str(path) for path in present_files}
+        removed = [path for path in self.entries if path not in present]
+        for path in removed:
+            del self.entries[path]
+        if self.cache_dir.exists():
+            referenced = {entry['output'] for entry in self.entries.values()}
+            for cached in self.cache_dir.glob("*.json"):
+                if cached.name != self.path.name and cached.name not in referenced:
+                    cached.unlink()
+        return len(removed)
+
+    def save(self):
+        """Persiste le manifeste"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(self.path, {
+            'version': self.version,
+            'transform': self.transform_id,
+            'files': self.entries,
+        })
+
+    def summary(self) -> str:
+        return f"{self.hits} fichier(s) réutilisé(s), {self.misses} transformé(s)"
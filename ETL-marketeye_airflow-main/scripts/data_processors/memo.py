@@ -0,0 +1,150 @@
+# scripts/data_processors/memo.py
+import functools
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 16384
+
+_MISSING = object()
+
+# Tous les caches créés, par nom (plusieurs instances peuvent partager un nom)
+_caches: Dict[str, List['LRUCache']] = {}
+# Compteurs remontés par les workers du pool de transformation
+_worker_counters: Dict[str, List[int]] = {}
+
+
+class LRUCache:
+    """Cache LRU de taille bornée avec compteurs de succès/échecs"""
+
+    def __init__(self, name: str, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        _caches.setdefault(name, []).append(self)
+
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        """Valeur en cache (marquée récente) ou `default`"""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """Ajoute une valeur et évince la plus ancienne si le cache est plein"""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getstate__(self):
+        # Les workers du pool repartent d'un cache vide
+        state = self.__dict__.copy()
+        state['_data'] = OrderedDict()
+        state['hits'] = state['misses'] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        _caches.setdefault(self.name, []).append(self)
+
+
+def memoized(name: str, maxsize: int = DEFAULT_CACHE_SIZE) -> Callable:
+    """Décorateur LRU pour fonctions pures à arguments positionnels hachables"""
+    def decorator(func: Callable) -> Callable:
+        cache = LRUCache(name, maxsize)
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            try:
+                value = cache.get(args)
+            except TypeError:
+                return func(*args)  # Argument non hachable: pas de cache
+            if value is _MISSING:
+                value = func(*args)
+                cache.put(args, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def cache_counters() -> Dict[str, Tuple[int, int]]:
+    """Compteurs (succès, échecs) par nom de cache, workers inclus"""
+    counters = {}
+    for name, caches in _caches.items():
+        hits = sum(cache.hits for cache in caches)
+        misses = sum(cache.misses for cache in caches)
+        worker_hits, worker_misses = _worker_counters.get(name, (0, 0))
+        counters[name] = (hits + worker_hits, misses + worker_misses)
+    for name, (hits, misses) in _worker_counters.items():
+        counters.setdefault(name, (hits, misses))
+    return counters
+
+
+def counters_delta(before: Dict[str, Tuple[int, int]]) -> Dict[str, Tuple[int, int]]:
+    """Différence des compteurs depuis un instantané `before`"""
+    delta = {}
+    for name, (hits, misses) in cache_counters().items():
+        old_hits, old_misses = before.get(name, (0, 0))
+        if hits != old_hits or misses != old_misses:
+            delta[name] = (hits - old_hits, misses - old_misses)
+    return delta
+
+
+def add_worker_counters(delta: Dict[str, Tuple[int, int]]):
+    """Ajoute les compteurs remontés par un worker du pool"""
+    for name, (hits, misses) in delta.items():
+        counters = _worker_counters.setdefault(name, [0, 0])
+        counters[0] += hits
+        counters[1] += misses
+
+
+def reset_cache_stats():
+    """Remet les compteurs à zéro (les valeurs en cache sont conservées)"""
+    for caches in _caches.values():
+        for cache in caches:
+            cache.hits = 0
+            cache.misses = 0
+    _worker_counters.clear()
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Statistiques par cache: succès, échecs, taux de succès"""
+    stats = {}
+    for name, (hits, misses) in sorted(cache_counters().items()):
+        total = hits + misses
+        stats[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+        }
+    return stats
+
+
+def log_cache_stats(log: logging.Logger = logger):
+    """Écrit le taux de succès de chaque cache utilisé dans le log de la tâche"""
+    for name, stats in cache_stats().items():
+        if stats['hits'] or stats['misses']:
+            log.info(
+                f"🧠 Cache {name}: {stats['hit_rate']:.1%} de succès "
+                f"({stats['hits']} succès / {stats['misses']} calculs)"
+            )
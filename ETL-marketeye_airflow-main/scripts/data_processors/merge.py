@@ -0,0 +1,81 @@
+# scripts/data_processors/merge.py
+import logging
+from datetime import datetime
+from typing import Dict, Hashable, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def offer_key(offer: Dict) -> Tuple[Hashable, Hashable]:
+    """Clé d'unicité d'une offre: (source, url)"""
+    return offer.get('source'), offer.get('url')
+
+
+def normalized_product_id(product_id: str) -> str:
+    """ID standardisé pour la fusion (minuscules, pas d'espaces)"""
+    return product_id.lower().replace(' ', '_')
+
+
+def normalize_product_ids(products: List[Dict]):
+    """Standardise les IDs pour une meilleure fusion"""
+    for product in products:
+        original_id = product.get('product_id', '')
+        if original_id:
+            product['product_id'] = normalized_product_id(original_id)
+
+
+def _merge_into(existing: Dict, product: Dict, offer_keys: Set[Tuple], merged_at: str):
+    """Fusionne `product` dans `existing` (offres indexées par `offer_keys`)"""
+    # 1. Fusionner les offres: test d'appartenance O(1) dans l'index du produit
+    if 'offers' in product:
+        offers = existing.setdefault('offers', [])
+        for new_offer in product['offers']:
+            key = offer_key(new_offer)
+            if key not in offer_keys:
+                offer_keys.add(key)
+                offers.append(new_offer)
+
+    # 2. Fusionner les spécifications
+    if 'specifications' in product:
+        specifications = existing.setdefault('specifications', {})
+        for key, value in product['specifications'].items():
+            if key not in specifications or not specifications[key]:
+                specifications[key] = value
+
+    # 3. Mettre à jour les métadonnées
+    if 'metadata' in product:
+        metadata = existing.setdefault('metadata', {'sources': []})
+        for source in product['metadata'].get('sources', []):
+            if source not in metadata.get('sources', []):
+                metadata.setdefault('sources', []).append(source)
+        metadata['last_updated'] = merged_at
+
+    # 4. Garder le meilleur nom de produit (le plus long/descriptif)
+    if ('product_name' in product and
+            len(product.get('product_name', '')) > len(existing.get('product_name', ''))):
+        existing['product_name'] = product['product_name']
+
+
+def merge_products(products: List[Dict]) -> List[Dict]:
+    """
+    Fusionne les produits par product_id en dédupliquant les offres sur (source, url).
+    Temps linéaire dans le nombre d'offres: chaque produit garde un index de ses clés d'offre.
+    """
+    merged: Dict[str, Dict] = {}
+    offer_index: Dict[str, Set[Tuple]] = {}
+    merged_at = datetime.now().isoformat()
+
+    for product in products:
+        pid = product.get('product_id')
+        if not pid:
+            logger.warning("Produit sans ID, ignoré")
+            continue
+
+        if pid in merged:
+            _merge_into(merged[pid], product, offer_index[pid], merged_at)
+        else:
+            # Nouveau produit: ses offres sont gardées telles quelles et indexées
+            merged[pid] = product
+            offer_index[pid] = {offer_key(offer) for offer in product.get('offers', [])}
+
+    return list(merged.values())
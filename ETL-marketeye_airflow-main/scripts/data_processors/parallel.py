@@ -0,0 +1,90 @@
+# scripts/data_processors/parallel.py
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .memo import add_worker_counters, cache_counters, counters_delta
+
+logger = logging.getLogger(__name__)
+
+# Fonction de transformation installée une seule fois par processus worker
+_worker_transform: Optional[Callable] = None
+
+
+def _init_worker(transform: Callable):
+    """Initialise un worker du pool avec la fonction de transformation"""
+    global _worker_transform
+    _worker_transform = transform
+
+
+def _transform_chunk(transform: Callable, chunk: List[Dict]) -> List[Optional[Dict]]:
+    """Transforme un bloc d'enregistrements (None pour un enregistrement en erreur)"""
+    results = []
+    for item in chunk:
+        try:
+            results.append(transform(item))
+        except Exception as e:
+            logger.warning(f"⚠️ Erreur transformation: {e}")
+            results.append(None)
+    return results
+
+
+def _transform_chunk_in_worker(chunk: List[Dict]) -> Tuple[List[Optional[Dict]], Dict]:
+    """Point d'entrée exécuté dans les workers du pool (résultats + compteurs de cache du bloc)"""
+    before = cache_counters()
+    results = _transform_chunk(_worker_transform, chunk)
+    return results, counters_delta(before)
+
+
+def _collect(future) -> List[Optional[Dict]]:
+    """Résultats d'un bloc du pool, compteurs de cache reportés dans le processus parent"""
+    results, counters = future.result()
+    add_worker_counters(counters)
+    return results
+
+
+def _chunked(records: Iterable[Dict], chunk_size: int) -> Iterator[List[Dict]]:
+    """Découpe un flux d'enregistrements en blocs de taille fixe"""
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def transform_records(records: Iterable[Dict], transform: Callable[[Dict], Optional[Dict]],
+                      workers: int = 1, chunk_size: int = 500) -> Iterator[Optional[Dict]]:
+    """
+    Applique `transform` à chaque enregistrement, par blocs dans un pool de processus si workers > 1.
+    Produit exactement un résultat par enregistrement, dans l'ordre d'entrée (None en cas d'erreur).
+    """
+    chunk_size = max(1, chunk_size)
+    chunks = _chunked(records, chunk_size)
+
+    first = next(chunks, None)
+    if first is None:
+        return
+    second = next(chunks, None)
+
+    # Séquentiel si un seul worker ou si le flux tient dans un seul bloc
+    if workers <= 1 or second is None:
+        for chunk in chain([first], [second] if second else [], chunks):
+            yield from _transform_chunk(transform, chunk)
+        return
+
+    logger.info(f"⚙️ Transformation parallèle: {workers} workers, blocs de {chunk_size}")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(transform,)) as pool:
+        # Nombre de blocs en vol borné pour garder une mémoire constante
+        pending = deque()
+        for chunk in chain([first, second], chunks):
+            pending.append(pool.submit(_transform_chunk_in_worker, chunk))
+            if len(pending) >= workers * 2:
+                yield from _collect(pending.popleft())
+
+        while pending:
+            yield from _collect(pending.popleft())
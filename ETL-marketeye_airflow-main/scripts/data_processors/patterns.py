@@ -0,0 +1,75 @@
+# scripts/data_processors/patterns.py
+"""
+Registre des expressions régulières compilées une seule fois au chargement du module.
+Partagé par les fonctions du DAG et les extracteurs.
+
+Les listes de motifs de modèle restent des tuples ordonnés: chaque motif est essayé sur
+tout le titre avant le suivant, une alternance unique changerait le motif retenu.
+"""
+import re
+
+# ============================================
+# NETTOYAGE GÉNÉRIQUE
+# ============================================
+
+NON_ALNUM_LOWER = re.compile(r'[^a-z0-9]')           # IDs produit
+NON_ALNUM_SPACE = re.compile(r'[^a-zA-Z0-9\s]')      # Noms de modèle
+NON_WORD_SPACE = re.compile(r'[^\w\s]')
+MULTI_SPACE = re.compile(r'\s+')
+
+# ============================================
+# PRIX ET NOTES
+# ============================================
+
+PRICE_NOISE = re.compile(r'[^\d,.]')
+FIRST_NUMBER = re.compile(r'\d+\.?\d*')
+DECIMAL_NUMBER = re.compile(r'(\d+\.?\d*)')
+# "4.5 out of 5" puis "4.5/5": deux recherches dans cet ordre (une alternance prendrait
+# la forme la plus à gauche quand les deux apparaissent)
+RATING_OUT_OF = re.compile(r'(\d+\.?\d*)\s*out of\s*\d+')
+RATING_SLASH = re.compile(r'(\d+\.?\d*)\s*/\s*\d+')
+
+# ============================================
+# MODÈLE DEPUIS LE TITRE
+# ============================================
+
+# DAG: titres en minuscules sans la marque
+TITLE_MODEL_PATTERNS = (
+    re.compile(r'([a-z]+\s*\d+\w*\s*\d*\w*)', re.IGNORECASE),  # galaxy s21 ultra
+    re.compile(r'(\d+\s*[a-z]+\s*\d*)', re.IGNORECASE),        # 12 pro max
+    re.compile(r'([a-z]+\s*\d+)', re.IGNORECASE),              # note 12
+)
+AVITO_TITLE_MODEL_PATTERNS = TITLE_MODEL_PATTERNS + (
+    re.compile(r'(\d+\s*g[ob])', re.IGNORECASE),               # 128GB, 256 Go
+)
+NAME_MODEL_PATTERN = re.compile(r'([a-z]+\s*\d+\w*)')           # Electroplanet
+
+# BaseExtractor.extract_model_from_title
+SAMSUNG_MODEL_PATTERNS = (
+    re.compile(r'galaxy\s+([a-z]\d+\w*\s*\d*\w*)'),
+    re.compile(r'([a-z]\d+\w*\s*\d*\w*)\s+'),
+)
+GENERIC_MODEL_PATTERNS = (
+    re.compile(r'(\d+\s*g[ob])'),
+    re.compile(r'(\d+\s*go\s+\d+\s*go\s+ram)'),
+    re.compile(r'([a-z]+\s*\d+\w*)'),
+)
+
+# AvitoExtractor._extract_model_fixed: titres en majuscules
+AVITO_MODEL_PATTERNS = (
+    re.compile(r'([A-Z]+\s*\d+\s*[A-Z]*\s*\d*\s*[A-Z]*)'),  # S24 ULTRA, 12T PRO
+    re.compile(r'(\d+\s*[A-Z]+\s*\d*)'),                    # 12 PRO, 14 PLUS
+    re.compile(r'([A-Z]+\s*\d+)'),                          # GALAXY S21, REDMI NOTE 12
+    re.compile(r'(\d+\s*[A-Z]{2,})'),                       # 256GB, 512 GO
+    re.compile(r'([A-Z]{2,}\s*\d+)'),                       # NOTE 10, TAB S9
+)
+MODEL_VARIANT_SUFFIX = re.compile(r'\b(ULTRA|PRO|PLUS|MAX|MINI|LITE)\b', re.IGNORECASE)
+MODEL_TOKEN = re.compile(r'\b[a-z]+\d+\w*\b')
+
+# ============================================
+# SPÉCIFICATIONS JUMIA
+# ============================================
+
+STORAGE_SPEC = re.compile(r'(\d+)\s*(go|gb|go ram)')
+RAM_SPEC = re.compile(r'(\d+)\s*go\s*ram')
+SCREEN_SPEC = re.compile(r'(\d+[.,]?\d*)"')
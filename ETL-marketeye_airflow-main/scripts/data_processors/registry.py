@@ -0,0 +1,200 @@
+# scripts/data_processors/registry.py
+"""
+Registre des artefacts d'un run (jeux transformés, catalogue final, statistiques, rapport).
+
+Chaque run écrit dans son propre dossier `<racine>/<run_id>/`, sous des chemins versionnés
+(`<nom>-v<N>.<ext>`: une tâche rejouée n'écrase pas la version lue par une autre). Chaque
+artefact est décrit par une entrée `_registry/<nom>.json`: chemin, version, schéma, nombre
+de lignes, taille et sha256. Les tâches se transmettent des noms d'artefacts, pas des
+chemins fixes: des runs concurrents ou des backfills ne se marchent pas dessus.
+
+Les consommateurs ouvrent les artefacts à la demande (`open` renvoie un DatasetReader qui
+ne lit rien avant le premier accès).
+"""
+import logging
+import os
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .columnar import DatasetReader, save_dataset
+from .instrumentation import record_read, record_written
+from .json_loader import json_loads
+from .manifest import file_fingerprint, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_VERSION = 1
+ENTRIES_DIRNAME = "_registry"
+
+
+def safe_run_id(run_id: str) -> str:
+    """Nom de dossier d'un run_id Airflow (ex: 'scheduled__2024-01-01T00:00:00+00:00')"""
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', run_id)
+
+
+def _type_name(value) -> str:
+    return 'null' if value is None else type(value).__name__
+
+
+def dataset_schema(products: List[Dict]) -> Dict[str, Dict[str, str]]:
+    """Champs des produits et des offres avec leur(s) type(s) JSON observé(s)"""
+    fields: Dict[str, Dict[str, set]] = {'products': {}, 'offers': {}}
+    for product in products:
+        for key, value in product.items():
+            if key != 'offers':
+                fields['products'].setdefault(key, set()).add(_type_name(value))
+        for offer in product.get('offers', ()):
+            for key, value in offer.items():
+                fields['offers'].setdefault(key, set()).add(_type_name(value))
+    return {table: {key: '|'.join(sorted(types)) for key, types in sorted(columns.items())}
+            for table, columns in fields.items()}
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(child.stat().st_size for child in path.iterdir() if child.is_file())
+    return path.stat().st_size
+
+
+class DatasetRegistry:
+    """Artefacts versionnés d'un run: chemins, schéma, lignes, octets, empreintes"""
+
+    def __init__(self, root: Path, run_id: str):
+        self.root = Path(root)
+        self.run_id = run_id
+        self.run_dir = self.root / safe_run_id(run_id)
+        self.entries_dir = self.run_dir / ENTRIES_DIRNAME
+
+    # ---------- lecture ----------
+
+    def entry(self, name: str) -> Optional[Dict]:
+        path = self.entries_dir / f"{name}.json"
+        return json_loads(path.read_bytes()) if path.exists() else None
+
+    def entries(self) -> Dict[str, Dict]:
+        if not self.entries_dir.exists():
+            return {}
+        return {path.stem: json_loads(path.read_bytes()) for path in sorted(self.entries_dir.glob("*.json"))}
+
+    def path(self, name: str) -> Optional[Path]:
+        """Chemin de la dernière version de l'artefact, None s'il n'a pas été produit dans ce run"""
+        entry = self.entry(name)
+        return self.run_dir / entry['path'] if entry else None
+
+    def open(self, name: str) -> DatasetReader:
+        """Lecteur (paresseux) d'un jeu de données du run"""
+        entry = self.entry(name)
+        if entry is None:
+            raise FileNotFoundError(f"Artefact {name} absent du run {self.run_id}")
+        record_read(entry['bytes'])
+        return DatasetReader(self.run_dir / entry['path'])
+
+    def load_json(self, name: str) -> Any:
+        entry = self.entry(name)
+        if entry is None:
+            raise FileNotFoundError(f"Artefact {name} absent du run {self.run_id}")
+        record_read(entry['bytes'])
+        return json_loads((self.run_dir / entry['path']).read_bytes())
+
+    def verify(self, name: str) -> bool:
+        """Vrai si l'artefact sur disque a encore l'empreinte enregistrée"""
+        entry = self.entry(name)
+        return entry is not None and file_fingerprint(self.run_dir / entry['path']) == entry['sha256']
+
+    # ---------- écriture ----------
+
+    def _next_stem(self, name: str) -> Path:
+        entry = self.entry(name)
+        version = entry['version'] + 1 if entry else 1
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        return self.run_dir / f"{name}-v{version}"
+
+    def register(self, name: str, path: Path, kind: str, rows: Optional[Dict[str, int]] = None,
+                 schema: Optional[Dict] = None) -> Dict:
+        """Enregistre un artefact déjà écrit dans le dossier du run"""
+        path = Path(path)
+        previous = self.entry(name)
+        entry = {
+            'registry_version': REGISTRY_VERSION,
+            'name': name,
+            'run_id': self.run_id,
+            'kind': kind,
+            'version': previous['version'] + 1 if previous else 1,
+            'path': str(path.relative_to(self.run_dir)),
+            'rows': rows,
+            'bytes': _size(path),
+            'sha256': file_fingerprint(path),
+            'schema': schema,
+            'created_at': datetime.now().isoformat(),
+        }
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        # L'entrée n'est publiée qu'une fois l'artefact complet: un lecteur ne voit jamais un fichier partiel
+        write_json_atomic(self.entries_dir / f"{name}.json", entry)
+        record_written(entry['bytes'])
+        logger.info(f"🗃️ {name} v{entry['version']}: {rows or ''} {entry['bytes'] / 1024:.0f} Ko ({self.run_id})")
+        return entry
+
+    def save_dataset(self, name: str, products: List[Dict], output_format: str = 'json') -> Path:
+        """Écrit un jeu de données sous un nouveau chemin versionné et l'enregistre"""
+        path = save_dataset(products, self._next_stem(name), output_format)
+        rows = {'products': len(products), 'offers': sum(len(product.get('offers', ())) for product in products)}
+        self.register(name, path, 'dataset', rows=rows, schema=dataset_schema(products))
+        return path
+
+    def link_dataset(self, name: str, source: Path, rows: Optional[Dict[str, int]] = None,
+                     schema: Optional[Dict] = None) -> Path:
+        """Enregistre un jeu de données déjà écrit (autre run) sans le décoder: liens physiques, copie à défaut"""
+        source = Path(source)
+        path = self._next_stem(name).with_suffix(source.suffix)
+        if source.is_dir():
+            path.mkdir()
+            files = [(child, path / child.name) for child in source.iterdir() if child.is_file()]
+        else:
+            files = [(source, path)]
+        for source_file, target in files:
+            try:
+                os.link(source_file, target)
+            except OSError:
+                shutil.copy2(source_file, target)
+        self.register(name, path, 'dataset', rows=rows, schema=schema)
+        return path
+
+    def write_json(self, name: str, data: Any) -> Path:
+        path = self._next_stem(name).with_suffix('.json')
+        write_json_atomic(path, data)
+        self.register(name, path, 'json')
+        return path
+
+    def write_text(self, name: str, text: str, suffix: str = '.txt') -> Path:
+        path = self._next_stem(name).with_suffix(suffix)
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_text(text, encoding='utf-8')
+        tmp_path.replace(path)
+        self.register(name, path, 'text', rows={'lines': text.count('\n') + 1})
+        return path
+
+    def subdir(self, name: str) -> Path:
+        """Dossier de travail propre au run (ex: partiels de statistiques)"""
+        path = self.run_dir / name
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+
+def prune_runs(root: Path, keep_last: int, current: Optional[str] = None) -> List[str]:
+    """Supprime les dossiers de run les plus anciens (dernière écriture) au-delà de `keep_last`"""
+    root = Path(root)
+    if keep_last <= 0 or not root.exists():
+        return []
+    current_dir = safe_run_id(current) if current else None
+    runs = sorted((path for path in root.iterdir() if path.is_dir()),
+                  key=lambda path: (path / ENTRIES_DIRNAME).stat().st_mtime
+                  if (path / ENTRIES_DIRNAME).exists() else path.stat().st_mtime)
+    removed = [path.name for path in runs[:-keep_last] if path.name != current_dir]
+    for name in removed:
+        shutil.rmtree(root / name)
+    if removed:
+        logger.info(f"🗑️ {len(removed)} run(s) ancien(s) supprimé(s) de {root}")
+    return removed
@@ -0,0 +1,156 @@
+# scripts/data_processors/shards.py
+"""
+Découpage d'un gros fichier brut en plages d'octets alignées sur les enregistrements.
+
+- JSON Lines: chaque coupure est avancée jusqu'au début de la ligne suivante (quelques
+  lectures, pas de parcours du fichier).
+- Tableau JSON: un parcours unique relève le début des éléments de premier niveau. Le
+  fichier est lu en latin-1 (1 caractère = 1 octet, la structure JSON est en ASCII) pour
+  que les positions du décodeur soient des positions en octets.
+
+Chaque plage se relit seule (`iter_shard_records`): une tâche se positionne dans le fichier
+et ne lit que sa plage.
+"""
+import io
+import json
+import logging
+from pathlib import Path
+from typing import Any, Iterator, List, Tuple
+
+from .json_loader import (JSON_READ_CHUNK_SIZE, _is_truncated, _iter_json_array, _iter_json_lines,
+                          _skip_invalid_element, detect_layout)
+
+logger = logging.getLogger(__name__)
+
+_DECODER = json.JSONDecoder()
+
+
+def compute_shards(file_path: Path, shard_bytes: int) -> List[Tuple[int, int]]:
+    """Plages [début, fin) d'environ `shard_bytes` octets, alignées sur les enregistrements"""
+    size = file_path.stat().st_size
+    layout = detect_layout(file_path)
+    if layout == 'empty':
+        return []
+    if layout == 'jsonl':
+        return _jsonl_shards(file_path, size, shard_bytes)
+    return _array_shards(file_path, shard_bytes)
+
+
+def _jsonl_shards(file_path: Path, size: int, shard_bytes: int) -> List[Tuple[int, int]]:
+    cuts = [0]
+    with open(file_path, 'rb') as f:
+        target = shard_bytes
+        while target < size:
+            f.seek(target)
+            f.readline()  # fin de la ligne coupée
+            position = f.tell()
+            if position >= size:
+                break
+            cuts.append(position)
+            target = position + shard_bytes
+    cuts.append(size)
+    return list(zip(cuts, cuts[1:]))
+
+
+def _array_shards(file_path: Path, shard_bytes: int) -> List[Tuple[int, int]]:
+    """Coupures au début des éléments du tableau, relevées en un parcours"""
+    cuts: List[int] = []
+    end = None
+    for start, element_end in _array_element_offsets(file_path):
+        if not cuts or start - cuts[-1] >= shard_bytes:
+            cuts.append(start)
+        end = element_end
+    if not cuts:
+        return []
+    cuts.append(end)
+    return list(zip(cuts, cuts[1:]))
+
+
+def _array_element_offsets(file_path: Path, chunk_size: int = JSON_READ_CHUNK_SIZE) -> Iterator[Tuple[int, int]]:
+    """(début, fin) en octets de chaque élément de premier niveau d'un tableau JSON"""
+    with open(file_path, 'r', encoding='latin-1', newline='') as f:
+        buffer = f.read(chunk_size)
+        offset = 0  # position du buffer dans le fichier
+        pos = buffer.index('[') + 1
+        eof = False
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            end = None
+            if pos < len(buffer):
+                try:
+                    _, end = _DECODER.raw_decode(buffer, pos)
+                    if end == len(buffer) and not eof:
+                        end = None
+                except json.JSONDecodeError as e:
+                    if not _is_truncated(e, buffer, eof):
+                        # Élément invalide: gardé dans sa plage (la lecture de la plage le saute et le signale)
+                        logger.warning(f"Élément JSON invalide à l'octet {offset + pos} de {file_path.name}")
+                        start = offset + pos
+                        buffer, sep, discarded, _ = _skip_invalid_element(f, buffer, pos, chunk_size)
+                        offset += discarded
+                        yield start, offset + sep
+                        pos = sep
+                        continue
+            if end is None:
+                if eof:
+                    raise ValueError(f"Tableau JSON non terminé: {file_path.name} (octet {offset + pos})")
+                chunk = f.read(max(chunk_size, len(buffer) - pos))
+                eof = not chunk
+                offset += pos
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield offset + pos, offset + end
+            pos = end
+
+
+class _RangeReader(io.RawIOBase):
+    """Flux binaire: `prefix` + octets [start, end) du fichier + `suffix`"""
+
+    def __init__(self, file_path: Path, start: int, end: int, prefix: bytes = b'', suffix: bytes = b''):
+        self._file = open(file_path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+        self._prefix = prefix
+        self._suffix = suffix
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._prefix:
+            data, self._prefix = self._prefix[:len(buffer)], self._prefix[len(buffer):]
+        elif self._remaining > 0:
+            data = self._file.read(min(len(buffer), self._remaining))
+            self._remaining -= len(data)
+            if not data:
+                self._remaining = 0
+        else:
+            data, self._suffix = self._suffix[:len(buffer)], self._suffix[len(buffer):]
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def iter_shard_records(file_path: Path, start: int, end: int,
+                       chunk_size: int = JSON_READ_CHUNK_SIZE) -> Iterator[Any]:
+    """Enregistrements de la plage [start, end) d'un fichier (tableau JSON ou JSON Lines)"""
+    try:
+        if detect_layout(file_path) == 'jsonl':
+            with io.BufferedReader(_RangeReader(file_path, start, end)) as f:
+                yield from _iter_json_lines(f, file_path)
+        else:
+            # La plage est une suite d'éléments: relue comme un tableau complet
+            raw = io.BufferedReader(_RangeReader(file_path, start, end, prefix=b'[', suffix=b']'))
+            with io.TextIOWrapper(raw, encoding='utf-8') as f:
+                yield from _iter_json_array(f, file_path, chunk_size)
+    except Exception as e:
+        # Propager: une plage lue en partie ne doit pas être mise en cache comme complète
+        logger.error(f"Erreur lecture {file_path.name} [{start}:{end}]: {e}")
+        raise
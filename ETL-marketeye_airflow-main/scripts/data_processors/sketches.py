@@ -0,0 +1,156 @@
+# scripts/data_processors/sketches.py
+"""
+Accumulateurs fusionnables pour les statistiques en flux:
+- RunningMoments: effectif, moyenne, variance (Welford), min et max
+- KLLSketch: quantiles approchés en mémoire bornée (Karnin, Lang, Liberty 2016)
+
+Deux accumulateurs construits sur des flux disjoints se fusionnent avec `merge`,
+et se sérialisent en JSON avec `to_dict` / `from_dict`.
+"""
+import math
+import random
+from typing import Dict, List, Optional
+
+DEFAULT_KLL_K = 200
+# Quantiles publiés dans les statistiques (moteur vectorisé et en flux)
+QUANTILES = {'p5': 0.05, 'p25': 0.25, 'median': 0.5, 'p75': 0.75, 'p95': 0.95}
+# Bandes de prix par modèle: seulement les modèles les plus représentés (taille de l'XCom)
+MODEL_BANDS_LIMIT = 100
+
+
+class RunningMoments:
+    """Moyenne et variance en une passe (Welford), fusion de Chan et al."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: 'RunningMoments'):
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self) -> float:
+        """Écart-type d'échantillon (ddof=1)"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RunningMoments':
+        moments = cls()
+        moments.count, moments.mean, moments.m2 = data['count'], data['mean'], data['m2']
+        moments.min, moments.max = data['min'], data['max']
+        return moments
+
+
+class KLLSketch:
+    """
+    Sketch KLL: une pile de compacteurs dont la capacité décroît géométriquement (2/3).
+    Un élément du niveau h pèse 2**h; l'erreur de rang est ~1.65/k quelle que soit la taille du flux.
+    """
+
+    def __init__(self, k: int = DEFAULT_KLL_K, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.compactors: List[List[float]] = [[]]
+        self.size = 0
+        self.max_size = self._capacity(0)
+        self._random = random.Random(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _grow(self):
+        self.compactors.append([])
+        self.max_size = sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def _compress(self):
+        """Compacte le premier niveau plein: la moitié des éléments triés monte d'un niveau"""
+        for level in range(len(self.compactors)):
+            if len(self.compactors[level]) >= self._capacity(level):
+                if level + 1 >= len(self.compactors):
+                    self._grow()
+                items = sorted(self.compactors[level])
+                # Un élément reste si le compacteur est impair
+                leftover = [items.pop()] if len(items) % 2 else []
+                offset = self._random.randint(0, 1)
+                self.compactors[level + 1].extend(items[offset::2])
+                self.compactors[level] = leftover
+                self.size = sum(len(compactor) for compactor in self.compactors)
+                return
+
+    def add(self, value: float):
+        self.compactors[0].append(value)
+        self.n += 1
+        self.size += 1
+        if self.size >= self.max_size:
+            self._compress()
+
+    def merge(self, other: 'KLLSketch'):
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, compactor in enumerate(other.compactors):
+            self.compactors[level].extend(compactor)
+        self.n += other.n
+        self.size = sum(len(compactor) for compactor in self.compactors)
+        while self.size >= self.max_size:
+            self._compress()
+
+    def quantiles(self, fractions: List[float]) -> List[float]:
+        """Quantiles approchés pour chaque fraction de [0, 1]"""
+        weighted = sorted((value, 1 << level)
+                          for level, compactor in enumerate(self.compactors) for value in compactor)
+        if not weighted:
+            return [0.0 for _ in fractions]
+        total = sum(weight for _, weight in weighted)
+        results = []
+        for fraction in fractions:
+            target = fraction * total
+            cumulative = 0
+            value = weighted[-1][0]
+            for item, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    value = item
+                    break
+            results.append(float(value))
+        return results
+
+    def to_dict(self) -> Dict:
+        return {'k': self.k, 'n': self.n, 'compactors': self.compactors}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'KLLSketch':
+        sketch = cls(data['k'])
+        sketch.n = data['n']
+        sketch.compactors = [list(compactor) for compactor in data['compactors']]
+        sketch.max_size = sum(sketch._capacity(level) for level in range(len(sketch.compactors)))
+        sketch.size = sum(len(compactor) for compactor in sketch.compactors)
+        return sketch
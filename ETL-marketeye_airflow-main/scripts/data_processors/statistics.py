@@ -0,0 +1,117 @@
+# scripts/data_processors/statistics.py
+"""
+Moteur de statistiques vectorisé: les offres sont aplaties une seule fois en DataFrame
+(une colonne NumPy par champ), puis toutes les agrégations sont calculées par pandas.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .columnar import DatasetReader
+from .sketches import MODEL_BANDS_LIMIT, QUANTILES
+
+logger = logging.getLogger(__name__)
+
+
+def offers_frame(reader: DatasetReader, products: pd.DataFrame) -> pd.DataFrame:
+    """Une ligne par offre: source, condition, prix et marque/modèle du produit"""
+    offers = reader.frame('offers', ['product_row', 'source', 'condition', 'price'])
+    rows = offers['product_row'].to_numpy(dtype=np.int64)
+
+    return pd.DataFrame({
+        'source': _category(offers['source'], 'Unknown'),
+        'condition': _category(offers['condition'], 'Inconnu'),
+        'price': pd.to_numeric(offers['price'], errors='coerce').astype('float64'),
+        'brand': _category(products['brand'], 'Unknown').take(rows).reset_index(drop=True),
+        'model': _category(products['model'], 'Unknown').take(rows).reset_index(drop=True),
+    })
+
+
+def _category(series: pd.Series, default: str) -> pd.Series:
+    """Colonne catégorielle (codes entiers) avec valeur par défaut pour les nulls"""
+    series = series.astype('category')
+    if series.isna().any():
+        if default not in series.cat.categories:
+            series = series.cat.add_categories([default])
+        series = series.fillna(default)
+    return series
+
+
+def _to_python(value):
+    """Valeur numpy -> type JSON natif"""
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return 0.0 if np.isnan(value) else float(value)
+    return value
+
+
+def _counts(series: pd.Series) -> Dict[str, int]:
+    """Distribution triée par effectif décroissant"""
+    counts = series.value_counts(sort=True)
+    return {str(key): int(count) for key, count in counts.items() if count}
+
+
+def _price_bands(prices: pd.DataFrame, key, limit: Optional[int] = None) -> Dict[str, Dict]:
+    """Bandes de prix (effectif, min, quartiles, max, moyenne, écart-type) par groupe"""
+    if prices.empty:
+        return {}
+    grouped = prices.groupby(key, observed=True)['price']
+    bands = grouped.agg(['count', 'min', 'max', 'mean', 'std'])
+    quartiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    bands['p25'], bands['median'], bands['p75'] = quartiles[0.25], quartiles[0.5], quartiles[0.75]
+    bands = bands.sort_values('count', ascending=False)
+    if limit:
+        bands = bands.head(limit)
+
+    result = {}
+    for group, band in bands.iterrows():
+        name = ' '.join(str(part) for part in group) if isinstance(group, tuple) else str(group)
+        result[name] = {column: _to_python(band[column])
+                        for column in ('count', 'min', 'p25', 'median', 'p75', 'max', 'mean', 'std')}
+        result[name]['count'] = int(band['count'])
+    return result
+
+
+def compute_statistics(reader: Optional[DatasetReader]) -> Dict:
+    """Statistiques complètes du catalogue en une passe vectorisée sur les offres"""
+    if reader is None:
+        frame = pd.DataFrame({name: pd.Series(dtype='category') for name in ('source', 'condition', 'brand', 'model')})
+        frame['price'] = pd.Series(dtype='float64')
+        product_brands = pd.Series(dtype='category')
+    else:
+        products = reader.frame('products', ['brand', 'model'])
+        frame = offers_frame(reader, products)
+        product_brands = _category(products['brand'], 'Unknown')
+
+    priced = frame[frame['price'] > 0]
+    prices = priced['price'].to_numpy()
+
+    if len(prices):
+        price_stats = {
+            'min': float(prices.min()),
+            'max': float(prices.max()),
+            'avg': float(prices.mean()),
+            'std': float(prices.std(ddof=1)) if len(prices) > 1 else 0.0,
+            'total_offers': int(len(prices)),
+        }
+        price_stats.update({name: float(value) for name, value in
+                            zip(QUANTILES, np.quantile(prices, list(QUANTILES.values())))})
+    else:
+        price_stats = {'min': 0, 'max': 0, 'avg': 0, 'std': 0, 'total_offers': 0}
+        price_stats.update({name: 0 for name in QUANTILES})
+
+    return {
+        "total_products": int(len(product_brands)),
+        "total_offers": int(len(frame)),
+        "sources_count": _counts(frame['source']),
+        "brand_distribution": _counts(product_brands),
+        "condition_distribution": _counts(frame['condition']),
+        "price_stats": price_stats,
+        "price_by_brand": _price_bands(priced, 'brand'),
+        "price_by_model": _price_bands(priced, ['brand', 'model'], limit=MODEL_BANDS_LIMIT),
+        "generated_at": datetime.now().isoformat()
+    }
@@ -0,0 +1,290 @@
+# scripts/data_processors/streaming_stats.py
+"""
+Statistiques en flux: les produits sont lus un par un et agrégés dans des accumulateurs
+fusionnables (moments de Welford, sketches KLL, compteurs exacts).
+
+Chaque tâche d'extraction écrit le partiel de sa source; la tâche de statistiques fusionne
+les partiels sans relire le catalogue fusionné. Les offres d'une source sont dédupliquées
+comme dans la fusion (même produit, même source et URL). Les quantiles sont approchés
+(KLL), tout le reste est exact. Les bandes par marque et par modèle utilisent la marque et
+le modèle de chaque source.
+
+Mémoire: les prix sont résumés par des sketches de taille bornée (k par marque, k réduit
+par modèle), mais deux structures restent exactes et grandissent avec les données:
+- `product_brands` garde un identifiant par produit distinct, O(produits), pour le nombre
+  de produits et la répartition par marque exacts (partiels compris);
+- la déduplication d'une source garde la clé de chacune de ses offres, O(offres de la
+  source), libérée une fois le partiel de la source calculé.
+"""
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .columnar import is_columnar
+from .json_loader import iter_json_records, json_loads
+from .manifest import write_json_atomic
+from .merge import normalized_product_id, offer_key
+from .sketches import DEFAULT_KLL_K, MODEL_BANDS_LIMIT, QUANTILES, KLLSketch, RunningMoments
+
+logger = logging.getLogger(__name__)
+
+STREAMING_STATS_VERSION = 2
+# Sketch réduit par modèle: beaucoup de modèles, quartiles seulement
+MODEL_KLL_K = 32
+
+
+class StreamingStats:
+    """Accumulateur de statistiques du catalogue, alimenté produit par produit"""
+
+    def __init__(self, k: int = DEFAULT_KLL_K):
+        self.k = k
+        self.product_brands: Dict[str, str] = {}  # product_id -> marque (première source)
+        self.total_offers = 0
+        self.sources: Dict[str, int] = {}
+        self.conditions: Dict[str, int] = {}
+        self.prices = RunningMoments()
+        self.price_sketch = KLLSketch(k)
+        self.brand_prices: Dict[str, Tuple[RunningMoments, KLLSketch]] = {}
+        self.model_prices: Dict[str, Tuple[RunningMoments, KLLSketch]] = {}  # 'marque modèle'
+        self._seen_offers: Dict[str, Set[Tuple]] = {}
+
+    def add_product(self, product: Dict, dedup: bool = False):
+        """Ajoute un produit et ses offres (dedup: ignore les offres déjà fusionnées dans ce produit)"""
+        product_id = product.get('product_id')
+        if not product_id:
+            return
+        product_id = normalized_product_id(product_id)
+        brand = product.get('brand', 'Unknown')
+        brand = brand if brand is not None else 'Unknown'
+        model = product.get('model')
+        model = model if model is not None else 'Unknown'
+        self.product_brands.setdefault(product_id, brand)
+
+        offers = product.get('offers', [])
+        if dedup:
+            # Même règle que merge_products: la première occurrence garde toutes ses offres
+            seen = self._seen_offers.get(product_id)
+            if seen is None:
+                self._seen_offers[product_id] = {offer_key(offer) for offer in offers}
+            else:
+                kept = []
+                for offer in offers:
+                    key = offer_key(offer)
+                    if key not in seen:
+                        seen.add(key)
+                        kept.append(offer)
+                offers = kept
+        for offer in offers:
+            self.add_offer(brand, offer.get('source'), offer.get('condition'), offer.get('price'), model)
+
+    @staticmethod
+    def _add_band(bands: Dict[str, Tuple[RunningMoments, KLLSketch]], key: str, k: int, price: float):
+        if key not in bands:
+            bands[key] = (RunningMoments(), KLLSketch(k))
+        moments, sketch = bands[key]
+        moments.add(price)
+        sketch.add(price)
+
+    def add_offer(self, brand: str, source: Optional[str], condition: Optional[str], price,
+                  model: str = 'Unknown'):
+        self.total_offers += 1
+        source = source if source is not None else 'Unknown'
+        condition = condition if condition is not None else 'Inconnu'
+        self.sources[source] = self.sources.get(source, 0) + 1
+        self.conditions[condition] = self.conditions.get(condition, 0) + 1
+
+        if isinstance(price, (int, float)) and not isinstance(price, bool) and price > 0:
+            price = float(price)
+            self.prices.add(price)
+            self.price_sketch.add(price)
+            self._add_band(self.brand_prices, brand, self.k, price)
+            self._add_band(self.model_prices, f"{brand} {model}", MODEL_KLL_K, price)
+
+    @staticmethod
+    def _merge_bands(bands: Dict[str, Tuple[RunningMoments, KLLSketch]],
+                     other: Dict[str, Tuple[RunningMoments, KLLSketch]], k: int):
+        for key, (moments, sketch) in other.items():
+            if key not in bands:
+                bands[key] = (RunningMoments(), KLLSketch(k))
+            bands[key][0].merge(moments)
+            bands[key][1].merge(sketch)
+
+    def merge(self, other: 'StreamingStats'):
+        """Fusionne un partiel (à appeler dans l'ordre canonique des sources)"""
+        for product_id, brand in other.product_brands.items():
+            self.product_brands.setdefault(product_id, brand)
+        self.total_offers += other.total_offers
+        for name, count in other.sources.items():
+            self.sources[name] = self.sources.get(name, 0) + count
+        for name, count in other.conditions.items():
+            self.conditions[name] = self.conditions.get(name, 0) + count
+        self.prices.merge(other.prices)
+        self.price_sketch.merge(other.price_sketch)
+        self._merge_bands(self.brand_prices, other.brand_prices, self.k)
+        self._merge_bands(self.model_prices, other.model_prices, MODEL_KLL_K)
+
+    @staticmethod
+    def _price_bands(bands: Dict[str, Tuple[RunningMoments, KLLSketch]],
+                     limit: Optional[int] = None) -> Dict[str, Dict]:
+        """Bandes de prix par groupe, par effectif décroissant (format de statistics._price_bands)"""
+        result = {}
+        for key, (moments, sketch) in sorted(bands.items(), key=lambda item: -item[1][0].count)[:limit]:
+            p25, median, p75 = sketch.quantiles([0.25, 0.5, 0.75])
+            result[key] = {
+                'count': moments.count, 'min': moments.min, 'p25': p25, 'median': median,
+                'p75': p75, 'max': moments.max, 'mean': moments.mean, 'std': moments.std,
+            }
+        return result
+
+    @staticmethod
+    def _sorted_counts(counts: Dict[str, int]) -> Dict[str, int]:
+        return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+
+    def result(self) -> Dict:
+        """Statistiques au format du moteur vectorisé (statistics.compute_statistics)"""
+        brand_counts: Dict[str, int] = {}
+        for brand in self.product_brands.values():
+            brand_counts[brand] = brand_counts.get(brand, 0) + 1
+
+        if self.prices.count:
+            price_stats = {
+                'min': self.prices.min,
+                'max': self.prices.max,
+                'avg': self.prices.mean,
+                'std': self.prices.std,
+                'total_offers': self.prices.count,
+            }
+            price_stats.update(zip(QUANTILES, self.price_sketch.quantiles(list(QUANTILES.values()))))
+        else:
+            price_stats = {'min': 0, 'max': 0, 'avg': 0, 'std': 0, 'total_offers': 0}
+            price_stats.update({name: 0 for name in QUANTILES})
+
+        return {
+            "total_products": len(self.product_brands),
+            "total_offers": self.total_offers,
+            "sources_count": self._sorted_counts(self.sources),
+            "brand_distribution": self._sorted_counts(brand_counts),
+            "condition_distribution": self._sorted_counts(self.conditions),
+            "price_stats": price_stats,
+            "price_by_brand": self._price_bands(self.brand_prices),
+            "price_by_model": self._price_bands(self.model_prices, MODEL_BANDS_LIMIT),
+            "generated_at": datetime.now().isoformat()
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': STREAMING_STATS_VERSION,
+            'k': self.k,
+            'product_brands': self.product_brands,
+            'total_offers': self.total_offers,
+            'sources': self.sources,
+            'conditions': self.conditions,
+            'prices': self.prices.to_dict(),
+            'price_sketch': self.price_sketch.to_dict(),
+            'brand_prices': {brand: [moments.to_dict(), sketch.to_dict()]
+                             for brand, (moments, sketch) in self.brand_prices.items()},
+            'model_prices': {model: [moments.to_dict(), sketch.to_dict()]
+                             for model, (moments, sketch) in self.model_prices.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'StreamingStats':
+        stats = cls(data['k'])
+        stats.product_brands = data['product_brands']
+        stats.total_offers = data['total_offers']
+        stats.sources = data['sources']
+        stats.conditions = data['conditions']
+        stats.prices = RunningMoments.from_dict(data['prices'])
+        stats.price_sketch = KLLSketch.from_dict(data['price_sketch'])
+        stats.brand_prices = {brand: (RunningMoments.from_dict(moments), KLLSketch.from_dict(sketch))
+                              for brand, (moments, sketch) in data['brand_prices'].items()}
+        stats.model_prices = {model: (RunningMoments.from_dict(moments), KLLSketch.from_dict(sketch))
+                              for model, (moments, sketch) in data['model_prices'].items()}
+        return stats
+
+    @classmethod
+    def from_products(cls, products: Iterable[Dict], dedup: bool = False) -> 'StreamingStats':
+        stats = cls()
+        for product in products:
+            stats.add_product(product, dedup=dedup)
+        stats._seen_offers = {}
+        return stats
+
+    @classmethod
+    def from_dataset(cls, path: Path) -> 'StreamingStats':
+        """Statistiques d'un jeu de données fusionné, lu en flux (JSON) ou par lots (Parquet)"""
+        if not is_columnar(path):
+            return cls.from_products(iter_json_records(path))
+
+        import pyarrow.parquet as pq
+        stats = cls()
+        products = pq.read_table(Path(path) / "products.parquet",
+                                 columns=['product_id', 'brand', 'model']).to_pydict()
+        brands = [brand if brand is not None else 'Unknown' for brand in products['brand']]
+        models = [model if model is not None else 'Unknown' for model in products['model']]
+        for product_id, brand in zip(products['product_id'], brands):
+            if product_id:
+                stats.product_brands.setdefault(normalized_product_id(product_id), brand)
+        offers = pq.ParquetFile(Path(path) / "offers.parquet")
+        for batch in offers.iter_batches(columns=['product_row', 'source', 'condition', 'price']):
+            columns = batch.to_pydict()
+            for row, source, condition, price in zip(columns['product_row'], columns['source'],
+                                                     columns['condition'], columns['price']):
+                stats.add_offer(brands[row], source, condition, price, models[row])
+        return stats
+
+
+# ============================================
+# PARTIELS PAR SOURCE
+# ============================================
+
+def _input_signature(path: Path) -> Dict:
+    """Taille et mtime du jeu de données (de chaque fichier pour un dossier Parquet)"""
+    path = Path(path)
+    files = sorted(p for p in path.iterdir() if p.is_file()) if path.is_dir() else [path]
+    return {'path': str(path),
+            'files': [[f.name, f.stat().st_size, f.stat().st_mtime_ns] for f in files]}
+
+
+def write_source_partial(products: List[Dict], dataset: Path, stats_dir: Path, source: str) -> Path:
+    """Écrit le partiel d'une source, lié au jeu de données transformé dont il provient"""
+    stats_dir = Path(stats_dir)
+    stats_dir.mkdir(parents=True, exist_ok=True)
+    partial = StreamingStats.from_products(products, dedup=True).to_dict()
+    partial['input'] = _input_signature(dataset)
+    path = stats_dir / f"{source}_partial.json"
+    write_json_atomic(path, partial)
+    return path
+
+
+def relink_source_partial(partial_path: Path, dataset: Path, stats_dir: Path, source: str) -> Path:
+    """Réutilise le partiel d'une source pour une copie identique de son jeu de données (autre run)"""
+    stats_dir = Path(stats_dir)
+    stats_dir.mkdir(parents=True, exist_ok=True)
+    partial = json_loads(Path(partial_path).read_bytes())
+    partial['input'] = _input_signature(dataset)
+    path = stats_dir / f"{source}_partial.json"
+    write_json_atomic(path, partial)
+    return path
+
+
+def combine_source_partials(stats_dir: Path, datasets: Dict[str, Path]) -> Optional[StreamingStats]:
+    """
+    Fusionne les partiels des sources (dans l'ordre de `datasets`).
+    None si un partiel manque ou ne correspond plus au jeu de données transformé.
+    """
+    combined = StreamingStats()
+    for source, dataset in datasets.items():
+        if not Path(dataset).exists():
+            continue  # Source absente de la fusion
+        path = Path(stats_dir) / f"{source}_partial.json"
+        if not path.exists():
+            logger.info(f"ℹ️ Partiel {source} absent")
+            return None
+        data = json_loads(path.read_bytes())
+        if data.get('version') != STREAMING_STATS_VERSION or data.get('input') != _input_signature(dataset):
+            logger.info(f"ℹ️ Partiel {source} obsolète")
+            return None
+        combined.merge(StreamingStats.from_dict(data))
+    return combined
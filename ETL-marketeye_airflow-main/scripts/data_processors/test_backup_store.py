@@ -0,0 +1,64 @@
+# scripts/data_processors/test_backup_store.py
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+import pytest
+from scripts.storage.backup_store import BackupStore
+
+
+def _products(count: int, price: float = 100.0):
+    return [{'product_id': f'p{i}', 'brand': 'Samsung', 'offers': [{'price': price + i}],
+             'metadata': {'last_updated': datetime.now().isoformat()}} for i in range(count)]
+
+
+def test_snapshots_deduplicate_and_restore(tmp_path):
+    store = BackupStore(tmp_path, codec='zz')
+    first = _products(50)
+    second = first[:40] + _products(10, price=500.0)[:10]
+
+    stats_first = store.save_snapshot(first)
+    stats_second = store.save_snapshot(second)
+    assert stats_second['reused_records'] == 40, "❌ Les produits inchangés doivent être réutilisés"
+    assert BackupStore(tmp_path).restore(stats_first['snapshot_id']) == first
+    assert BackupStore(tmp_path).restore() == second, "❌ Restauration du dernier snapshot inexacte"
+
+
+def test_snapshot_ids_are_unique_within_a_second(tmp_path):
+    store = BackupStore(tmp_path, codec='zz')
+    ids = [store.save_snapshot(_products(3, price=float(run)))['snapshot_id'] for run in range(5)]
+
+    assert len(set(ids)) == 5, f"❌ Identifiants de snapshot en double: {ids}"
+    assert store.snapshots() == sorted(ids)
+    with pytest.raises(FileExistsError):
+        store.save_snapshot(_products(1), snapshot_id=ids[0])
+
+
+def test_leftover_tmp_manifest_is_ignored(tmp_path):
+    store = BackupStore(tmp_path, codec='zz')
+    snapshot_id = store.save_snapshot(_products(5))['snapshot_id']
+    manifest = tmp_path / "snapshots" / f"{snapshot_id}.json.zz"
+    # Écriture interrompue d'un autre snapshot, et copie temporaire du manifeste existant
+    (tmp_path / "snapshots" / "20200101_000000.json.zz.tmp").write_bytes(b'partiel')
+    manifest.with_name(manifest.name + '.tmp').write_bytes(b'partiel')
+
+    assert store.snapshots() == [snapshot_id], "❌ Un fichier .tmp est listé comme snapshot"
+    assert len(store.restore(snapshot_id)) == 5
+    with pytest.raises(FileNotFoundError):
+        store.manifest("20200101_000000")
+
+
+def test_retention_and_gc_free_unreferenced_records(tmp_path):
+    store = BackupStore(tmp_path, codec='zz')
+    for run in range(3):
+        store.save_snapshot(_products(10, price=100.0 * (run + 1)))
+
+    removed = store.apply_retention(keep_last=1, keep_days=0, now=datetime.now() + timedelta(seconds=1))
+    stats = store.gc()
+    assert len(removed) == 2
+    assert stats['dead_records'] == 20, f"❌ {stats['dead_records']} produits libérés au lieu de 20"
+    assert len(BackupStore(tmp_path).restore()) == 10
@@ -0,0 +1,46 @@
+# scripts/data_processors/test_columnar.py
+import sys
+import json
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+import pytest
+from scripts.data_processors.columnar import DatasetReader, load_dataset, save_dataset
+
+PRODUCTS = [
+    {'product_id': 'p0', 'brand': 'Samsung', 'model': 'S24', 'specifications': {'storage': '256GB', 'ram': 8},
+     'offers': [{'source': 'Jumia', 'price': 100, 'currency': 'MAD', 'rating': 4.5},
+                {'source': 'Avito', 'price': 99.5, 'location': None, 'reviews_count': '12'}]},
+    {'product_id': 'p1', 'brand': None, 'metadata': {'sources': ['Avito']}},  # Sans clé offers
+    {'product_id': 'p2', 'model': 7, 'offers': []},
+    {'product_id': 'p3', 'offers': [{'price': '1 299 DH', 'url': 'https://avito.ma/3'}, {'price': True}]},
+]
+
+
+@pytest.mark.parametrize('output_format', ['json', 'parquet'])
+def test_dataset_roundtrip_is_lossless(tmp_path, output_format):
+    path = save_dataset(PRODUCTS, tmp_path / "marketeye_final", output_format)
+
+    products = load_dataset(path)
+    assert products == PRODUCTS, "❌ Reconstruction différente des produits d'origine"
+    assert type(products[0]['offers'][0]['price']) is int, "❌ Prix entier relu en flottant"
+    assert list(DatasetReader(path).iter_products()) == PRODUCTS
+
+
+def test_parquet_price_column_stays_numeric(tmp_path):
+    path = save_dataset(PRODUCTS, tmp_path / "marketeye_final", 'parquet')
+
+    prices = DatasetReader(path).columns('offers', ['price'])['price']
+    assert prices == [100.0, 99.5, None, None], "❌ Colonne price non typée"
+
+
+def test_json_dataset_is_written_atomically(tmp_path):
+    stem = tmp_path / "marketeye_final"
+    path = save_dataset(PRODUCTS, stem, 'json')
+
+    assert json.loads(path.read_text(encoding='utf-8')) == PRODUCTS
+    assert '\n' not in path.read_text(encoding='utf-8'), "❌ JSON encore indenté"
+    assert [p.name for p in tmp_path.iterdir()] == ['marketeye_final.json'], "❌ Fichier temporaire laissé"
@@ -0,0 +1,49 @@
+# scripts/data_processors/test_config.py
+import sys
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+from config import pipeline_config
+from config.pipeline_config import PipelineConfig, get_config, reset_config
+
+
+def test_base_dir_override_moves_derived_directories(tmp_path):
+    config = PipelineConfig({'BASE_DIR': str(tmp_path), 'BACKUP_DIR': str(tmp_path / "ailleurs")})
+
+    assert config.BASE_DIR == tmp_path
+    assert config.RAW_DATA_DIR == tmp_path / "data" / "raw", "❌ RAW_DATA_DIR non dérivé du BASE_DIR surchargé"
+    assert config.CACHE_DIR == tmp_path / "data" / "processed" / "cache"
+    assert config.RUNS_DIR == tmp_path / "data" / "processed" / "runs"
+    assert config.BACKUP_DIR == tmp_path / "ailleurs"
+
+
+def test_overrides_are_cast_to_default_types():
+    config = PipelineConfig({'STORAGE_TIMEOUT': '2.5', 'DB_POOL_SIZE': '7', 'DB_POOL_PRE_PING': 'false',
+                             'STORAGE_SINKS': 'postgresql, json_backup', 'INCONNU': 1})
+
+    assert config.STORAGE_TIMEOUT == 2.5, "❌ Délai flottant resté en chaîne"
+    assert config.DB_POOL_SIZE == 7
+    assert config.DB_POOL_PRE_PING is False, "❌ 'false' interprété comme vrai"
+    assert config.STORAGE_SINKS == ['postgresql', 'json_backup']
+    assert not hasattr(config, 'INCONNU')
+
+
+def test_storage_clients_read_the_shared_config(monkeypatch):
+    from scripts.storage import clients
+
+    monkeypatch.setattr(pipeline_config, '_airflow_overrides', lambda: {
+        'POSTGRES_CONN_ID': 'pg_test', 'POSTGRES_DEFAULT_URL': 'postgresql://test/db',
+        'MONGO_DEFAULT_URI': 'mongodb://test:27017'})
+    requested = []
+    monkeypatch.setattr(clients, '_airflow_connection', lambda conn_id: requested.append(conn_id))
+    reset_config()
+    try:
+        assert get_config().POSTGRES_CONN_ID == 'pg_test'
+        assert clients.postgres_url() == 'postgresql://test/db', "❌ Surcharge marketeye_config ignorée"
+        assert clients.mongo_uri() == 'mongodb://test:27017'
+        assert requested == ['pg_test', get_config().MONGO_CONN_ID]
+    finally:
+        reset_config()
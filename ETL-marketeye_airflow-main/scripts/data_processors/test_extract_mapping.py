@@ -0,0 +1,105 @@
+# scripts/data_processors/test_extract_mapping.py
+import sys
+import json
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+import pytest
+from config.pipeline_config import get_config, reset_config
+from scripts.pipeline.extract import combine_extracted, discover_raw_files, extract_file
+
+JUMIA = [{'title': f'Samsung Galaxy A{i} 128GB', 'brand': 'Samsung', 'price': f'{1000 + i} Dhs',
+          'product_url': f'https://jumia.ma/a{i}'} for i in range(60)]
+AVITO = [{'title': f'iPhone {i} Pro', 'price': f'{5000 + i} DH', 'url': f'https://avito.ma/{i}'} for i in range(5)]
+
+
+class FakeTaskInstance:
+    """XCom en mémoire: les valeurs de retour des instances mappées de extract_file"""
+
+    def __init__(self):
+        self.xcom = {}
+        self.mapped_results = []
+
+    def xcom_push(self, key, value):
+        self.xcom[key] = value
+
+    def xcom_pull(self, key=None, task_ids=None):
+        return self.mapped_results if task_ids == 'extract_file' else self.xcom.get(key)
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setenv('MARKETEYE_BASE_DIR', str(tmp_path))
+    reset_config()
+    config = get_config()
+    config.SHARD_SIZE_MB = 2 / 1024  # Plages de 2 Ko: le fichier Jumia est découpé
+    config.FILE_TRANSFORM_WORKERS = 1
+    config.OUTPUT_FORMAT = 'json'
+    raw_dir = config.ensure_dir(config.RAW_DATA_DIR)
+    (raw_dir / "jumia_phones.json").write_text(json.dumps(JUMIA, indent=2), encoding='utf-8')
+    (raw_dir / "avito_ads.jsonl").write_text('\n'.join(json.dumps(item) for item in AVITO), encoding='utf-8')
+    yield config
+    reset_config()
+
+
+def _run(context):
+    tasks = discover_raw_files(**context)
+    context['ti'].mapped_results = [extract_file(**task, **context) for task in tasks]
+    return tasks, combine_extracted(**context)
+
+
+def test_one_task_per_file_or_range_then_combine(config):
+    context = {'run_id': 'manual__test', 'ti': FakeTaskInstance()}
+    tasks, totals = _run(context)
+
+    jumia_tasks = [task for task in tasks if task['source'] == 'jumia']
+    assert len(jumia_tasks) > 1 and all('start' in task for task in jumia_tasks), "❌ Gros fichier non découpé"
+    assert [task for task in tasks if task['source'] == 'avito'] == [
+        {'source': 'avito', 'path': str(config.RAW_DATA_DIR / "avito_ads.jsonl")}]
+    assert totals == {'avito': 5, 'jumia': 60, 'electroplanet': 0}
+
+    # Plages regroupées dans l'ordre du fichier d'origine
+    from scripts.pipeline.common import run_registry
+    products = run_registry(context).open('jumia_transformed').products()
+    assert [product['offers'][0]['url'] for product in products] == [item['product_url'] for item in JUMIA]
+
+
+def test_second_run_reuses_every_file_cache(config):
+    first = FakeTaskInstance()
+    _run({'run_id': 'run_1', 'ti': first})
+    second = FakeTaskInstance()
+    tasks, totals = _run({'run_id': 'run_2', 'ti': second})
+
+    assert [result['output'] for result in second.mapped_results] == \
+           [result['output'] for result in first.mapped_results], "❌ Sorties en cache non réutilisées"
+    assert totals['jumia'] == 60 and second.xcom['jumia_count'] == 60
+
+
+def test_unchanged_sources_are_not_recombined(config, monkeypatch):
+    from scripts.pipeline import extract
+    from scripts.pipeline.common import run_registry
+
+    config.STATS_MODE = 'streaming'
+    _run({'run_id': 'run_1', 'ti': FakeTaskInstance()})
+    # Avito modifié: seule cette source relit ses sorties
+    avito = AVITO + [{'title': 'iPhone 15', 'price': '9000 DH', 'url': 'https://avito.ma/15'}]
+    (config.RAW_DATA_DIR / "avito_ads.jsonl").write_text(
+        '\n'.join(json.dumps(item) for item in avito), encoding='utf-8')
+    read = []
+    monkeypatch.setattr(extract, 'load_json_file', lambda path: read.append(path) or json.loads(path.read_text()))
+
+    context = {'run_id': 'run_2', 'ti': FakeTaskInstance()}
+    _, totals = _run(context)
+
+    assert totals == {'avito': 6, 'jumia': 60, 'electroplanet': 0}
+    assert all('/avito/' in str(path) for path in read), f"❌ Sorties Jumia relues: {read}"
+    registry = run_registry(context)
+    assert registry.entry('jumia_transformed')['rows'] == {'products': 60, 'offers': 60}
+    assert len(registry.open('jumia_transformed').products()) == 60
+    assert (registry.run_dir / "stats" / "jumia_partial.json").exists(), "❌ Partiel Jumia absent du run"
+    from scripts.data_processors.streaming_stats import combine_source_partials
+    from scripts.pipeline.catalogue import source_paths
+    assert combine_source_partials(registry.subdir("stats"), source_paths(registry)) is not None
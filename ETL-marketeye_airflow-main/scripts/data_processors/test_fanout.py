@@ -0,0 +1,42 @@
+# scripts/data_processors/test_fanout.py
+import sys
+import threading
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+from scripts.storage.fanout import run_sinks
+
+
+def test_sinks_run_in_parallel_and_failures_are_isolated():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def waiting_sink(reader):
+        barrier.wait()  # Bloque si les destinations tournent l'une après l'autre
+        return {'products': len(reader)}
+
+    def failing_sink(reader):
+        raise ConnectionError("base indisponible")
+
+    results = run_sinks({'a': waiting_sink, 'b': waiting_sink, 'c': failing_sink}, [1, 2, 3])
+    assert results['a'] == {'status': 'success', 'result': {'products': 3}, 'seconds': results['a']['seconds']}
+    assert results['b']['status'] == 'success'
+    assert results['c']['status'] == 'failed' and 'ConnectionError' in results['c']['error']
+
+
+def test_timeout_marks_slow_sink_failed(caplog):
+    release = threading.Event()
+
+    def slow_sink(reader):
+        release.wait(5)
+        return {}
+
+    try:
+        results = run_sinks({'slow': slow_sink, 'fast': lambda reader: {'ok': True}}, None, timeout=0.2)
+    finally:
+        release.set()
+    assert results['slow']['status'] == 'failed', "❌ Une destination hors délai doit être en échec"
+    assert results['fast']['status'] == 'success'
+    assert 'arrière-plan' in caplog.text, "❌ Le thread qui continue doit être signalé"
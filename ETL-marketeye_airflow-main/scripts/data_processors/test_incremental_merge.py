@@ -0,0 +1,85 @@
+# scripts/data_processors/test_incremental_merge.py
+import sys
+import json
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+from scripts.data_processors import incremental_merge
+from scripts.data_processors.incremental_merge import IncrementalMerger, bucket_of
+from scripts.data_processors.merge import merge_products
+
+SOURCES = ['jumia', 'avito']
+
+
+def _products(source: str, count: int, price: float = 100.0):
+    return [{'product_id': f'p{i}', 'brand': 'Samsung',
+             'offers': [{'source': source, 'price': price + i, 'url': f'https://{source}.ma/{i}'}]}
+            for i in range(count)]
+
+
+def _write(path: Path, products):
+    path.write_text(json.dumps(products), encoding='utf-8')
+    return path
+
+
+def _full_merge(paths):
+    return merge_products([product for source in SOURCES
+                           for product in json.loads(paths[source].read_text(encoding='utf-8'))])
+
+
+def test_incremental_merge_matches_full_merge(tmp_path):
+    paths = {'jumia': _write(tmp_path / "jumia.json", _products('jumia', 200)),
+             'avito': _write(tmp_path / "avito.json", _products('avito', 150, 90.0))}
+    merger = IncrementalMerger(tmp_path / "merge_state", SOURCES)
+    products, changed = merger.merge(paths)
+    assert changed == SOURCES and products == _full_merge(paths)
+
+    # Avito: une offre modifiée, un produit retiré, un produit ajouté
+    avito = _products('avito', 150, 90.0)
+    avito[3]['offers'][0]['price'] = 1.0
+    del avito[7]
+    avito.append({'product_id': 'p999', 'offers': [{'source': 'avito', 'price': 5.0, 'url': 'u'}]})
+    _write(paths['avito'], avito)
+
+    products, changed = merger.merge(paths)
+    assert changed == ['avito']
+    assert products == _full_merge(paths), "❌ Fusion incrémentale différente de la fusion complète"
+
+
+def test_only_touched_buckets_are_rewritten(tmp_path, monkeypatch):
+    paths = {'jumia': _write(tmp_path / "jumia.json", _products('jumia', 300)),
+             'avito': _write(tmp_path / "avito.json", _products('avito', 300))}
+    merger = IncrementalMerger(tmp_path / "merge_state", SOURCES)
+    merger.merge(paths)
+
+    avito = _products('avito', 300)
+    avito[42]['offers'][0]['price'] = 1.0
+    _write(paths['avito'], avito)
+    written = []
+    original = incremental_merge.write_json_atomic
+    monkeypatch.setattr(incremental_merge, 'write_json_atomic',
+                        lambda path, data: written.append(path) or original(path, data))
+
+    merger.merge(paths)
+    bucket = bucket_of('p42')
+    assert sorted(path.relative_to(merger.state_dir).as_posix() for path in written) == \
+        sorted([f"partials/avito/{bucket}.json", f"merged/{bucket}.json", "state.json"]), \
+        f"❌ Compartiments réécrits: {written}"
+    merged = json.loads(merger._merged_path(bucket).read_text(encoding='utf-8'))
+    assert [offer['price'] for offer in merged['p42']['offers']] == [142.0, 1.0]
+
+
+def test_legacy_state_is_rebuilt(tmp_path):
+    state_dir = tmp_path / "merge_state"
+    state_dir.mkdir()
+    (state_dir / "state.json").write_text(json.dumps({'version': 1}), encoding='utf-8')
+    (state_dir / "merged.json").write_text('{}', encoding='utf-8')
+    (state_dir / "jumia_partial.json").write_text('{}', encoding='utf-8')
+    paths = {'jumia': _write(tmp_path / "jumia.json", _products('jumia', 5)), 'avito': None}
+
+    products, changed = IncrementalMerger(state_dir, SOURCES).merge(paths)
+    assert len(products) == 5 and changed == SOURCES
+    assert not (state_dir / "merged.json").exists() and not (state_dir / "jumia_partial.json").exists()
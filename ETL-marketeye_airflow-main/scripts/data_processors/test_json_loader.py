@@ -0,0 +1,107 @@
+# scripts/data_processors/test_json_loader.py
+import sys
+import json
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+import pytest
+from scripts.data_processors.json_loader import iter_json_records, load_json_file
+
+# Chaînes piégeuses pour le saut d'élément: crochets, accolades et virgules dans les valeurs
+RECORDS = [{'id': i, 'title': 'Galaxy "S24" \\ ] } , [ {', 'tags': [1, {'a': ']'}]} for i in range(2000)]
+
+
+def _write_corrupted(path: Path, records, bad_id: int):
+    """Tableau indenté dont l'élément `bad_id` est invalide (virgule en trop)"""
+    text = json.dumps(records, indent=2)
+    marker = f'"id": {bad_id},'
+    path.write_text(text.replace(marker, marker + ',', 1), encoding='utf-8')
+
+
+def test_array_roundtrip_streaming(tmp_path):
+    path = tmp_path / "ads.json"
+    path.write_text(json.dumps(RECORDS, indent=2), encoding='utf-8')
+
+    records = list(iter_json_records(path, chunk_size=1024, stream_threshold=0))
+    assert records == RECORDS, "❌ Lecture en flux différente du tableau d'origine"
+
+
+def test_invalid_element_is_skipped(tmp_path):
+    path = tmp_path / "ads.json"
+    _write_corrupted(path, RECORDS, bad_id=10)
+
+    ids = [record['id'] for record in iter_json_records(path, chunk_size=1024, stream_threshold=0)]
+    assert len(ids) == len(RECORDS) - 1, f"❌ {len(ids)} éléments lus au lieu de {len(RECORDS) - 1}"
+    assert 10 not in ids and ids[9:11] == [9, 11], "❌ La lecture doit reprendre après l'élément invalide"
+    # Repli du chargement complet (tableau invalide) sur la lecture élément par élément
+    assert len(load_json_file(path)) == len(RECORDS) - 1
+
+
+def test_invalid_element_does_not_buffer_rest_of_file(tmp_path):
+    path = tmp_path / "ads.json"
+    _write_corrupted(path, RECORDS, bad_id=10)
+
+    class CountingFile:
+        """Fichier texte qui mesure la plus grande lecture demandée"""
+        def __init__(self, f):
+            self.f = f
+            self.max_read = 0
+        def read(self, size):
+            self.max_read = max(self.max_read, size)
+            return self.f.read(size)
+
+    from scripts.data_processors.json_loader import _iter_json_array
+    with open(path, 'r', encoding='utf-8') as f:
+        counting = CountingFile(f)
+        count = sum(1 for _ in _iter_json_array(counting, path, 1024))
+    assert count == len(RECORDS) - 1
+    assert counting.max_read < 4 * 1024, f"❌ Buffer agrandi jusqu'à {counting.max_read} caractères"
+
+
+def test_truncated_array_raises(tmp_path):
+    path = tmp_path / "ads.json"
+    path.write_text(json.dumps(RECORDS)[:-500], encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        list(iter_json_records(path, chunk_size=1024, stream_threshold=0))
+    with pytest.raises(ValueError):
+        load_json_file(path)
+
+
+def test_json_lines_skip_invalid_line(tmp_path):
+    path = tmp_path / "ads.jsonl"
+    lines = [json.dumps(record) for record in RECORDS[:5]]
+    lines[2] = lines[2][:-3]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    ids = [record['id'] for record in iter_json_records(path)]
+    assert ids == [0, 1, 3, 4]
+
+
+def test_element_cut_at_buffer_end_is_not_skipped(tmp_path):
+    # Échappements \uXXXX, littéraux et nombres coupés par la fin du buffer: relus avec la suite
+    records = [{'id': i, 'title': 'Téléphone ça', 'promo': i % 2 == 0, 'price': -1.5e3 + i}
+               for i in range(300)]
+    path = tmp_path / "ads.json"
+    path.write_text(json.dumps(records, indent=2), encoding='utf-8')
+
+    for chunk_size in (97, 256, 1000):
+        loaded = list(iter_json_records(path, chunk_size=chunk_size, stream_threshold=0))
+        assert loaded == records, f"❌ Éléments perdus avec des blocs de {chunk_size} caractères"
+
+
+def test_read_error_propagates_from_small_array(tmp_path, monkeypatch):
+    path = tmp_path / "ads.json"
+    path.write_text(json.dumps(RECORDS[:5]), encoding='utf-8')
+
+    def failing_read(self):
+        raise OSError("disque indisponible")
+    monkeypatch.setattr(Path, 'read_bytes', failing_read)
+
+    with pytest.raises(OSError):
+        list(iter_json_records(path))
+    # API liste historique: erreur journalisée, liste vide
+    assert load_json_file(path) == []
@@ -0,0 +1,23 @@
+# scripts/data_processors/test_jumia_rating.py
+import sys
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+import pytest
+from config.pipeline_config import get_config
+from scripts.data_processors.jumia_extractor import JumiaExtractor
+
+
+@pytest.mark.parametrize('rating, expected', [
+    ("4.5 out of 5", 4.5),
+    ("3/5", 3.0),
+    # Les deux formes: "out of" reste prioritaire, même placé après
+    ("3/5 (4.2 out of 5)", 4.2),
+    ("Note 4", 4.0),
+    ("", 0.0),
+])
+def test_extract_rating(rating, expected):
+    assert JumiaExtractor(get_config()).extract_rating(rating) == expected
@@ -0,0 +1,77 @@
+# scripts/data_processors/test_manifest.py
+import sys
+import os
+import json
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+from scripts.data_processors.manifest import FileManifest
+
+PRODUCTS = [{'product_id': 'p1', 'brand': 'Samsung'}]
+
+
+def _raw_file(tmp_path: Path, content) -> Path:
+    path = tmp_path / "raw" / "avito_ads.json"
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(json.dumps(content), encoding='utf-8')
+    return path
+
+
+def _reopen(tmp_path: Path, version: int = 1) -> FileManifest:
+    return FileManifest(tmp_path / "cache", 'dag.transform_avito_item', version)
+
+
+def test_unchanged_file_is_reused_after_save(tmp_path):
+    raw = _raw_file(tmp_path, [{'id': 1}])
+    manifest = _reopen(tmp_path)
+    assert manifest.cached_output(raw) is None
+    manifest.record(raw, PRODUCTS)
+    manifest.save()
+
+    reopened = _reopen(tmp_path)
+    assert reopened.load_cached(raw) == PRODUCTS, "❌ Fichier inchangé non réutilisé"
+    assert reopened.output_count(raw) == 1
+    assert (reopened.hits, reopened.misses) == (1, 0)
+
+
+def test_touched_file_with_same_content_is_reused(tmp_path):
+    raw = _raw_file(tmp_path, [{'id': 1}])
+    manifest = _reopen(tmp_path)
+    manifest.record(raw, PRODUCTS)
+    stat = raw.stat()
+    os.utime(raw, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert manifest.cached_output(raw) is not None, "❌ Même contenu, mtime différent: le sha256 doit trancher"
+    assert manifest.entries[str(raw)]['mtime_ns'] == raw.stat().st_mtime_ns
+
+
+def test_modified_file_is_transformed_again(tmp_path):
+    raw = _raw_file(tmp_path, [{'id': 1}])
+    manifest = _reopen(tmp_path)
+    manifest.record(raw, PRODUCTS)
+
+    raw.write_text(json.dumps([{'id': 2}]), encoding='utf-8')  # même taille, contenu différent
+    stat = raw.stat()
+    os.utime(raw, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert manifest.cached_output(raw) is None, "❌ Fichier modifié servi depuis le cache"
+
+
+def test_transform_version_invalidates_cache(tmp_path):
+    raw = _raw_file(tmp_path, [{'id': 1}])
+    manifest = _reopen(tmp_path)
+    manifest.record(raw, PRODUCTS)
+    manifest.save()
+
+    assert _reopen(tmp_path, version=2).cached_output(raw) is None
+
+
+def test_prune_forgets_removed_files_and_orphan_outputs(tmp_path):
+    raw = _raw_file(tmp_path, [{'id': 1}])
+    manifest = _reopen(tmp_path)
+    output = manifest.record(raw, PRODUCTS)
+
+    assert manifest.prune([]) == 1
+    assert not output.exists() and manifest.entries == {}
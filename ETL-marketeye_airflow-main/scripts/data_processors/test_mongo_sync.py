@@ -0,0 +1,79 @@
+# scripts/data_processors/test_mongo_sync.py
+import sys
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+import pytest
+mongomock = pytest.importorskip('mongomock')
+from pymongo.errors import AutoReconnect
+
+from scripts.storage import mongo_sync
+from scripts.storage.mongo_sync import MongoBulkSync
+
+
+def _products(ids, price: float = 100.0):
+    return [{'product_id': f'p{i}', 'brand': 'Samsung', 'offers': [{'price': price + i}]} for i in ids]
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().marketeye.products
+
+
+def test_upsert_batches_and_delete_missing(collection):
+    first = MongoBulkSync(collection, batch_size=4).sync(_products(range(10)))
+    assert first['upserted'] == 10 and first['batches'] == 3 and first['deleted'] == 0
+
+    # p0-p5 gardés (p5 modifié), p6-p9 disparus, p10 nouveau
+    products = _products(range(5)) + _products([5], price=999.0) + _products([10]) + _products([0])
+    second = MongoBulkSync(collection, batch_size=4).sync(products)
+
+    assert second['products'] == 7, "❌ Un doublon de product_id doit être ignoré"
+    assert second['upserted'] == 1 and second['matched'] == 6 and second['modified'] == 1
+    assert second['deleted'] == 4
+    assert {doc['product_id'] for doc in collection.find()} == {f'p{i}' for i in (0, 1, 2, 3, 4, 5, 10)}
+    assert collection.find_one({'product_id': 'p5'})['offers'][0]['price'] == 1004.0
+    assert any(index['key'] == [('product_id', 1)] and index.get('unique')
+               for index in collection.index_information().values()), "❌ Index unique product_id absent"
+
+
+class FlakyCollection:
+    """Collection dont les `failures` premiers bulk_write échouent sur une erreur réseau"""
+
+    def __init__(self, collection, failures: int):
+        self.collection = collection
+        self.failures = failures
+        self.calls = 0
+
+    def bulk_write(self, operations, ordered=True):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise AutoReconnect("connexion perdue")
+        return self.collection.bulk_write(operations, ordered=ordered)
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+def test_connection_failure_retries_with_backoff(collection, monkeypatch):
+    delays = []
+    monkeypatch.setattr(mongo_sync.time, 'sleep', delays.append)
+    flaky = FlakyCollection(collection, failures=2)
+
+    stats = MongoBulkSync(flaky, batch_size=100, max_retries=3, retry_delay=1.0).sync(_products(range(5)))
+    assert stats['retries'] == 2 and stats['upserted'] == 5
+    assert delays == [1.0, 2.0], f"❌ Attentes attendues 1s puis 2s, obtenues {delays}"
+    assert collection.count_documents({}) == 5
+
+
+def test_connection_failure_gives_up_after_max_retries(collection, monkeypatch):
+    monkeypatch.setattr(mongo_sync.time, 'sleep', lambda delay: None)
+    flaky = FlakyCollection(collection, failures=10)
+
+    with pytest.raises(AutoReconnect):
+        MongoBulkSync(flaky, max_retries=2).sync(_products(range(3)))
+    assert flaky.calls == 3
+    assert collection.count_documents({}) == 0
@@ -0,0 +1,265 @@
+# scripts/data_processors/test_postgres_storage.py
+"""
+Chargement PostgreSQL: contre une connexion factice qui enregistre le SQL (toujours exécuté),
+et contre une vraie base si MARKETEYE_TEST_POSTGRES_URL est défini (psycopg2 requis).
+"""
+import sys
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+import pytest
+from scripts.storage.postgres_loader import PostgresBulkLoader, offer_row_key, row_hash
+from scripts.storage.postgres_sync import PostgresUpsertSync
+
+NOW = datetime(2024, 1, 2, 3, 4, 5)
+POSTGRES_URL = os.environ.get('MARKETEYE_TEST_POSTGRES_URL')
+
+
+def product_row(product_id: str, brand: str = 'Samsung', model: str = 'S24', now: datetime = NOW):
+    values = (product_id, brand, model, f'{brand} {model}', '{}')
+    return values + (row_hash(values), now, now, None)
+
+
+def offer_row(product_id: str, price: float, url: str, now: datetime = NOW):
+    values = (product_id, 'Jumia', price, 'MAD', 'Neuf', 'pro', url)
+    return (offer_row_key(product_id, 'Jumia', url),) + values + ('2024-01-01', row_hash(values), now, now, None)
+
+
+def catalogue(count: int, price: float = 100.0):
+    return {'products': [product_row(f'p{i}') for i in range(count)],
+            'offers': [offer_row(f'p{i}', price + i, f'https://jumia.ma/{i}') for i in range(count)]}
+
+
+# ============================================
+# CONNEXION FACTICE
+# ============================================
+
+class FakeCursor:
+    """Curseur qui enregistre les requêtes; `fail_on` lève une erreur sur la requête qui le contient"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self.connection.statements.append((sql, params))
+        if self.connection.fail_on and self.connection.fail_on in sql:
+            raise RuntimeError(f"échec simulé: {sql}")
+        self._result = self.connection.respond(sql, params)
+
+    def copy_expert(self, sql, buffer):
+        table = sql.split()[1]
+        self.connection.copied.setdefault(table, []).extend(line.split('\t') for line in buffer.read().splitlines())
+
+    def fetchall(self):
+        return self._result
+
+
+class FakeConnection:
+    def __init__(self, indexes=None, existing=None, fail_on=None):
+        self.indexes = indexes or {}      # table -> [(nom, définition)] de pg_indexes
+        self.existing = existing or {}    # table -> [(clé, hash, supprimée)] en base
+        self.fail_on = fail_on
+        self.statements = []
+        self.copied = {}
+        self.committed = self.rolled_back = self.closed = False
+
+    def respond(self, sql, params):
+        if sql.startswith("SELECT indexname"):
+            return self.indexes.get(params[0], [])
+        if sql.startswith("SELECT") and 'row_hash' in sql:
+            return self.existing.get(sql.split()[-1], [])
+        if 'RETURNING (xmax = 0)' in sql:
+            # Comme PostgreSQL: xmax = 0 pour une ligne insérée, pas pour une ligne mise à jour
+            table = sql.split()[2]
+            keys = {key for key, _, _ in self.existing.get(table, [])}
+            return [(row[0] not in keys,) for row in self.copied[f"{table}_changes"]]
+        return []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+    def sql(self):
+        return [sql for sql, _ in self.statements]
+
+
+class FakeEngine:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def raw_connection(self):
+        return self.connection
+
+
+# ============================================
+# CHARGEMENT EN MASSE (staging + échange)
+# ============================================
+
+def test_bulk_load_swaps_staging_tables_in_one_transaction():
+    connection = FakeConnection(indexes={'products': [
+        ('idx_products_brand', 'CREATE INDEX idx_products_brand ON public.products USING btree (brand)'),
+        ('uq_products_product_id', 'CREATE UNIQUE INDEX uq_products_product_id ON public.products USING btree (product_id)'),
+    ]})
+    results = PostgresBulkLoader(FakeEngine(connection), batch_rows=2).load(catalogue(5))
+    statements = connection.sql()
+
+    assert statements[0].startswith("SELECT pg_advisory_xact_lock"), "❌ Verrou du catalogue absent"
+    assert results['products']['rows'] == 5 and results['offers']['rows'] == 5
+    assert len(connection.copied['products_staging']) == 5, "❌ Lignes COPY manquantes"
+    # Index existants recréés à l'identique sur le staging, puis renommés
+    assert ("CREATE INDEX idx_products_brand_staging ON products_staging USING btree (brand)" in statements)
+    assert "ALTER INDEX uq_products_product_id_staging RENAME TO uq_products_product_id" in statements
+    # Table sans index en service: index par défaut
+    assert "CREATE UNIQUE INDEX uq_offers_offer_key_staging ON offers_staging (offer_key)" in statements
+
+    swap = statements.index("DROP TABLE IF EXISTS products")
+    assert statements[swap + 1] == "ALTER TABLE products_staging RENAME TO products"
+    assert swap > statements.index("ANALYZE offers_staging"), "❌ Table en service supprimée avant la fin du chargement"
+    assert connection.committed and not connection.rolled_back and connection.closed
+
+
+def test_bulk_load_rolls_back_when_swap_fails():
+    connection = FakeConnection(fail_on="RENAME TO offers")
+
+    with pytest.raises(RuntimeError):
+        PostgresBulkLoader(FakeEngine(connection)).load(catalogue(3))
+    assert connection.rolled_back and not connection.committed, "❌ Échec de l'échange sans rollback"
+    assert connection.closed
+
+
+# ============================================
+# SYNCHRONISATION INCRÉMENTALE (upsert + suppression logique)
+# ============================================
+
+def test_upsert_sync_counts_and_statements():
+    rows = catalogue(5)
+    existing = [
+        ('p0', rows['products'][0][5], False),   # inchangé
+        ('p1', 'ancien-hash', False),             # modifié
+        ('p2', rows['products'][2][5], True),     # supprimé puis revenu
+        ('p9', 'hash', False),                    # disparu
+        ('p8', 'hash', True),                     # déjà supprimé
+    ]
+    connection = FakeConnection(existing={'products': existing})
+    products = rows['products'] + [rows['products'][3]]  # Doublon: une seule ligne upsertée
+
+    results = PostgresUpsertSync(FakeEngine(connection)).sync({'products': products, 'offers': rows['offers']}, NOW)
+
+    assert results['products'] == {'rows': 5, 'inserted': 2, 'updated': 2, 'deleted': 1, 'unchanged': 1,
+                                   'seconds': results['products']['seconds']}
+    assert results['offers']['inserted'] == 5
+    assert sorted(row[0] for row in connection.copied['products_changes']) == ['p1', 'p2', 'p3', 'p4']
+
+    upsert = next(sql for sql in connection.sql() if sql.startswith("INSERT INTO products"))
+    assert "ON CONFLICT (product_id) DO UPDATE" in upsert
+    assert "created_at = EXCLUDED" not in upsert, "❌ created_at écrasé par l'upsert"
+    soft_delete = [params for sql, params in connection.statements if sql.startswith("UPDATE products")]
+    assert soft_delete == [(NOW, NOW, ['p9'])], f"❌ Suppression logique inattendue: {soft_delete}"
+    assert connection.committed
+
+
+def test_upsert_sync_rolls_back_on_failure():
+    connection = FakeConnection(fail_on="INSERT INTO offers")
+
+    with pytest.raises(RuntimeError):
+        PostgresUpsertSync(FakeEngine(connection)).sync(catalogue(2), NOW)
+    assert connection.rolled_back and not connection.committed
+
+
+# ============================================
+# VRAIE BASE (optionnel)
+# ============================================
+
+@pytest.fixture
+def postgres_engine():
+    if not POSTGRES_URL:
+        pytest.skip("MARKETEYE_TEST_POSTGRES_URL non défini")
+    psycopg2 = pytest.importorskip('psycopg2')
+    schema = f"marketeye_test_{uuid.uuid4().hex[:8]}"
+    admin = psycopg2.connect(POSTGRES_URL)
+    admin.autocommit = True
+    admin.cursor().execute(f"CREATE SCHEMA {schema}")
+
+    class Engine:
+        def raw_connection(self):
+            return psycopg2.connect(POSTGRES_URL, options=f"-c search_path={schema}")
+
+    try:
+        yield Engine()
+    finally:
+        admin.cursor().execute(f"DROP SCHEMA {schema} CASCADE")
+        admin.close()
+
+
+def _query(engine, sql):
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(sql)
+        return cursor.fetchall()
+    finally:
+        connection.close()
+
+
+def test_bulk_load_against_postgres(postgres_engine):
+    loader = PostgresBulkLoader(postgres_engine, batch_rows=2)
+    loader.load(catalogue(5))
+    loader.load(catalogue(3, price=200.0))
+
+    assert _query(postgres_engine, "SELECT count(*) FROM products") == [(3,)]
+    assert _query(postgres_engine, "SELECT min(price) FROM offers") == [(200.0,)]
+    indexes = {name for (name,) in _query(
+        postgres_engine, "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()")}
+    assert 'uq_products_product_id' in indexes and not any(name.endswith('_staging') for name in indexes)
+
+
+def test_bulk_load_failure_keeps_previous_tables(postgres_engine):
+    PostgresBulkLoader(postgres_engine).load(catalogue(4))
+
+    broken = catalogue(2)
+    broken['offers'][0] = broken['offers'][0][:3] + ('pas un prix',) + broken['offers'][0][4:]
+    with pytest.raises(Exception):
+        PostgresBulkLoader(postgres_engine).load(broken)
+    assert _query(postgres_engine, "SELECT count(*) FROM products") == [(4,)], "❌ Ancien catalogue perdu"
+    assert _query(postgres_engine, "SELECT to_regclass('products_staging')") == [(None,)]
+
+
+def test_upsert_sync_against_postgres(postgres_engine):
+    sync = PostgresUpsertSync(postgres_engine)
+    first = sync.sync(catalogue(4), NOW)
+    assert first['products']['inserted'] == 4
+
+    later = datetime(2024, 1, 3)
+    # p1 modifié, p3 disparu, p7 nouveau (les horodatages ne font pas partie du hash)
+    rows = {'products': [product_row('p0', now=later), product_row('p1', model='S25', now=later),
+                         product_row('p2', now=later), product_row('p7', now=later)],
+            'offers': [offer_row(f'p{i}', 100.0 + i, f'https://jumia.ma/{i}', now=later) for i in range(3)]}
+    second = sync.sync(rows, later)
+
+    assert {key: second['products'][key] for key in ('inserted', 'updated', 'unchanged', 'deleted')} == \
+        {'inserted': 1, 'updated': 1, 'unchanged': 2, 'deleted': 1}
+    assert second['offers']['unchanged'] == 3 and second['offers']['deleted'] == 1
+    assert _query(postgres_engine, "SELECT created_at, updated_at FROM products WHERE product_id = 'p1'") == \
+        [(NOW, later)], "❌ created_at doit rester celui de la première insertion"
+    assert _query(postgres_engine, "SELECT deleted_at FROM products WHERE product_id = 'p3'") == [(later,)]
+
+    # Produit revenu: réactivé par l'upsert
+    third = sync.sync(catalogue(4), later)
+    assert third['products']['updated'] >= 1
+    assert _query(postgres_engine, "SELECT deleted_at FROM products WHERE product_id = 'p3'") == [(None,)]
@@ -0,0 +1,69 @@
+# scripts/data_processors/test_registry.py
+import sys
+import json
+import threading
+import time
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+from scripts.data_processors.incremental_merge import IncrementalMerger
+from scripts.data_processors.manifest import file_lock
+from scripts.data_processors.registry import DatasetRegistry, prune_runs
+
+PRODUCTS = [{'product_id': f'p{i}', 'brand': 'Samsung', 'offers': [{'source': 'Jumia', 'price': 100.0 + i}]}
+            for i in range(3)]
+
+
+def test_runs_are_isolated_and_versioned(tmp_path):
+    backfill = DatasetRegistry(tmp_path, 'backfill__2024-01-01T00:00:00+00:00')
+    scheduled = DatasetRegistry(tmp_path, 'scheduled__2024-01-02T00:00:00+00:00')
+
+    first = backfill.save_dataset('marketeye_final', PRODUCTS)
+    scheduled.save_dataset('marketeye_final', PRODUCTS[:1])
+    second = backfill.save_dataset('marketeye_final', PRODUCTS[:2])
+
+    assert first != second and first.exists(), "❌ Une nouvelle version ne doit pas écraser la précédente"
+    assert backfill.entry('marketeye_final')['version'] == 2
+    assert backfill.entry('marketeye_final')['rows'] == {'products': 2, 'offers': 2}
+    assert len(scheduled.open('marketeye_final').products()) == 1, "❌ Les runs partagent un artefact"
+    assert backfill.verify('marketeye_final')
+
+
+def test_prune_keeps_current_run(tmp_path):
+    for day in range(1, 5):
+        DatasetRegistry(tmp_path, f'run_{day}').write_json('statistics', {'day': day})
+        time.sleep(0.01)
+
+    removed = prune_runs(tmp_path, keep_last=2, current='run_1')
+    assert sorted(removed) == ['run_2'], f"❌ Runs supprimés: {removed}"
+
+
+def _write_source(path: Path, products):
+    path.write_text(json.dumps(products), encoding='utf-8')
+    return path
+
+
+def test_incremental_merge_waits_for_concurrent_run(tmp_path):
+    source = _write_source(tmp_path / "jumia.json", PRODUCTS)
+    merger = IncrementalMerger(tmp_path / "merge_state", ['jumia'], merge_fn=lambda products: products[:1])
+    result = {}
+
+    def run():
+        result['products'], result['changed'] = merger.merge({'jumia': source})
+
+    # Un autre run tient l'état de fusion: ce run attend au lieu de lire un état à moitié écrit
+    with file_lock(merger.lock_path):
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join(0.3)
+        assert thread.is_alive(), "❌ La fusion doit attendre le verrou de l'état partagé"
+        assert not merger.state_path.exists()
+    thread.join(5)
+
+    assert [p['product_id'] for p in result['products']] == ['p0', 'p1', 'p2']
+    assert result['changed'] == ['jumia']
+    # Run suivant sur les mêmes données: rien à refusionner
+    assert merger.merge({'jumia': source})[1] == []
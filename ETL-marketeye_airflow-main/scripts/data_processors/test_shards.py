@@ -0,0 +1,91 @@
+# scripts/data_processors/test_shards.py
+import sys
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+import pytest
+from scripts.data_processors import manifest as manifest_module
+from scripts.data_processors.manifest import FileManifest
+from scripts.data_processors.shards import compute_shards, iter_shard_records
+
+RECORDS = [{'id': i, 'title': f'Produit {i} "é" , ]'} for i in range(500)]
+
+
+def _read_all(path: Path, shards):
+    return [record for start, end in shards for record in iter_shard_records(path, start, end, chunk_size=512)]
+
+
+def test_array_shards_roundtrip(tmp_path):
+    path = tmp_path / "jumia.json"
+    path.write_text(json.dumps(RECORDS, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    shards = compute_shards(path, 2048)
+    assert len(shards) > 1, "❌ Le fichier devrait être découpé en plusieurs plages"
+    assert _read_all(path, shards) == RECORDS, "❌ Les plages relues ne redonnent pas le tableau"
+
+
+def test_jsonl_shards_roundtrip(tmp_path):
+    path = tmp_path / "avito.jsonl"
+    path.write_text('\n'.join(json.dumps(record) for record in RECORDS) + '\n', encoding='utf-8')
+
+    shards = compute_shards(path, 2048)
+    assert len(shards) > 1
+    assert _read_all(path, shards) == RECORDS
+
+
+def test_invalid_element_stays_in_its_shard(tmp_path):
+    path = tmp_path / "jumia.json"
+    text = json.dumps(RECORDS, indent=2)
+    path.write_text(text.replace('"id": 200,', '"id": 200,,', 1), encoding='utf-8')
+
+    ids = [record['id'] for record in _read_all(path, compute_shards(path, 2048))]
+    assert ids == [i for i in range(500) if i != 200], "❌ Le découpage doit continuer après l'élément invalide"
+
+
+def test_truncated_array_raises(tmp_path):
+    path = tmp_path / "jumia.json"
+    path.write_text(json.dumps(RECORDS)[:-300], encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        compute_shards(path, 2048)
+
+
+def test_range_cache_reads_only_the_range(tmp_path, monkeypatch):
+    path = tmp_path / "avito.jsonl"
+    path.write_text('\n'.join(json.dumps(record) for record in RECORDS) + '\n', encoding='utf-8')
+    start, end = compute_shards(path, 2048)[0]
+    manifest = FileManifest(tmp_path / "cache", 'test.transform')
+    manifest.record(path, [{'id': 0}], (start, end))
+
+    # Le fichier entier ne doit jamais être haché pour une plage
+    def whole_file(_path):
+        raise AssertionError("❌ sha256 du fichier entier calculé pour une plage")
+    monkeypatch.setattr(manifest_module, 'file_fingerprint', whole_file)
+
+    # Fichier complété après la plage: la plage reste en cache
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'id': 500}) + '\n')
+    assert manifest.cached_output(path, (start, end)) is not None, "❌ Plage inchangée non réutilisée"
+
+    # Plage modifiée: recalcul
+    data = path.read_bytes()
+    path.write_bytes(data[:start + 1] + b' ' + data[start + 2:])
+    assert manifest.cached_output(path, (start, end)) is None, "❌ Plage modifiée servie depuis le cache"
+
+
+def test_cached_empty_shard_list_falls_back_to_whole_file(tmp_path):
+    from scripts.pipeline.extract import _shards_for
+
+    path = tmp_path / "electroplanet.json"
+    path.write_text(' ' * 4096, encoding='utf-8')
+    config = SimpleNamespace(SHARD_SIZE_MB=0.001, CACHE_DIR=tmp_path / "cache",
+                             ensure_dir=lambda directory: directory.mkdir(parents=True, exist_ok=True))
+
+    assert _shards_for(config, path) == [(None, None)]
+    # Deuxième appel servi par l'index mémorisé (liste vide)
+    assert _shards_for(config, path) == [(None, None)], "❌ Liste vide en cache: fichier ignoré"
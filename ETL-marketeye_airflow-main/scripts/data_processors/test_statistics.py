@@ -0,0 +1,54 @@
+# scripts/data_processors/test_statistics.py
+import sys
+import statistics as py_statistics
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+import pytest
+from scripts.data_processors.columnar import DatasetReader, save_dataset
+from scripts.data_processors.statistics import compute_statistics
+
+PRODUCTS = [
+    {'product_id': 'p1', 'brand': 'Samsung', 'model': 'S24', 'offers': [
+        {'source': 'Jumia', 'condition': 'Neuf', 'price': 9000.0},
+        {'source': 'Avito', 'condition': 'Occasion', 'price': 7000.0},
+    ]},
+    {'product_id': 'p2', 'brand': 'Samsung', 'model': 'A55', 'offers': [
+        {'source': 'Jumia', 'condition': 'Neuf', 'price': 4000.0},
+        {'source': 'Jumia', 'condition': None, 'price': 0},
+    ]},
+    {'product_id': 'p3', 'brand': None, 'model': None, 'offers': [
+        {'source': None, 'condition': 'Neuf', 'price': 1500.0},
+    ]},
+    {'product_id': 'p4', 'brand': 'Apple', 'model': 'iPhone 15', 'offers': []},
+]
+
+
+@pytest.mark.parametrize('output_format', ['json', 'parquet'])
+def test_vectorized_statistics_match_reference(tmp_path, output_format):
+    stats = compute_statistics(DatasetReader(save_dataset(PRODUCTS, tmp_path / "final", output_format)))
+    prices = [9000.0, 7000.0, 4000.0, 1500.0]  # Prix nuls exclus
+
+    assert stats['total_products'] == 4 and stats['total_offers'] == 5
+    assert stats['sources_count'] == {'Jumia': 3, 'Avito': 1, 'Unknown': 1}
+    assert stats['brand_distribution'] == {'Samsung': 2, 'Unknown': 1, 'Apple': 1}
+    assert stats['condition_distribution'] == {'Neuf': 3, 'Occasion': 1, 'Inconnu': 1}
+    assert stats['price_stats']['avg'] == pytest.approx(py_statistics.mean(prices))
+    assert stats['price_stats']['std'] == pytest.approx(py_statistics.stdev(prices))
+    assert stats['price_stats']['median'] == pytest.approx(py_statistics.median(prices))
+    assert stats['price_stats']['total_offers'] == 4
+
+    samsung = stats['price_by_brand']['Samsung']
+    assert (samsung['count'], samsung['min'], samsung['max']) == (3, 4000.0, 9000.0)
+    assert samsung['median'] == 7000.0
+    assert set(stats['price_by_model']) == {'Samsung S24', 'Samsung A55', 'Unknown Unknown'}
+    assert stats['price_by_model']['Samsung A55']['std'] == 0.0, "❌ Écart-type d'une seule offre: 0, pas NaN"
+
+
+def test_empty_catalogue_statistics():
+    stats = compute_statistics(None)
+    assert stats['total_products'] == 0 and stats['total_offers'] == 0
+    assert stats['price_stats']['median'] == 0 and stats['price_by_brand'] == {}
@@ -0,0 +1,83 @@
+# scripts/data_processors/test_streaming_stats.py
+import sys
+import subprocess
+import random
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+current_dir = Path(__file__).parent.parent.parent  # Remonter à marketeye_airflow
+sys.path.insert(0, str(current_dir))
+
+import pytest
+from scripts.data_processors.columnar import DatasetReader, save_dataset
+from scripts.data_processors.statistics import compute_statistics
+from scripts.data_processors.streaming_stats import StreamingStats
+
+
+def _catalogue(count: int = 400):
+    rng = random.Random(7)
+    brands = ['Samsung', 'Apple', 'Xiaomi', None]
+    return [{
+        'product_id': f'p{i}',
+        'brand': brands[i % 4],
+        'model': f'M{i % 9}' if i % 10 else None,
+        'offers': [{'source': rng.choice(['Avito', 'Jumia']), 'condition': rng.choice(['Neuf', None]),
+                    'price': round(rng.uniform(100, 9000), 2), 'url': f'u{i}-{j}'}
+                   for j in range(1 + i % 3)],
+    } for i in range(count)]
+
+
+@pytest.mark.parametrize('output_format', ['json', 'parquet'])
+def test_streaming_matches_vectorized(tmp_path, output_format):
+    path = save_dataset(_catalogue(), tmp_path / "marketeye_final", output_format)
+    exact = compute_statistics(DatasetReader(path))
+    streamed = StreamingStats.from_dataset(path).result()
+
+    for key in ('total_products', 'total_offers', 'sources_count', 'brand_distribution', 'condition_distribution'):
+        assert streamed[key] == exact[key], f"❌ {key} différent en mode flux"
+    assert streamed['price_stats']['avg'] == pytest.approx(exact['price_stats']['avg'])
+    # Bandes par modèle calculées aussi en flux (effectifs et extrêmes exacts)
+    assert streamed['price_by_model'], "❌ price_by_model vide en mode flux"
+    for name, band in exact['price_by_model'].items():
+        assert streamed['price_by_model'][name]['count'] == band['count']
+        assert streamed['price_by_model'][name]['min'] == band['min']
+        assert streamed['price_by_model'][name]['max'] == band['max']
+
+
+@pytest.mark.parametrize('output_format', ['json', 'parquet'])
+def test_iter_products_matches_products(tmp_path, output_format, monkeypatch):
+    from scripts.data_processors import columnar
+
+    catalogue = _catalogue(50)
+    for product in catalogue[::7]:
+        product['offers'] = []  # Produits sans offre, y compris en début et en fin de table
+    catalogue[-1]['offers'] = []
+    path = save_dataset(catalogue, tmp_path / "marketeye_final", output_format)
+    # Lots plus petits que le catalogue: les offres d'un produit peuvent chevaucher deux lots
+    monkeypatch.setattr(columnar, 'OFFER_BATCH_ROWS', 4)
+
+    streamed = list(DatasetReader(path).iter_products())
+    assert streamed == DatasetReader(path).products(), "❌ Parcours produit par produit différent"
+    assert len(streamed) == 50
+
+
+def test_partials_roundtrip_keeps_model_bands():
+    products = _catalogue()
+    first = StreamingStats.from_products(products[:200], dedup=True)
+    second = StreamingStats.from_products(products[200:], dedup=True)
+    combined = StreamingStats.from_dict(first.to_dict())
+    combined.merge(StreamingStats.from_dict(second.to_dict()))
+
+    whole = StreamingStats.from_products(products).result()
+    result = combined.result()
+    assert result['total_offers'] == whole['total_offers']
+    assert {name: band['count'] for name, band in result['price_by_model'].items()} == \
+           {name: band['count'] for name, band in whole['price_by_model'].items()}
+
+
+def test_streaming_mode_does_not_import_pandas():
+    code = ("import sys; sys.path.insert(0, '.'); "
+            "from scripts.data_processors.sketches import QUANTILES; "
+            "import scripts.data_processors.streaming_stats; "
+            "assert 'pandas' not in sys.modules")
+    subprocess.run([sys.executable, '-c', code], cwd=current_dir, check=True)
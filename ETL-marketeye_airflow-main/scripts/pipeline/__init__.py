@@ -0,0 +1,7 @@
+# scripts/pipeline/__init__.py
+"""
+Implémentation des tâches du DAG marketeye_etl.
+
+Le fichier du DAG ne fait que déclarer les tâches: ces modules (et pandas, pyarrow, les
+extracteurs...) ne sont importés qu'à l'exécution d'une tâche, jamais au parsing du DAG.
+"""
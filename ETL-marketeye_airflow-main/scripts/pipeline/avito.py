@@ -0,0 +1,186 @@
+# scripts/pipeline/avito.py
+"""
+Transformation Avito: annonces brutes vers le schéma unifié.
+"""
+import logging
+from datetime import datetime as dt
+
+from config.pipeline_config import BRAND_MAPPING
+from scripts.data_processors import patterns
+from scripts.data_processors.brand_matcher import get_brand_matcher
+from scripts.data_processors.memo import memoized
+
+from .common import clean_price
+
+logger = logging.getLogger(__name__)
+
+
+def extract_brand_avito(item: dict) -> str:
+    """Extrait la marque d'un item Avito"""
+    brand = item.get('brand')
+    
+    matcher = get_brand_matcher(BRAND_MAPPING)
+    
+    if brand and str(brand).strip().upper() != 'NULL':
+        brand_str = str(brand).strip()
+        return matcher.match(brand_str) or brand_str.upper().title()
+    
+    # Fallback: extraire depuis le titre
+    return matcher.match(item.get('title', '')) or "Unknown"
+
+
+def extract_model_avito(item: dict, brand: str) -> str:
+    """Extrait le modèle d'un item Avito"""
+    model = item.get('model')
+    
+    if model and str(model).strip().upper() != 'NULL' and str(model).strip().upper() != 'UNKNOWN':
+        return str(model).strip().upper()
+    
+    # Fallback: extraire depuis le titre
+    return extract_model_from_title_avito(item.get('title', ''), brand)
+
+
+@memoized('dag.model_from_title_avito')
+def extract_model_from_title_avito(title: str, brand: str) -> str:
+    """Extrait le modèle depuis un titre Avito (mémoïsé par titre et marque)"""
+    brand_lower = brand.lower()
+    
+    # Supprimer la marque du titre
+    title_clean = title.lower().replace(brand_lower, '').strip()
+    
+    # Patterns pour extraire le modèle
+    for pattern in patterns.AVITO_TITLE_MODEL_PATTERNS:
+        match = pattern.search(title_clean)
+        if match:
+            return match.group(1).upper().strip()
+    
+    return "Unknown"
+
+
+def extract_price_avito(price_str: str) -> float:
+    """Extrait le prix depuis une chaîne comme '250 DH'"""
+    return clean_price(price_str)
+
+
+def extract_specs_avito(item: dict) -> dict:
+    """Extrait les spécifications d'un item Avito"""
+    specs = {}
+    
+    # Stockage
+    storage = item.get('storage')
+    if storage and str(storage).upper() != 'NULL':
+        specs['storage'] = str(storage).upper()
+    
+    # RAM
+    ram = item.get('ram')
+    if ram and str(ram).upper() != 'NULL':
+        specs['ram'] = str(ram).upper()
+    
+    # Batterie
+    battery = item.get('battery_health')
+    if battery and str(battery).upper() != 'NULL':
+        specs['battery_health'] = str(battery)
+    
+    # Couleur
+    color = item.get('color')
+    if color and str(color).upper() != 'NULL':
+        specs['color'] = str(color).title()
+    
+    return specs
+
+
+@memoized('dag.condition')
+def determine_condition_avito(condition: str) -> str:
+    """Détermine la condition du produit"""
+    if not condition or str(condition).upper() == 'NULL':
+        return 'used'
+    
+    cond_lower = str(condition).lower().strip()
+    
+    condition_mapping = {
+        'neuf': 'new',
+        'new': 'new',
+        'bon': 'good',
+        'good': 'good',
+        'excellent': 'excellent',
+        'moyen': 'fair',
+        'fair': 'fair',
+        'mauvais': 'poor',
+        'poor': 'poor'
+    }
+    
+    for key, value in condition_mapping.items():
+        if key in cond_lower:
+            return value
+    
+    return 'used'
+
+
+def create_product_id_avito(brand: str, model: str, title: str) -> str:
+    """Crée un ID produit unique pour Avito"""
+    clean_brand = patterns.NON_ALNUM_LOWER.sub('', brand.lower())
+    clean_model = patterns.NON_ALNUM_LOWER.sub('', model.lower())
+    
+    if clean_model == "unknown":
+        title_clean = patterns.NON_ALNUM_LOWER.sub(' ', title.lower())
+        words = title_clean.split()
+        if len(words) > 1:
+            clean_model = words[1]
+    
+    return f"{clean_brand}_{clean_model}"
+
+
+def transform_avito_item(item: dict) -> dict:
+    """Transforme un item Avito vers le schéma unifié"""
+    try:
+        # Extraire la marque
+        brand = extract_brand_avito(item)
+        
+        # Extraire le modèle
+        model = extract_model_avito(item, brand)
+        
+        # Extraire le prix
+        price = extract_price_avito(item.get('price', '0 DH'))
+        
+        # Extraire les spécifications
+        specs = extract_specs_avito(item)
+        
+        # Déterminer la condition
+        condition = determine_condition_avito(item.get('condition'))
+        
+        # Créer l'ID produit
+        product_id = create_product_id_avito(brand, model, item.get('title', ''))
+        
+        # Créer le produit
+        product = {
+            "product_id": product_id,
+            "brand": brand,
+            "model": model,
+            "product_name": item.get('title', '').strip(),
+            "specifications": specs,
+            "offers": [{
+                "source": "Avito",
+                "price": price,
+                "currency": "MAD",
+                "condition": condition,
+                "seller_type": item.get('seller_type', 'PRIVATE'),
+                "location": {
+                    "city": item.get('city', ''),
+                    "area": item.get('area', '')
+                },
+                "url": item.get('url', f"https://www.avito.ma/vi/{item.get('ad_id', '')}.htm"),
+                "seller_name": item.get('seller_name', ''),
+                "scraped_at": item.get('list_time', dt.now().isoformat())
+            }],
+            "metadata": {
+                "sources": ["Avito"],
+                "created_at": dt.now().isoformat(),
+                "last_updated": dt.now().isoformat()
+            }
+        }
+        
+        return product
+        
+    except Exception as e:
+        logger.warning(f"⚠️ Erreur transformation item Avito: {e}")
+        return None
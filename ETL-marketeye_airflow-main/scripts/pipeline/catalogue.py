@@ -0,0 +1,218 @@
+# scripts/pipeline/catalogue.py
+"""
+Tâches sur le catalogue fusionné: fusion des sources, statistiques et rapport.
+
+Entrées et sorties sont des artefacts du registre du run (voir
+scripts/data_processors/registry.py): seuls des noms et des résumés passent par XCom.
+"""
+import logging
+from datetime import datetime as dt
+from pathlib import Path
+from typing import Dict
+
+from config.pipeline_config import get_config
+from scripts.data_processors.columnar import load_dataset
+from scripts.data_processors.merge import merge_products, normalize_product_ids
+from scripts.data_processors.registry import DatasetRegistry
+
+from .common import RAW_SOURCES, run_registry, task_stage
+
+logger = logging.getLogger(__name__)
+
+SOURCES = list(RAW_SOURCES)
+
+
+FINAL_DATASET = "marketeye_final"
+STATISTICS_ARTIFACT = "statistics"
+
+
+def source_paths(registry: DatasetRegistry) -> Dict[str, Path]:
+    """Chemins des jeux transformés du run par source (sources extraites seulement)"""
+    paths = {source: registry.path(f"{source}_transformed") for source in SOURCES}
+    return {source: path for source, path in paths.items() if path is not None}
+
+
+def merge_all_sources(registry: DatasetRegistry, sources: list) -> list:
+    """Fusion complète: recharge toutes les sources et reconstruit le catalogue"""
+    all_products = []
+    paths = source_paths(registry)
+    
+    for source in sources:
+        file_path = paths.get(source)
+        if file_path is not None:
+            data = load_dataset(file_path)
+            all_products.extend(data)
+            logger.info(f"📁 {source}: {len(data)} produits chargés")
+        else:
+            logger.warning(f"⚠️ Fichier {source} non trouvé")
+    
+    # Normaliser les IDs pour une meilleure fusion
+    normalize_product_ids(all_products)
+    
+    # Fusionner les produits par ID (offres dédupliquées sur source + URL)
+    return merge_products(all_products)
+
+
+def merge_data(**context):
+    """Fusionne les données de toutes les sources"""
+    logger.info("🔄 Fusion et déduplication des données")
+    
+    try:
+        with task_stage(context, 'merge') as metrics:
+            config = get_config()
+            registry = run_registry(context)
+            paths = source_paths(registry)
+            
+            if config.MERGE_MODE == 'incremental':
+                from scripts.data_processors.incremental_merge import IncrementalMerger
+                # Seules les sources dont le contenu a changé sont rechargées et refusionnées
+                merger = IncrementalMerger(config.MERGE_STATE_DIR, SOURCES, prepare=normalize_product_ids)
+                final_products, changed_sources = merger.merge(paths)
+            else:
+                final_products = merge_all_sources(registry, SOURCES)
+                changed_sources = list(paths)
+            
+            if not final_products:
+                logger.warning("⚠️ Aucune donnée à fusionner")
+                context['ti'].xcom_push(key='total_products', value=0)
+                return 0
+            
+            # Seules les sources modifiées ont été relues
+            metrics.add_read(sum(registry.entry(f"{source}_transformed")['bytes']
+                                 for source in changed_sources if source in paths))
+            metrics.records = len(final_products)
+            
+            # Compter les offres par source
+            source_counts = {}
+            for product in final_products:
+                for offer in product.get('offers', []):
+                    source = offer.get('source', 'Unknown')
+                    source_counts[source] = source_counts.get(source, 0) + 1
+            
+            # Catalogue propre au run: un backfill n'écrase pas celui d'un autre run
+            registry.save_dataset(FINAL_DATASET, final_products, config.OUTPUT_FORMAT)
+            
+            logger.info(f"✅ Fusion terminée: {len(final_products)} produits uniques")
+            logger.info(f"📊 Offres par source: {source_counts}")
+            
+            context['ti'].xcom_push(key='total_products', value=len(final_products))
+            context['ti'].xcom_push(key='final_dataset', value=FINAL_DATASET)
+            context['ti'].xcom_push(key='source_counts', value=source_counts)
+        
+        return len(final_products)
+        
+    except Exception as e:
+        logger.error(f"❌ Erreur fusion: {e}")
+        raise
+
+
+def calculate_statistics(**context):
+    """Calcule les statistiques"""
+    logger.info("📊 Calcul des statistiques")
+    
+    try:
+        config = get_config()
+        registry = run_registry(context)
+        final_dataset = context['ti'].xcom_pull(key='final_dataset', task_ids='merge_data') or FINAL_DATASET
+        final_path = registry.path(final_dataset)
+        
+        if final_path is not None:
+            with task_stage(context, 'statistics') as metrics:
+                from scripts.data_processors.sketches import QUANTILES
+                
+                if config.STATS_MODE == 'streaming':
+                    from scripts.data_processors.streaming_stats import StreamingStats, combine_source_partials
+                    # Partiels des tâches d'extraction fusionnés, sans relire le catalogue fusionné
+                    streaming = combine_source_partials(registry.subdir("stats"), source_paths(registry))
+                    if streaming is None:
+                        logger.info("🔁 Partiels indisponibles, lecture en flux du catalogue fusionné")
+                        metrics.add_read(registry.entry(final_dataset)['bytes'])
+                        streaming = StreamingStats.from_dataset(final_path)
+                    full_stats = streaming.result()
+                else:
+                    from scripts.data_processors.statistics import compute_statistics
+                    # Offres aplaties une seule fois en DataFrame, agrégations vectorisées
+                    full_stats = compute_statistics(registry.open(final_dataset))
+                price_stats = full_stats['price_stats']
+                
+                stats = {
+                    "total_products": full_stats['total_products'],
+                    "total_offers": full_stats['total_offers'],
+                    "avg_price": price_stats['avg'],
+                    "min_price": price_stats['min'],
+                    "max_price": price_stats['max'],
+                    "std_price": price_stats['std'],
+                    "price_quantiles": {name: price_stats[name] for name in QUANTILES},
+                    "sources": list(full_stats['sources_count']),
+                    "sources_count": full_stats['sources_count'],
+                    "brand_distribution": full_stats['brand_distribution'],
+                    "condition_distribution": full_stats['condition_distribution'],
+                    "price_by_brand": full_stats['price_by_brand'],
+                    "price_by_model": full_stats['price_by_model']
+                }
+                
+                # Statistiques complètes dans le registre; XCom ne reçoit que le résumé
+                registry.write_json(STATISTICS_ARTIFACT, stats)
+                metrics.records = stats['total_offers']
+            summary = {key: stats[key] for key in ('total_products', 'total_offers', 'avg_price', 'sources')}
+            
+            logger.info(f"📈 Statistiques: {stats['total_products']} produits, {stats['total_offers']} offres, "
+                        f"prix médian {stats['price_quantiles']['median']:.2f} MAD")
+            
+            context['ti'].xcom_push(key='statistics', value=STATISTICS_ARTIFACT)
+            return summary
+            
+        else:
+            logger.warning("⚠️ Aucune donnée à analyser")
+            return {"error": "No data available"}
+            
+    except Exception as e:
+        logger.error(f"❌ Erreur calcul stats: {e}")
+        raise
+
+
+def _format_report(stats) -> str:
+    """Texte du rapport à partir des statistiques du run"""
+    if not stats:
+        return "⚠️ Rapport: Aucune donnée disponible ou erreur dans le pipeline"
+    quantiles = stats.get('price_quantiles', {})
+    return f"""
+            ===========================================
+            RAPPORT ETL MARKETEYE - {dt.now().strftime('%Y-%m-%d %H:%M')}
+            ===========================================
+            
+            📊 RÉSUMÉ:
+            - Produits uniques: {stats.get('total_products', 0)}
+            - Offres totales: {stats.get('total_offers', 0)}
+            - Prix moyen: {stats.get('avg_price', 0):.2f} MAD
+            - Prix min: {stats.get('min_price', 0):.2f} MAD
+            - Prix max: {stats.get('max_price', 0):.2f} MAD
+            - Prix médian: {quantiles.get('median', 0):.2f} MAD (p5: {quantiles.get('p5', 0):.2f}, p95: {quantiles.get('p95', 0):.2f})
+            
+            🌐 SOURCES: {', '.join(stats.get('sources', []))}
+            
+            ✅ Pipeline exécuté avec succès!
+            """
+
+
+def generate_report(**context):
+    """Génère un rapport final"""
+    logger.info("📄 Génération du rapport")
+    
+    try:
+        with task_stage(context, 'report'):
+            registry = run_registry(context)
+            artifact = context['ti'].xcom_pull(key='statistics', task_ids='calculate_statistics')
+            stats = registry.load_json(artifact) if artifact and registry.path(artifact) else None
+            report = _format_report(stats)
+            
+            # Sauvegarder le rapport
+            report_path = registry.write_text("report", report)
+        
+        logger.info(f"💾 Rapport sauvegardé: {report_path}")
+        
+        return report
+        
+    except Exception as e:
+        logger.error(f"❌ Erreur génération rapport: {e}")
+        raise
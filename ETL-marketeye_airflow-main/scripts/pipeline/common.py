@@ -0,0 +1,58 @@
+# scripts/pipeline/common.py
+"""
+Fonctions communes aux tâches: nettoyage des prix, marques, registre des sources (motifs
+des fichiers bruts, fonction de transformation), registre des artefacts du run et mesures
+par étape.
+"""
+from config.pipeline_config import BRAND_MAPPING, get_config
+from scripts.data_processors import patterns
+from scripts.data_processors.brand_matcher import get_brand_matcher
+from scripts.data_processors.instrumentation import get_statsd, stage
+from scripts.data_processors.memo import memoized
+from scripts.data_processors.registry import DatasetRegistry
+
+# Sources extraites par le DAG: libellé, mots-clés des noms de fichiers bruts et
+# transformation 'module:fonction' de scripts.pipeline (importée par la tâche qui l'utilise)
+RAW_SOURCES = {
+    'avito': {'label': 'Avito', 'patterns': ['avito', 'ads'],
+              'transform': 'avito:transform_avito_item', 'record_name': 'annonces'},
+    'jumia': {'label': 'Jumia', 'patterns': ['jumia', 'jm'],
+              'transform': 'jumia:transform_jumia_item', 'record_name': 'produits'},
+    'electroplanet': {'label': 'Electroplanet', 'patterns': ['electroplanet', 'electro', 'planet'],
+                      'transform': 'electroplanet:transform_electroplanet_item', 'record_name': 'produits'},
+}
+
+
+@memoized('dag.clean_price')
+def clean_price(price_str):
+    """Nettoie le prix"""
+    if not price_str:
+        return 0.0
+    if isinstance(price_str, (int, float)):
+        return float(price_str)
+    
+    price_clean = patterns.PRICE_NOISE.sub('', str(price_str))
+    price_clean = price_clean.replace(',', '.')
+    number = patterns.FIRST_NUMBER.search(price_clean)
+    return float(number.group()) if number else 0.0
+
+
+def normalize_brand(brand_str):
+    """Normalise la marque"""
+    if not brand_str:
+        return "Unknown"
+    
+    return get_brand_matcher(BRAND_MAPPING).match(str(brand_str).strip()) or brand_str.title()
+
+
+def run_registry(context) -> DatasetRegistry:
+    """Registre des artefacts du run Airflow en cours (un dossier par run_id)"""
+    run_id = context.get('run_id') or context['ti'].run_id
+    return DatasetRegistry(get_config().RUNS_DIR, run_id)
+
+
+def task_stage(context, name: str, source=None, **labels):
+    """Étape mesurée d'une tâche: mesures envoyées en StatsD et gardées dans le run (voir metrics.py)"""
+    config = get_config()
+    return stage(name, source, output_dir=run_registry(context).run_dir / "metrics",
+                 statsd=get_statsd(config.STATSD_HOST, config.STATSD_PORT, config.STATSD_PREFIX), **labels)
@@ -0,0 +1,75 @@
+# scripts/pipeline/electroplanet.py
+"""
+Transformation Electroplanet: produits bruts vers le schéma unifié.
+"""
+import logging
+from datetime import datetime as dt
+
+from scripts.data_processors import patterns
+
+from .common import clean_price, normalize_brand
+
+logger = logging.getLogger(__name__)
+
+
+def transform_electroplanet_item(item: dict) -> dict:
+    """Transforme un produit Electroplanet"""
+    try:
+        brand = normalize_brand(item.get('brand'))
+        
+        # Extraire modèle
+        model = item.get('specifications', {}).get('Modèle') or "Unknown"
+        if model == "Unknown":
+            name = item.get('name', '')
+            name_clean = name.lower().replace(brand.lower(), '').strip()
+            match = patterns.NAME_MODEL_PATTERN.search(name_clean)
+            if match:
+                model = match.group(1).upper()
+        
+        # Créer ID produit
+        clean_brand = patterns.NON_ALNUM_LOWER.sub('', brand.lower())
+        clean_model = patterns.NON_ALNUM_LOWER.sub('', model.lower())
+        product_id = f"{clean_brand}_{clean_model}"
+        
+        # Extraire spécifications
+        specs = {}
+        product_specs = item.get('specifications', {})
+        spec_mapping = {
+            'Capacité de stockage interne': 'storage',
+            'Capacité de la RAM': 'ram',
+            'Modèle': 'model'
+        }
+        
+        for key, value in product_specs.items():
+            if key in spec_mapping and value:
+                specs[spec_mapping[key]] = str(value)
+        
+        # Créer le produit
+        product = {
+            "product_id": product_id,
+            "brand": brand,
+            "model": model,
+            "product_name": item.get('name', '').strip(),
+            "specifications": specs,
+            "offers": [{
+                "source": "Electroplanet",
+                "price": clean_price(item.get('price')),
+                "currency": "MAD",
+                "condition": "new",
+                "rating": item.get('reviews_summary', {}).get('average_rating'),
+                "reviews_count": item.get('reviews_summary', {}).get('total_reviews'),
+                "url": item.get('product_url'),
+                "scraped_at": item.get('detailed_scraped_at') or item.get('scraped_at', dt.now().isoformat())
+            }],
+            "metadata": {
+                "sources": ["Electroplanet"],
+                "created_at": dt.now().isoformat(),
+                "last_updated": dt.now().isoformat()
+            }
+        }
+        
+        return product
+        
+    except Exception as e:
+        logger.warning(f"⚠️ Erreur transformation Electroplanet: {e}")
+        return None
@@ -0,0 +1,282 @@
+# scripts/pipeline/extract.py
+"""
+Extraction mappée par fichier brut (ou par plage d'un gros fichier).
+
+- `discover_raw_files`: liste les fichiers bruts de chaque source (un dict par fichier,
+  utilisé comme op_kwargs des tâches mappées). Un fichier plus gros que SHARD_SIZE_MB est
+  découpé en plages d'octets alignées sur les enregistrements (voir
+  scripts/data_processors/shards.py), une tâche par plage.
+- `extract_file`: transforme un fichier ou une plage (tâche mappée avec `expand`): les
+  fichiers sont traités en parallèle sur les slots de l'executor et un échec ne rejoue que
+  ce fichier ou cette plage. Chacun a son propre manifeste de cache: les tâches mappées
+  n'écrivent jamais le même fichier.
+- `combine_extracted`: concatène les sorties par source en un artefact `<source>_transformed`
+  du registre du run (voir scripts/data_processors/registry.py). Une source dont les sorties
+  (adressées par leur contenu) sont celles du run précédent n'est pas relue: son jeu
+  combiné est relié au nouveau run (liens physiques).
+"""
+import logging
+import shutil
+import time
+from importlib import import_module
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.pipeline_config import get_config
+from scripts.data_processors.json_loader import iter_json_records, json_loads, load_json_file
+from scripts.data_processors.manifest import FileManifest, write_json_atomic
+from scripts.data_processors.memo import log_cache_stats, reset_cache_stats
+
+from .common import RAW_SOURCES, run_registry, task_stage
+
+logger = logging.getLogger(__name__)
+
+
+def _transform_for(source: str) -> Callable:
+    module_name, function_name = RAW_SOURCES[source]['transform'].split(':')
+    return getattr(import_module(f"scripts.pipeline.{module_name}"), function_name)
+
+
+def _file_cache_dir(config, source: str) -> Path:
+    return config.CACHE_DIR / "files" / source
+
+
+def _shard_index_dir(config) -> Path:
+    return config.CACHE_DIR / "shards"
+
+
+def _combined_index_path(config, source: str) -> Path:
+    return config.CACHE_DIR / "combined" / f"{source}.json"
+
+
+def _cache_key(file_path: Path, start: Optional[int], end: Optional[int]) -> str:
+    """Nom du cache d'un fichier entier, ou d'une plage: '<fichier>@<début>-<fin>'"""
+    return file_path.name if start is None else f"{file_path.name}@{start}-{end}"
+
+
+def _shards_for(config, file_path: Path) -> List[Tuple[Optional[int], Optional[int]]]:
+    """Plages d'un fichier brut ([(None, None)]: fichier traité en entier)"""
+    shard_bytes = config.SHARD_SIZE_MB * 1024 * 1024
+    stat = file_path.stat()
+    if shard_bytes <= 0 or stat.st_size <= shard_bytes:
+        return [(None, None)]
+    
+    # Plages mémorisées: un tableau JSON inchangé n'est pas reparcouru à chaque run
+    index_path = _shard_index_dir(config) / f"{file_path.name}.json"
+    signature = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'shard_bytes': shard_bytes}
+    if index_path.exists():
+        index = json_loads(index_path.read_bytes())
+        if index.get('signature') == signature:
+            return [tuple(shard) for shard in index['shards']] or [(None, None)]
+    
+    from scripts.data_processors.shards import compute_shards
+    
+    start = time.perf_counter()
+    shards = compute_shards(file_path, shard_bytes)
+    config.ensure_dir(index_path.parent)
+    write_json_atomic(index_path, {'signature': signature, 'shards': shards})
+    logger.info(f"✂️ {file_path.name}: {stat.st_size / 1024 / 1024:.0f} Mo découpés en {len(shards)} plages "
+                f"({time.perf_counter() - start:.2f}s)")
+    if not shards:
+        # Aucun élément repéré: fichier traité en entier (ses erreurs apparaissent à l'extraction)
+        logger.warning(f"⚠️ {file_path.name}: aucune plage trouvée, fichier traité en une tâche")
+    return shards or [(None, None)]
+
+
+def discover_raw_files(**context) -> List[Dict]:
+    """Fichiers (ou plages) à extraire: [{'source', 'path'[, 'start', 'end']}] (un fichier peut relever de plusieurs sources)"""
+    config = get_config()
+    files = []
+    counts = {source: 0 for source in RAW_SOURCES}
+    with task_stage(context, 'discover') as metrics:
+        for file_path in config.raw_files():
+            filename_lower = file_path.name.lower()
+            sources = [source for source, spec in RAW_SOURCES.items()
+                       if any(pattern in filename_lower for pattern in spec['patterns'])]
+            if not sources:
+                continue
+            shards = _shards_for(config, file_path)
+            for source in sources:
+                for start, end in shards:
+                    task = {'source': source, 'path': str(file_path)}
+                    if start is not None:
+                        task.update(start=start, end=end)
+                    files.append(task)
+                counts[source] += 1
+        metrics.records = len(files)
+    logger.info(f"📁 Fichiers bruts découverts: {counts}, {len(files)} tâche(s) d'extraction")
+    return files
+
+
+def extract_file(source: str, path: str, start: Optional[int] = None, end: Optional[int] = None,
+                 **context) -> Dict:
+    """Transforme un fichier brut ou la plage [start, end) (sortie réutilisée s'il n'a pas changé)"""
+    spec = RAW_SOURCES[source]
+    label = spec['label']
+    file_path = Path(path)
+    name = _cache_key(file_path, start, end)
+    logger.info(f"📥 Extraction {label}: {name}")
+    
+    try:
+        with task_stage(context, 'extract', source, file=name) as metrics:
+            reset_cache_stats()
+            config = get_config()
+            # Une plage est vérifiée sur ses seuls octets: pas de relecture du fichier entier par plage
+            manifest = FileManifest(_file_cache_dir(config, source) / name, f'dag.transform_{source}_item')
+            byte_range = None if start is None else (start, end)
+            
+            output_path = manifest.cached_output(file_path, byte_range)
+            if output_path is not None:
+                count = manifest.output_count(file_path)
+                if count is None:
+                    count = len(load_json_file(output_path))
+                logger.info(f"♻️ {label}: {name} inchangé, {count} produits en cache")
+                metrics.labels['cache'] = 'hit'
+            else:
+                from scripts.data_processors.parallel import transform_records
+                
+                # Transformer les enregistrements par blocs au fil de la lecture
+                loaded = 0
+                products = []
+                if start is None:
+                    records = iter_json_records(file_path)
+                else:
+                    from scripts.data_processors.shards import iter_shard_records
+                    records = iter_shard_records(file_path, start, end)
+                for product in transform_records(records, _transform_for(source),
+                                                 config.FILE_TRANSFORM_WORKERS, config.TRANSFORM_CHUNK_SIZE):
+                    loaded += 1
+                    if product:
+                        products.append(product)
+                
+                metrics.add_read(file_path.stat().st_size if start is None else end - start)
+                metrics.records = loaded
+                output_path = manifest.record(file_path, products, byte_range)
+                metrics.add_written(output_path.stat().st_size)
+                # Une seule entrée par manifeste: la sortie de la version précédente du fichier est supprimée
+                manifest.prune([file_path])
+                manifest.save()
+                count = len(products)
+                logger.info(f"✅ {label}: {loaded} {spec['record_name']} chargés, {count} produits transformés")
+                log_cache_stats(logger)
+            
+            return {'source': source, 'file': str(file_path), 'start': start, 'key': name,
+                    'output': str(output_path), 'count': count}
+        
+    except Exception as e:
+        logger.error(f"❌ Erreur extraction {label} ({name}): {e}")
+        raise
+
+
+def _prune_file_caches(config, present: Dict[str, set]):
+    """Supprime les caches des fichiers bruts (ou des plages) disparus"""
+    for source in RAW_SOURCES:
+        cache_dir = _file_cache_dir(config, source)
+        if not cache_dir.exists():
+            continue
+        for file_cache in cache_dir.iterdir():
+            if file_cache.is_dir() and file_cache.name not in present.get(source, set()):
+                shutil.rmtree(file_cache)
+                logger.info(f"🗑️ Cache de {source}/{file_cache.name} supprimé (fichier brut disparu ou redécoupé)")
+    
+    raw_names = {path.name for path in config.raw_files()}
+    index_dir = _shard_index_dir(config)
+    for index_path in index_dir.glob("*.json") if index_dir.exists() else []:
+        if index_path.stem not in raw_names:
+            index_path.unlink()
+
+
+def _reuse_combined(config, registry, source: str, signature: Dict) -> Optional[int]:
+    """Relie au run le jeu combiné précédent si ses sorties n'ont pas changé (nombre de produits, sinon None)"""
+    index_path = _combined_index_path(config, source)
+    if not index_path.exists():
+        return None
+    index = json_loads(index_path.read_bytes())
+    previous = Path(index['dataset'])
+    partial = index.get('partial')
+    if index.get('signature') != signature or not previous.exists():
+        return None
+    if config.STATS_MODE == 'streaming' and not (partial and Path(partial).exists()):
+        return None
+    
+    name = f"{source}_transformed"
+    output_path = registry.link_dataset(name, previous, index['rows'], index['schema'])
+    if config.STATS_MODE == 'streaming':
+        from scripts.data_processors.streaming_stats import relink_source_partial
+        partial = relink_source_partial(partial, output_path, registry.subdir("stats"), source)
+    _save_combined_index(config, source, signature, registry, output_path,
+                         partial if config.STATS_MODE == 'streaming' else None)
+    return index['rows']['products']
+
+
+def _save_combined_index(config, source: str, signature: Dict, registry, output_path: Path,
+                         partial: Optional[Path]):
+    """Mémorise le dernier jeu combiné d'une source (dans le dossier du run qui le porte)"""
+    entry = registry.entry(f"{source}_transformed")
+    index_path = _combined_index_path(config, source)
+    config.ensure_dir(index_path.parent)
+    write_json_atomic(index_path, {'signature': signature, 'dataset': str(output_path),
+                                   'partial': str(partial) if partial else None,
+                                   'rows': entry['rows'], 'schema': entry['schema']})
+
+
+def combine_extracted(**context) -> Dict[str, int]:
+    """Concatène les sorties des tâches mappées en un jeu transformé par source"""
+    logger.info("🧩 Regroupement des extractions par source")
+    
+    try:
+        config = get_config()
+        registry = run_registry(context)
+        # Valeurs de retour de toutes les instances mappées (aucune si aucun fichier n'a été découvert)
+        results = [result for result in (context['ti'].xcom_pull(task_ids='extract_file') or []) if result]
+        
+        by_source: Dict[str, List[Dict]] = {}
+        # Ordre du fichier d'origine: fichiers par nom, plages par position
+        for result in sorted(results, key=lambda result: (result['file'], result.get('start') or 0)):
+            by_source.setdefault(result['source'], []).append(result)
+        
+        totals = {}
+        for source, spec in RAW_SOURCES.items():
+            files = by_source.get(source, [])
+            if not files:
+                logger.warning(f"⚠️ Aucun fichier {spec['label']} trouvé")
+                context['ti'].xcom_push(key=f'{source}_count', value=0)
+                totals[source] = 0
+                continue
+            
+            # Sorties adressées par leur contenu: même liste = même jeu combiné
+            signature = {'outputs': [result['output'] for result in files], 'format': config.OUTPUT_FORMAT}
+            with task_stage(context, 'combine', source) as metrics:
+                count = _reuse_combined(config, registry, source, signature)
+                if count is not None:
+                    metrics.labels['cache'] = 'hit'
+                    logger.info(f"♻️ {spec['label']}: sorties inchangées, jeu combiné précédent réutilisé")
+                else:
+                    products = []
+                    for result in files:
+                        output = Path(result['output'])
+                        metrics.add_read(output.stat().st_size)
+                        products.extend(load_json_file(output))
+                    
+                    output_path = registry.save_dataset(f"{source}_transformed", products, config.OUTPUT_FORMAT)
+                    partial = None
+                    if config.STATS_MODE == 'streaming':
+                        from scripts.data_processors.streaming_stats import write_source_partial
+                        # Statistiques partielles de la source, fusionnées par calculate_statistics
+                        partial = write_source_partial(products, output_path, registry.subdir("stats"), source)
+                    _save_combined_index(config, source, signature, registry, output_path, partial)
+                    count = len(products)
+                metrics.records = count
+            
+            logger.info(f"💾 {spec['label']} sauvegardé: {count} produits "
+                        f"({len({result['file'] for result in files})} fichier(s), {len(files)} tâche(s))")
+            context['ti'].xcom_push(key=f'{source}_count', value=count)
+            totals[source] = count
+        
+        _prune_file_caches(config, {source: {result.get('key', Path(result['file']).name) for result in files}
+                                    for source, files in by_source.items()})
+        return totals
+        
+    except Exception as e:
+        logger.error(f"❌ Erreur regroupement des extractions: {e}")
+        raise
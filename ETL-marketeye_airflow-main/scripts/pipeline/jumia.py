@@ -0,0 +1,93 @@
+# scripts/pipeline/jumia.py
+"""
+Transformation Jumia: produits bruts vers le schéma unifié.
+"""
+import logging
+from datetime import datetime as dt
+
+from scripts.data_processors import patterns
+from scripts.data_processors.memo import memoized
+
+from .common import clean_price, normalize_brand
+
+logger = logging.getLogger(__name__)
+
+
+def transform_jumia_item(item: dict) -> dict:
+    """Transforme un produit Jumia"""
+    try:
+        brand = normalize_brand(item.get('brand'))
+        
+        # Extraire modèle depuis le titre
+        title = item.get('title', '')
+        model = extract_model_from_title_jumia(title, brand) if title else "Unknown"
+        
+        # Créer ID produit
+        clean_brand = patterns.NON_ALNUM_LOWER.sub('', brand.lower())
+        clean_model = patterns.NON_ALNUM_LOWER.sub('', model.lower())
+        product_id = f"{clean_brand}_{clean_model}"
+        
+        # Extraire spécifications
+        specs = {}
+        if item.get('specs'):
+            for key, value in item['specs'].items():
+                key_str = str(key).lower()
+                if 'ram' in key_str and value:
+                    specs['ram'] = str(value)
+                elif 'stockage' in key_str or 'storage' in key_str and value:
+                    specs['storage'] = str(value)
+        
+        # Créer le produit
+        product = {
+            "product_id": product_id,
+            "brand": brand,
+            "model": model,
+            "product_name": title.strip(),
+            "specifications": specs,
+            "offers": [{
+                "source": "Jumia",
+                "price": clean_price(item.get('price')),
+                "currency": "MAD",
+                "condition": "new",
+                "rating": extract_jumia_rating(item.get('rating')),
+                "reviews_count": item.get('reviews_count_text'),
+                "url": item.get('product_url'),
+                "scraped_at": item.get('scraped_at', dt.now().isoformat())
+            }],
+            "metadata": {
+                "sources": ["Jumia"],
+                "created_at": dt.now().isoformat(),
+                "last_updated": dt.now().isoformat()
+            }
+        }
+        
+        return product
+        
+    except Exception as e:
+        logger.warning(f"⚠️ Erreur transformation Jumia: {e}")
+        return None
+
+
+@memoized('dag.model_from_title_jumia')
+def extract_model_from_title_jumia(title: str, brand: str) -> str:
+    """Extrait le modèle depuis un titre Jumia (mémoïsé par titre et marque)"""
+    title_clean = title.lower().replace(brand.lower(), '').strip()
+    
+    for pattern in patterns.TITLE_MODEL_PATTERNS:
+        match = pattern.search(title_clean)
+        if match:
+            return match.group(1).upper().strip()
+    
+    return "Unknown"
+
+
+def extract_jumia_rating(rating_data):
+    """Extrait la note Jumia"""
+    if not rating_data:
+        return 0.0
+    if isinstance(rating_data, (int, float)):
+        return float(rating_data)
+    
+    rating_str = str(rating_data)
+    match = patterns.DECIMAL_NUMBER.search(rating_str)
+    return float(match.group(1)) if match else 0.0
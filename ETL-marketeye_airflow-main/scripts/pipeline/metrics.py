@@ -0,0 +1,45 @@
+# scripts/pipeline/metrics.py
+"""
+Résumé des mesures du run: chaque étape mesurée (voir `task_stage`) laisse un JSON dans
+le dossier `metrics/` du run; `summarize_run` les agrège par étape et par source en deux
+artefacts du registre: `run_summary` (JSON) et `run_metrics` (texte OpenMetrics).
+"""
+import logging
+import os
+from pathlib import Path
+
+from config.pipeline_config import get_config
+from scripts.data_processors.instrumentation import summarize_stages, to_openmetrics
+
+from .common import run_registry
+
+logger = logging.getLogger(__name__)
+
+
+def summarize_run(**context):
+    """Agrège les mesures des tâches du run (exécutée même si une tâche a échoué)"""
+    config = get_config()
+    registry = run_registry(context)
+    
+    summary = summarize_stages(registry.run_dir / "metrics", registry.run_id)
+    if not summary['stages']:
+        logger.warning(f"⚠️ Aucune mesure pour le run {registry.run_id}")
+        return summary
+    
+    registry.write_json("run_summary", summary)
+    openmetrics = to_openmetrics(summary, config.STATSD_PREFIX)
+    registry.write_text("run_metrics", openmetrics, suffix='.prom')
+    
+    if config.METRICS_TEXTFILE_DIR:
+        # Collecteur textfile de node_exporter: fichier remplacé atomiquement à chaque run
+        textfile = config.ensure_dir(Path(config.METRICS_TEXTFILE_DIR)) / f"{config.STATSD_PREFIX}.prom"
+        tmp_path = textfile.with_name(textfile.name + '.tmp')
+        tmp_path.write_text(openmetrics, encoding='utf-8')
+        os.replace(tmp_path, textfile)
+    
+    for name, stage_summary in summary['stages'].items():
+        logger.info(f"⏱️ {name}: {stage_summary['span_seconds']:.2f}s ({stage_summary['tasks']} tâche(s), "
+                    f"{stage_summary['cpu_seconds']:.2f}s CPU), {stage_summary['records']} enregistrements, "
+                    f"RSS max {(stage_summary['peak_rss_bytes'] or 0) / 1024 / 1024:.0f} Mo")
+    
+    return summary['totals']
@@ -0,0 +1,166 @@
+# scripts/pipeline/storage.py
+"""
+Tâche de stockage: écriture parallèle du catalogue final vers PostgreSQL, MongoDB et le
+store de backups (voir scripts/storage/).
+"""
+import logging
+from datetime import datetime as dt
+
+from config.pipeline_config import get_config
+from scripts.data_processors.columnar import DatasetReader
+from scripts.data_processors.instrumentation import record_written
+from scripts.data_processors.manifest import file_lock
+from scripts.data_processors.registry import prune_runs
+
+from .catalogue import FINAL_DATASET
+from .common import run_registry, task_stage
+
+logger = logging.getLogger(__name__)
+
+
+def write_postgresql(reader: DatasetReader) -> dict:
+    """Stocke les données finales dans PostgreSQL"""
+    from scripts.storage.clients import get_postgres_engine, pool_stats
+    from scripts.storage.postgres_loader import PostgresBulkLoader, catalogue_rows
+    from scripts.storage.postgres_sync import PostgresUpsertSync
+    from scripts.storage.price_history import PostgresPriceHistory, price_rows
+    
+    # Moteur partagé du worker (pool de connexions, base créée si besoin)
+    engine = get_postgres_engine()
+    
+    # Lignes products/offers (clé, hash de ligne, horodatages) lues colonne par colonne
+    now = dt.now()
+    rows = catalogue_rows(reader, now)
+    
+    if get_config().POSTGRES_SYNC_MODE == 'upsert':
+        # Seules les lignes nouvelles ou modifiées sont écrites, les disparues marquées supprimées
+        sync_stats = PostgresUpsertSync(engine).sync(rows, now)
+        postgres_stats = {'changes': sync_stats}
+        product_count = sync_stats['products']['rows']
+        offer_count = sync_stats['offers']['rows']
+    else:
+        # COPY par lots dans des tables de staging, index reconstruits, puis échange atomique
+        load_stats = PostgresBulkLoader(engine).load(rows)
+        postgres_stats = {'rows_per_sec': {table: result['rows_per_sec']
+                                           for table, result in load_stats.items()}}
+        product_count = load_stats['products']['rows']
+        offer_count = load_stats['offers']['rows']
+    
+    # Historique des prix du jour (table partitionnée par mois)
+    history_count = PostgresPriceHistory(engine).record(price_rows(reader, now.date()), now.date())
+    postgres_stats['price_history'] = history_count
+    postgres_stats['pool'] = pool_stats(f"postgres.{get_config().POSTGRES_CONN_ID}")
+    logger.info(f"🔌 Pool PostgreSQL: {postgres_stats['pool']}")
+    
+    logger.info(f"✅ PostgreSQL: {product_count} produits, {offer_count} offres")
+    return {'products': product_count, 'offers': offer_count, **postgres_stats}
+
+
+def write_mongodb(reader: DatasetReader) -> dict:
+    """Stocke les données finales dans MongoDB"""
+    from scripts.storage.clients import get_mongo_client, pool_stats
+    from scripts.storage.mongo_sync import MongoBulkSync
+    
+    products = reader.products()
+    if not products:
+        logger.warning("⚠️ Aucun produit à insérer dans MongoDB")
+        return {'products': 0}
+    
+    # Client partagé du worker (pool de connexions configuré)
+    db = get_mongo_client().marketeye
+    
+    # Upserts par lots puis suppression des produits disparus: la collection n'est jamais vide
+    config = get_config()
+    mongo_stats = MongoBulkSync(db.products, batch_size=config.MONGO_BATCH_SIZE,
+                                max_retries=config.MONGO_MAX_RETRIES).sync(products)
+    mongo_stats['pool'] = pool_stats(f"mongo.{config.MONGO_CONN_ID}")
+    logger.info(f"✅ MongoDB: {mongo_stats['products']} produits synchronisés, pool {mongo_stats['pool']}")
+    return mongo_stats
+
+
+def write_json_backup(reader: DatasetReader) -> dict:
+    """Snapshot du catalogue dans le store de backups (produits dédupliqués, compressés)"""
+    from scripts.storage.backup_store import BackupStore
+    from scripts.storage.price_history import price_rows, write_price_history_parquet
+    
+    config = get_config()
+    # Index, packs et partitions sont partagés par tous les runs: un backfill concurrent attend son tour
+    with file_lock(config.BACKUP_DIR / ".lock"):
+        # Seuls les produits modifiés depuis les snapshots précédents sont écrits
+        store = BackupStore(config.BACKUP_DIR)
+        backup_stats = store.save_snapshot(reader.products())
+        record_written(backup_stats['bytes_written'])
+        backup_stats['retention'] = len(store.apply_retention(config.BACKUP_KEEP_LAST, config.BACKUP_KEEP_DAYS))
+        backup_stats['gc'] = store.gc()
+    
+    # Historique des prix côté fichiers: une partition Parquet par jour
+    today = dt.now().date()
+    with file_lock(config.PRICE_HISTORY_DIR / ".lock"):
+        write_price_history_parquet(price_rows(reader, today), config.PRICE_HISTORY_DIR, today)
+    
+    logger.info(f"✅ Backup: snapshot {backup_stats['snapshot_id']}")
+    return backup_stats
+
+# Destinations de stockage, écrites en parallèle par save_to_storage
+STORAGE_WRITERS = {
+    'postgresql': write_postgresql,
+    'mongodb': write_mongodb,
+    'json_backup': write_json_backup,
+}
+
+
+def _measured_sink(context, name: str, product_count: int):
+    """Destination mesurée comme une étape 'sink' (dans le thread de la destination)"""
+    writer = STORAGE_WRITERS[name]
+
+    def run(reader: DatasetReader) -> dict:
+        with task_stage(context, 'sink', name) as metrics:
+            result = writer(reader)
+            metrics.records = result.get('products', product_count)
+        return result
+
+    return run
+
+
+def save_to_storage(**context):
+    """Écrit le catalogue final vers toutes les destinations en parallèle (un seul décodage)"""
+    config = get_config()
+    logger.info("🗄️ Stockage: " + ", ".join(config.STORAGE_SINKS))
+    
+    try:
+        with task_stage(context, 'storage') as metrics:
+            from scripts.storage.fanout import run_sinks
+            
+            registry = run_registry(context)
+            final_dataset = context['ti'].xcom_pull(key='final_dataset', task_ids='merge_data') or FINAL_DATASET
+            if registry.path(final_dataset) is None:
+                logger.error(f"❌ Catalogue final absent du run {registry.run_id}")
+                return 0
+            
+            # Lecteur partagé: JSON décodé une fois, Parquet lu en mémoire mappée
+            reader = registry.open(final_dataset)
+            product_count = registry.entry(final_dataset)['rows']['products']
+            metrics.records = product_count
+            results = run_sinks({name: _measured_sink(context, name, product_count)
+                                 for name in config.STORAGE_SINKS}, reader,
+                                timeout=config.STORAGE_TIMEOUT or None)
+            
+            storage_stats = {name: {'status': result['status'], 'seconds': result['seconds']}
+                             for name, result in results.items()}
+            context['ti'].xcom_push(key='storage_stats', value=storage_stats)
+            for name, xcom_key in (('postgresql', 'postgres_stats'), ('mongodb', 'mongodb_stats')):
+                if results.get(name, {}).get('status') == 'success':
+                    context['ti'].xcom_push(key=xcom_key, value=results[name]['result'])
+            
+            # Les destinations réussies sont écrites; l'échec d'une autre fait échouer (et rejouer) la tâche
+            failed = {name: result['error'] for name, result in results.items() if result['status'] != 'success'}
+            if failed:
+                raise RuntimeError(f"Destinations en échec: {failed}")
+        
+        logger.info(f"✅ Stockage terminé: {storage_stats}")
+        prune_runs(config.RUNS_DIR, config.RUNS_KEEP, current=registry.run_id)
+        return storage_stats
+        
+    except Exception as e:
+        logger.error(f"❌ Erreur stockage: {e}")
+        raise
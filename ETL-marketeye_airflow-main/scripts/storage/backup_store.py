@@ -0,0 +1,305 @@
+# scripts/storage/backup_store.py
+"""
+Backups du catalogue adressés par contenu.
+
+Chaque produit est sérialisé en JSON et identifié par l'empreinte de son contenu. Un
+snapshot n'écrit que les produits jamais vus, regroupés dans un pack compressé (zstd, zlib
+si `zstandard` n'est pas installé); son manifeste liste les empreintes de tous ses produits.
+La taille des backups suit donc le changement quotidien, pas celle du catalogue.
+
+    <racine>/packs/<snapshot>.zst    produits nouveaux du snapshot, un JSON par ligne
+    <racine>/index.json              empreinte -> [pack, début, longueur] (octets décompressés)
+    <racine>/snapshots/<id>.json.zst manifeste: empreintes (+ champs volatils) dans l'ordre
+
+Les champs qui changent à chaque run sans changer le produit (metadata.last_updated) sont
+gardés dans le manifeste, hors de l'empreinte: la restauration est exacte.
+"""
+import hashlib
+import json
+import logging
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from scripts.data_processors.json_loader import json_loads
+from scripts.data_processors.manifest import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+BACKUP_STORE_VERSION = 1
+ZSTD_LEVEL = 10
+# Packs réécrits par le GC quand moins de la moitié de leurs produits sont encore référencés
+REPACK_THRESHOLD = 0.5
+
+
+# ============================================
+# COMPRESSION
+# ============================================
+
+def _zstd():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+# Extensions des fichiers compressés (packs et manifestes)
+CODECS = ('zst', 'zz')
+
+
+def default_codec() -> str:
+    return 'zst' if _zstd() is not None else 'zz'
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == 'zst':
+        return _zstd().ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, 9)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == 'zst':
+        zstandard = _zstd()
+        if zstandard is None:
+            raise RuntimeError("Backup compressé en zstd: installer le paquet `zstandard` pour le restaurer")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return zlib.decompress(data)
+
+
+def _codec_of(path: Path) -> str:
+    return path.suffix.lstrip('.')
+
+
+# ============================================
+# ENREGISTREMENTS
+# ============================================
+
+def split_volatile(product: Dict) -> Tuple[Dict, Optional[Dict]]:
+    """Produit sans ses champs volatils, et ces champs à part (None s'il n'y en a pas)"""
+    metadata = product.get('metadata')
+    if not isinstance(metadata, dict) or 'last_updated' not in metadata:
+        return product, None
+    stable = dict(product)
+    stable['metadata'] = {key: value for key, value in metadata.items() if key != 'last_updated'}
+    return stable, {'last_updated': metadata['last_updated']}
+
+
+def merge_volatile(product: Dict, volatile: Optional[Dict]) -> Dict:
+    if volatile:
+        product['metadata'] = dict(product.get('metadata', {}), **volatile)
+    return product
+
+
+def record_bytes(record: Dict) -> bytes:
+    # Ordre des clés conservé: deux produits identiques produisent les mêmes octets
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def record_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class BackupStore:
+    """Snapshots dédupliqués par produit, rétention et ramasse-miettes"""
+
+    def __init__(self, root: Path, codec: Optional[str] = None):
+        self.root = Path(root)
+        self.codec = codec or default_codec()
+        self.packs_dir = self.root / "packs"
+        self.snapshots_dir = self.root / "snapshots"
+        self.index_path = self.root / "index.json"
+        self.index: Dict[str, List] = self._load_index()
+
+    def _load_index(self) -> Dict[str, List]:
+        if not self.index_path.exists():
+            return {}
+        data = json_loads(self.index_path.read_bytes())
+        if data.get('version') != BACKUP_STORE_VERSION:
+            raise RuntimeError(f"Index de backup en version {data.get('version')}, attendu {BACKUP_STORE_VERSION}")
+        return data['records']
+
+    def _save_index(self):
+        write_json_atomic(self.index_path, {'version': BACKUP_STORE_VERSION, 'records': self.index})
+
+    def _write_file(self, path: Path, data: bytes):
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+    def _pack_path(self, pack: str) -> Path:
+        return self.packs_dir / pack
+
+    def _write_pack(self, pack_id: str, records: List[Tuple[str, bytes]]) -> int:
+        """Écrit un pack et indexe ses produits; retourne sa taille compressée"""
+        pack = f"{pack_id}.{self.codec}"
+        content, offset = bytearray(), 0
+        for digest, data in records:
+            self.index[digest] = [pack, offset, len(data)]
+            content += data + b'\n'
+            offset += len(data) + 1
+        compressed = compress(bytes(content), self.codec)
+        self._write_file(self._pack_path(pack), compressed)
+        return len(compressed)
+
+    # ---------- snapshots ----------
+
+    def snapshots(self) -> List[str]:
+        """Identifiants des snapshots, du plus ancien au plus récent"""
+        if not self.snapshots_dir.exists():
+            return []
+        return sorted(path.name.split('.')[0] for path in self.snapshots_dir.glob("*.json.*")
+                      if _codec_of(path) in CODECS)
+
+    def _find_manifest(self, snapshot_id: str) -> Optional[Path]:
+        # Extension exacte: un `.tmp` laissé par une écriture interrompue n'est jamais lu
+        for codec in CODECS:
+            path = self.snapshots_dir / f"{snapshot_id}.json.{codec}"
+            if path.exists():
+                return path
+        return None
+
+    def _manifest_path(self, snapshot_id: str) -> Path:
+        path = self._find_manifest(snapshot_id)
+        if path is None:
+            raise FileNotFoundError(f"Snapshot {snapshot_id} introuvable")
+        return path
+
+    def _new_snapshot_id(self) -> str:
+        """Identifiant horodaté à la microseconde, jamais déjà utilisé par un snapshot ou un pack"""
+        while True:
+            snapshot_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            if not self._snapshot_exists(snapshot_id):
+                return snapshot_id
+
+    def _snapshot_exists(self, snapshot_id: str) -> bool:
+        return self._find_manifest(snapshot_id) is not None or any(
+            self._pack_path(f"{snapshot_id}.{codec}").exists() for codec in CODECS)
+
+    def manifest(self, snapshot_id: str) -> Dict:
+        path = self._manifest_path(snapshot_id)
+        return json_loads(decompress(path.read_bytes(), _codec_of(path)))
+
+    def save_snapshot(self, products: List[Dict], snapshot_id: Optional[str] = None) -> Dict:
+        """Enregistre un snapshot; seuls les produits jamais vus sont écrits"""
+        if snapshot_id is None:
+            snapshot_id = self._new_snapshot_id()
+        elif self._snapshot_exists(snapshot_id):
+            # Réécrire le pack d'un snapshot existant casserait les produits qu'il référence
+            raise FileExistsError(f"Snapshot {snapshot_id} déjà présent")
+        self.packs_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+
+        entries, new_records, pending = [], [], set()
+        for product in products:
+            stable, volatile = split_volatile(product)
+            data = record_bytes(stable)
+            digest = record_hash(data)
+            if digest not in self.index and digest not in pending:
+                pending.add(digest)
+                new_records.append((digest, data))
+            entries.append([digest, volatile] if volatile else [digest])
+
+        pack_bytes = self._write_pack(snapshot_id, new_records) if new_records else 0
+        # L'index avant le manifeste: un manifeste ne référence jamais un produit non indexé
+        self._save_index()
+        manifest = {
+            'version': BACKUP_STORE_VERSION,
+            'snapshot_id': snapshot_id,
+            'created_at': datetime.now().isoformat(),
+            'count': len(entries),
+            'records': entries,
+        }
+        manifest_bytes = compress(record_bytes(manifest), self.codec)
+        self._write_file(self.snapshots_dir / f"{snapshot_id}.json.{self.codec}", manifest_bytes)
+
+        stats = {
+            'snapshot_id': snapshot_id,
+            'products': len(entries),
+            'new_records': len(new_records),
+            'reused_records': len(entries) - len(new_records),
+            'bytes_written': pack_bytes + len(manifest_bytes),
+        }
+        logger.info(f"💾 Snapshot {snapshot_id}: {stats['new_records']} produits nouveaux, "
+                    f"{stats['reused_records']} réutilisés, {stats['bytes_written'] / 1024:.1f} Ko écrits")
+        return stats
+
+    def restore(self, snapshot_id: Optional[str] = None) -> List[Dict]:
+        """Produits d'un snapshot (le plus récent par défaut), dans l'ordre d'origine"""
+        snapshot_id = snapshot_id or self.snapshots()[-1]
+        entries = self.manifest(snapshot_id)['records']
+
+        # Chaque pack nécessaire est décompressé une seule fois
+        packs: Dict[str, bytes] = {}
+        products = []
+        for entry in entries:
+            pack, start, length = self.index[entry[0]]
+            if pack not in packs:
+                packs[pack] = decompress(self._pack_path(pack).read_bytes(), _codec_of(self._pack_path(pack)))
+            product = json_loads(packs[pack][start:start + length])
+            products.append(merge_volatile(product, entry[1] if len(entry) > 1 else None))
+        return products
+
+    # ---------- rétention ----------
+
+    def apply_retention(self, keep_last: int, keep_days: int, now: Optional[datetime] = None) -> List[str]:
+        """Supprime les snapshots hors des `keep_last` derniers et plus vieux que `keep_days` jours"""
+        snapshots = self.snapshots()
+        cutoff = ((now or datetime.now()) - timedelta(days=keep_days)).strftime("%Y%m%d_%H%M%S")
+        recent = set(snapshots[-keep_last:]) if keep_last > 0 else set()
+        removed = [snapshot for snapshot in snapshots if snapshot not in recent and snapshot < cutoff]
+        for snapshot in removed:
+            self._manifest_path(snapshot).unlink()
+        if removed:
+            logger.info(f"🗑️ Rétention: {len(removed)} snapshot(s) supprimé(s)")
+        return removed
+
+    def gc(self) -> Dict:
+        """Supprime les produits qui ne sont plus référencés; réécrit les packs en majorité morts"""
+        live: Set[str] = set()
+        for snapshot in self.snapshots():
+            live.update(entry[0] for entry in self.manifest(snapshot)['records'])
+
+        by_pack: Dict[str, List[str]] = {}
+        for digest, (pack, _, _) in self.index.items():
+            by_pack.setdefault(pack, []).append(digest)
+
+        removed_packs, repacked, dead = 0, 0, 0
+        for pack, digests in by_pack.items():
+            live_digests = [digest for digest in digests if digest in live]
+            dead += len(digests) - len(live_digests)
+            if len(live_digests) == len(digests):
+                continue
+            if live_digests and len(live_digests) / len(digests) >= REPACK_THRESHOLD:
+                for digest in digests:
+                    if digest not in live:
+                        del self.index[digest]
+                continue
+
+            path = self._pack_path(pack)
+            if live_digests:
+                content = decompress(path.read_bytes(), _codec_of(path))
+                records = [(digest, content[self.index[digest][1]:self.index[digest][1] + self.index[digest][2]])
+                           for digest in live_digests]
+                self._write_pack(f"{path.name.split('.')[0]}_gc{datetime.now():%Y%m%d%H%M%S}", records)
+                repacked += 1
+            for digest in digests:
+                if digest not in live:
+                    del self.index[digest]
+            self._save_index()
+            path.unlink()
+            removed_packs += 1
+
+        self._save_index()
+        # Packs orphelins (run interrompu avant l'écriture de l'index)
+        referenced = {pack for pack, _, _ in self.index.values()}
+        for path in self.packs_dir.glob("*") if self.packs_dir.exists() else []:
+            if path.name not in referenced:
+                path.unlink()
+
+        stats = {'dead_records': dead, 'removed_packs': removed_packs, 'repacked': repacked}
+        if dead:
+            logger.info(f"🧹 GC backups: {dead} produits libérés, {removed_packs} pack(s) supprimé(s), "
+                        f"{repacked} réécrit(s)")
+        return stats
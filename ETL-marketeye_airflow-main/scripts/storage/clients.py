@@ -0,0 +1,276 @@
+# scripts/storage/clients.py
+"""
+Clients de stockage partagés par processus worker.
+
+Un moteur SQLAlchemy (pool de connexions) et un MongoClient par connexion Airflow et par
+processus: les tâches d'un même worker réutilisent les connexions ouvertes au lieu d'en
+recréer à chaque run. Les paramètres viennent des connexions Airflow (`marketeye_postgres`,
+`marketeye_mongo`), sinon de la configuration (`get_config()`: variables d'environnement et
+Variable Airflow `marketeye_config`). L'attente d'une connexion libre et l'occupation des
+pools sont mesurées (voir `pool_stats`).
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from config.pipeline_config import get_config
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_clients: Dict[tuple, object] = {}
+_metrics: Dict[str, 'PoolMetrics'] = {}
+
+
+class PoolMetrics:
+    """Compteurs d'un pool: connexions prêtées/ouvertes, attente, occupation maximale"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.in_use = 0
+        self.in_use_max = 0
+        self.wait_seconds = 0.0
+        self.wait_seconds_max = 0.0
+
+    def waited(self, seconds: float):
+        with self._lock:
+            self.wait_seconds += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def checked_out(self):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.in_use_max = max(self.in_use_max, self.in_use)
+
+    def connected(self):
+        with self._lock:
+            self.connects += 1
+
+    def checked_in(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def to_dict(self) -> Dict:
+        return {
+            'checkouts': self.checkouts,
+            'connects': self.connects,
+            'in_use': self.in_use,
+            'in_use_max': self.in_use_max,
+            'wait_seconds_total': round(self.wait_seconds, 4),
+            'wait_seconds_max': round(self.wait_seconds_max, 4),
+        }
+
+
+def _metrics_for(name: str) -> PoolMetrics:
+    if name not in _metrics:
+        _metrics[name] = PoolMetrics()
+    return _metrics[name]
+
+
+def _airflow_connection(conn_id: str):
+    """Connexion Airflow `conn_id`, None hors Airflow ou si elle n'est pas définie"""
+    try:
+        from airflow.hooks.base import BaseHook
+        return BaseHook.get_connection(conn_id)
+    except Exception:
+        return None
+
+
+# ============================================
+# POSTGRESQL
+# ============================================
+
+def postgres_url(conn_id: Optional[str] = None) -> str:
+    config = get_config()
+    connection = _airflow_connection(conn_id or config.POSTGRES_CONN_ID)
+    if connection is None:
+        return config.POSTGRES_DEFAULT_URL
+    # Les connexions Airflow utilisent le schéma 'postgres', SQLAlchemy attend 'postgresql'
+    uri = connection.get_uri()
+    return 'postgresql' + uri[len('postgres'):] if uri.startswith('postgres://') else uri
+
+
+def _ensure_database(url: str):
+    """Crée la base cible si elle n'existe pas (via la base d'administration 'postgres')"""
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.pool import NullPool
+
+    target = make_url(url)
+    admin = create_engine(target.set(database='postgres'), poolclass=NullPool, isolation_level='AUTOCOMMIT',
+                          connect_args={'connect_timeout': get_config().DB_CONNECT_TIMEOUT})
+    try:
+        with admin.connect() as conn:
+            exists = conn.execute(text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                                  {'name': target.database}).scalar()
+            if not exists:
+                conn.execute(text(f'CREATE DATABASE "{target.database}"'))
+                logger.info(f"✅ Base de données {target.database} créée")
+    finally:
+        admin.dispose()
+
+
+def _instrumented_pool(metrics: PoolMetrics):
+    """QueuePool qui mesure le temps d'attente d'une connexion libre"""
+    from sqlalchemy.pool import QueuePool
+
+    class InstrumentedQueuePool(QueuePool):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                metrics.waited(time.perf_counter() - start)
+
+    return InstrumentedQueuePool
+
+
+def get_postgres_engine(conn_id: Optional[str] = None):
+    """Moteur SQLAlchemy partagé du processus (pool configuré, pre-ping, base créée si besoin)"""
+    config = get_config()
+    conn_id = conn_id or config.POSTGRES_CONN_ID
+    key = ('postgres', conn_id, os.getpid())
+    with _lock:
+        if key in _clients:
+            return _clients[key]
+
+        from sqlalchemy import create_engine, event
+
+        url = postgres_url(conn_id)
+        _ensure_database(url)
+        metrics = _metrics_for(f"postgres.{conn_id}")
+        engine = create_engine(
+            url,
+            poolclass=_instrumented_pool(metrics),
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+            pool_pre_ping=config.DB_POOL_PRE_PING,
+            connect_args={'connect_timeout': config.DB_CONNECT_TIMEOUT},
+        )
+        event.listen(engine, 'connect', lambda *args: metrics.connected())
+        event.listen(engine, 'checkout', lambda *args: metrics.checked_out())
+        event.listen(engine, 'checkin', lambda *args: metrics.checked_in())
+        _clients[key] = engine
+        logger.info(f"🔌 Pool PostgreSQL {conn_id}: {config.DB_POOL_SIZE} connexions (+{config.DB_MAX_OVERFLOW})")
+        return engine
+
+
+# ============================================
+# MONGODB
+# ============================================
+
+def mongo_uri(conn_id: Optional[str] = None) -> str:
+    config = get_config()
+    connection = _airflow_connection(conn_id or config.MONGO_CONN_ID)
+    if connection is None:
+        return config.MONGO_DEFAULT_URI
+    # Type de connexion Airflow 'mongo': schéma 'mongo://' à convertir
+    uri = connection.get_uri()
+    return 'mongodb' + uri[len('mongo'):] if uri.startswith('mongo://') else uri
+
+
+def _mongo_listener(metrics: PoolMetrics):
+    """Écouteur pymongo: attente et occupation du pool de connexions"""
+    from pymongo import monitoring
+
+    class PoolListener(monitoring.ConnectionPoolListener):
+        def __init__(self):
+            self._started: Dict[int, float] = {}
+
+        def connection_check_out_started(self, event):
+            self._started[threading.get_ident()] = time.perf_counter()
+
+        def connection_checked_out(self, event):
+            start = self._started.pop(threading.get_ident(), None)
+            if start is not None:
+                metrics.waited(time.perf_counter() - start)
+            metrics.checked_out()
+
+        def connection_check_out_failed(self, event):
+            self._started.pop(threading.get_ident(), None)
+
+        def connection_checked_in(self, event):
+            metrics.checked_in()
+
+        def connection_created(self, event):
+            metrics.connected()
+
+        # Événements sans intérêt ici (pymongo exige toutes les méthodes)
+        def pool_created(self, event):
+            pass
+
+        def pool_ready(self, event):
+            pass
+
+        def pool_cleared(self, event):
+            pass
+
+        def pool_closed(self, event):
+            pass
+
+        def connection_ready(self, event):
+            pass
+
+        def connection_closed(self, event):
+            pass
+
+    return PoolListener()
+
+
+def get_mongo_client(conn_id: Optional[str] = None):
+    """MongoClient partagé du processus (pool et délais configurés)"""
+    config = get_config()
+    conn_id = conn_id or config.MONGO_CONN_ID
+    key = ('mongo', conn_id, os.getpid())
+    with _lock:
+        if key in _clients:
+            return _clients[key]
+
+        from pymongo import MongoClient
+
+        metrics = _metrics_for(f"mongo.{conn_id}")
+        client = MongoClient(
+            mongo_uri(conn_id),
+            maxPoolSize=config.MONGO_MAX_POOL_SIZE,
+            connectTimeoutMS=config.MONGO_TIMEOUT_MS,
+            serverSelectionTimeoutMS=config.MONGO_TIMEOUT_MS,
+            waitQueueTimeoutMS=config.MONGO_TIMEOUT_MS,
+            event_listeners=[_mongo_listener(metrics)],
+        )
+        _clients[key] = client
+        logger.info(f"🔌 Client MongoDB {conn_id}: pool de {config.MONGO_MAX_POOL_SIZE} connexions")
+        return client
+
+
+# ============================================
+# MÉTRIQUES ET FERMETURE
+# ============================================
+
+def pool_stats(name: Optional[str] = None) -> Dict:
+    """Métriques des pools du processus (tous, ou celui nommé 'postgres.<conn_id>' / 'mongo.<conn_id>')"""
+    if name is not None:
+        return _metrics_for(name).to_dict()
+    return {pool: metrics.to_dict() for pool, metrics in _metrics.items()}
+
+
+def dispose_clients():
+    """Ferme les pools ouverts par ce processus"""
+    pid = os.getpid()
+    with _lock:
+        for key in [key for key in _clients if key[2] == pid]:
+            client = _clients.pop(key)
+            if key[0] == 'postgres':
+                client.dispose()
+            else:
+                client.close()
+
+
+atexit.register(dispose_clients)
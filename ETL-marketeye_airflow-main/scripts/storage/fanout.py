@@ -0,0 +1,57 @@
+# scripts/storage/fanout.py
+"""
+Écriture parallèle du catalogue vers plusieurs destinations (PostgreSQL, MongoDB, backup).
+
+Le jeu de données final est décodé une seule fois (DatasetReader partagé) puis chaque
+destination s'exécute dans son propre pool de threads: une destination lente ou en échec
+n'empêche pas les autres de terminer. Le résultat donne, par destination, le statut, la
+durée et le retour de la fonction (ou l'erreur).
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+Sink = Callable[[object], Dict]
+
+
+def _timed(name: str, sink: Sink, reader) -> Dict:
+    start = time.perf_counter()
+    try:
+        result = sink(reader)
+        status = {'status': 'success', 'result': result}
+    except Exception as e:
+        logger.error(f"❌ Destination {name} en échec: {e}")
+        status = {'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+    status['seconds'] = round(time.perf_counter() - start, 3)
+    return status
+
+
+def run_sinks(sinks: Dict[str, Sink], reader, timeout: Optional[float] = None) -> Dict[str, Dict]:
+    """Exécute chaque destination `sink(reader)` en parallèle, chacune dans son pool"""
+    executors = {name: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sink-{name}") for name in sinks}
+    try:
+        futures = {name: executors[name].submit(_timed, name, sink, reader) for name, sink in sinks.items()}
+        deadline = time.monotonic() + timeout if timeout else None
+        results = {}
+        for name, future in futures.items():
+            try:
+                remaining = max(0.0, deadline - time.monotonic()) if deadline else None
+                results[name] = future.result(timeout=remaining)
+            except FutureTimeout:
+                # Délai dépassé: la destination est signalée en échec, les autres résultats sont gardés.
+                # Un thread ne s'interrompt pas: une destination démarrée va au bout de son écriture
+                # (transaction ou fichiers sous verrou), et le processus l'attend avant de se terminer
+                if future.cancel():
+                    logger.warning(f"⚠️ {name}: délai de {timeout}s dépassé avant le démarrage, annulée")
+                else:
+                    logger.warning(f"⚠️ {name}: délai de {timeout}s dépassé, l'écriture continue en arrière-plan "
+                                   f"et son résultat sera ignoré")
+                results[name] = {'status': 'failed', 'error': f"Délai de {timeout}s dépassé", 'seconds': timeout}
+            logger.info(f"⏱️ {name}: {results[name]['status']} en {results[name]['seconds']}s")
+        return results
+    finally:
+        for executor in executors.values():
+            executor.shutdown(wait=False)
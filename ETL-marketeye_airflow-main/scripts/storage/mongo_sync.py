@@ -0,0 +1,106 @@
+# scripts/storage/mongo_sync.py
+"""
+Synchronisation incrémentale des produits dans MongoDB.
+
+Les produits sont envoyés par lots de `ReplaceOne(upsert=True)` (bulk_write, ordered=False)
+sur la clé unique `product_id`, puis une passe de différence supprime les documents des
+produits disparus. La collection n'est jamais vidée: les lecteurs voient toujours un
+catalogue complet. Un lot interrompu par une erreur réseau est renvoyé tel quel (les
+remplacements sont idempotents).
+"""
+import logging
+import time
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+MONGO_BATCH_SIZE = 1000
+MONGO_MAX_RETRIES = 3
+MONGO_RETRY_DELAY = 2.0  # secondes, doublé à chaque tentative
+
+# Index créés avant le chargement (create_index est idempotent)
+PRODUCT_INDEXES = [
+    ([("product_id", 1)], {'unique': True}),
+    ([("brand", 1)], {}),
+    ([("offers.price", 1)], {}),
+]
+
+
+class MongoBulkSync:
+    """Upsert par lots des produits et suppression des produits disparus"""
+
+    def __init__(self, collection, batch_size: int = MONGO_BATCH_SIZE,
+                 max_retries: int = MONGO_MAX_RETRIES, retry_delay: float = MONGO_RETRY_DELAY):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.retries = 0
+
+    def _write_batch(self, operations: List) -> Dict[str, int]:
+        from pymongo.errors import BulkWriteError, ConnectionFailure
+
+        attempt = 0
+        while True:
+            try:
+                result = self.collection.bulk_write(operations, ordered=False)
+                return {'matched': result.matched_count, 'modified': result.modified_count,
+                        'upserted': result.upserted_count}
+            except ConnectionFailure as e:
+                # AutoReconnect, NetworkTimeout...: le lot entier peut être rejoué
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                self.retries += 1
+                delay = self.retry_delay * 2 ** (attempt - 1)
+                logger.warning(f"⚠️ MongoDB: lot interrompu ({e}), nouvel essai {attempt}/{self.max_retries} "
+                               f"dans {delay:.0f}s")
+                time.sleep(delay)
+            except BulkWriteError as e:
+                errors = e.details.get('writeErrors', [])
+                logger.error(f"❌ MongoDB: {len(errors)} écritures rejetées, ex: {errors[:3]}")
+                raise
+
+    def _delete_missing(self, product_ids: set) -> int:
+        """Supprime les produits absents du catalogue courant"""
+        stale = [document['product_id'] for document in
+                 self.collection.find({}, {'product_id': 1, '_id': 0})
+                 if document.get('product_id') not in product_ids]
+        for start in range(0, len(stale), self.batch_size):
+            self.collection.delete_many({'product_id': {'$in': stale[start:start + self.batch_size]}})
+        return len(stale)
+
+    def sync(self, products: Iterable[Dict]) -> Dict[str, int]:
+        """Synchronise la collection avec `products`; retourne les compteurs du chargement"""
+        from pymongo import ReplaceOne
+
+        start = time.perf_counter()
+        for keys, options in PRODUCT_INDEXES:
+            self.collection.create_index(keys, **options)
+
+        totals = {'matched': 0, 'modified': 0, 'upserted': 0, 'batches': 0}
+        product_ids = set()
+        operations = []
+        for product in products:
+            product_id = product.get('product_id')
+            if not product_id or product_id in product_ids:
+                continue
+            product_ids.add(product_id)
+            operations.append(ReplaceOne({'product_id': product_id}, product, upsert=True))
+            if len(operations) == self.batch_size:
+                for name, count in self._write_batch(operations).items():
+                    totals[name] += count
+                totals['batches'] += 1
+                operations = []
+        if operations:
+            for name, count in self._write_batch(operations).items():
+                totals[name] += count
+            totals['batches'] += 1
+
+        totals['deleted'] = self._delete_missing(product_ids)
+        totals['products'] = len(product_ids)
+        totals['retries'] = self.retries
+        logger.info(f"🍃 MongoDB: {totals['upserted']} ajoutés, {totals['modified']} modifiés, "
+                    f"{totals['deleted']} supprimés en {totals['batches']} lots "
+                    f"({time.perf_counter() - start:.2f}s)")
+        return totals
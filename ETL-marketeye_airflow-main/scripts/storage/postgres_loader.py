@@ -0,0 +1,240 @@
+# scripts/storage/postgres_loader.py
+"""
+Chargement en masse du catalogue dans PostgreSQL.
+
+Les lignes sont envoyées par lots via `COPY ... FROM STDIN` dans des tables de staging,
+les index sont construits après le chargement, puis les tables de staging remplacent les
+tables en service dans la même transaction: les lecteurs voient l'ancien catalogue ou le
+nouveau, jamais une table vide ou à moitié chargée. Les index existants sont recréés à
+l'identique (définitions lues dans pg_indexes).
+"""
+import hashlib
+import io
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+COPY_BATCH_ROWS = 50_000
+STAGING_SUFFIX = '_staging'
+# Verrou consultatif des écritures du catalogue (tables de staging et upserts partagés par les runs)
+CATALOGUE_LOCK_KEY = 0x4D45_4341  # 'MECA'
+
+# Schéma des tables du catalogue: (colonne, type)
+TABLES: Dict[str, List[Tuple[str, str]]] = {
+    'products': [
+        ('product_id', 'TEXT'),
+        ('brand', 'TEXT'),
+        ('model', 'TEXT'),
+        ('product_name', 'TEXT'),
+        ('specifications', 'TEXT'),
+        ('row_hash', 'TEXT'),
+        ('created_at', 'TIMESTAMP'),
+        ('updated_at', 'TIMESTAMP'),
+        ('deleted_at', 'TIMESTAMP'),
+    ],
+    'offers': [
+        ('offer_key', 'TEXT'),
+        ('product_id', 'TEXT'),
+        ('source', 'TEXT'),
+        ('price', 'DOUBLE PRECISION'),
+        ('currency', 'TEXT'),
+        ('condition', 'TEXT'),
+        ('seller_type', 'TEXT'),
+        ('url', 'TEXT'),
+        ('scraped_at', 'TEXT'),
+        ('row_hash', 'TEXT'),
+        ('created_at', 'TIMESTAMP'),
+        ('updated_at', 'TIMESTAMP'),
+        ('deleted_at', 'TIMESTAMP'),
+    ],
+}
+
+# Clé unique de chaque table (cible des upserts)
+KEY_COLUMNS = {'products': 'product_id', 'offers': 'offer_key'}
+
+# Index créés au premier chargement (ensuite, ceux de la table en service font foi)
+DEFAULT_INDEXES: Dict[str, List[Tuple[str, str]]] = {
+    'products': [
+        ('uq_products_product_id', 'CREATE UNIQUE INDEX uq_products_product_id ON products (product_id)'),
+        ('idx_products_brand', 'CREATE INDEX idx_products_brand ON products (brand)'),
+    ],
+    'offers': [
+        ('uq_offers_offer_key', 'CREATE UNIQUE INDEX uq_offers_offer_key ON offers (offer_key)'),
+        ('idx_offers_product_id', 'CREATE INDEX idx_offers_product_id ON offers (product_id)'),
+        ('idx_offers_source', 'CREATE INDEX idx_offers_source ON offers (source)'),
+        ('idx_offers_price', 'CREATE INDEX idx_offers_price ON offers (price)'),
+    ],
+}
+
+_INDEX_DEF = re.compile(r'^CREATE (UNIQUE )?INDEX (\S+) ON (?:ONLY )?(\S+) (.*)$', re.IGNORECASE)
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def copy_value(value) -> str:
+    """Valeur au format texte de COPY (\\N pour NULL, séparateurs échappés)"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    if isinstance(value, float) and value != value:
+        return 'NaN'
+    return str(value)
+
+
+def copy_batches(rows: Iterable[Sequence], batch_rows: int = COPY_BATCH_ROWS) -> Iterable[Tuple[io.StringIO, int]]:
+    """Lots de lignes encodées pour COPY (tampon texte, nombre de lignes)"""
+    buffer, count = io.StringIO(), 0
+    for row in rows:
+        buffer.write('\t'.join(copy_value(value) for value in row))
+        buffer.write('\n')
+        count += 1
+        if count == batch_rows:
+            buffer.seek(0)
+            yield buffer, count
+            buffer, count = io.StringIO(), 0
+    if count:
+        buffer.seek(0)
+        yield buffer, count
+
+
+def row_hash(values: Iterable) -> str:
+    """Empreinte des valeurs d'une ligne (détection des lignes modifiées)"""
+    return hashlib.blake2b('\x1f'.join(copy_value(value) for value in values).encode('utf-8'),
+                           digest_size=16).hexdigest()
+
+
+def offer_row_key(product_id, source, url) -> str:
+    """Clé d'une offre en base: empreinte de (product_id, source, url)"""
+    return row_hash((product_id, source, url))
+
+
+def catalogue_rows(reader, now: datetime) -> Dict[str, Iterable[Tuple]]:
+    """Lignes des tables products et offers (dans l'ordre de TABLES) depuis un DatasetReader"""
+    products = reader.columns('products', ['product_id', 'brand', 'model', 'product_name', 'specifications'])
+    offers = reader.columns(
+        'offers', ['product_id', 'source', 'price', 'currency', 'condition', 'seller_type', 'url', 'scraped_at']
+    )
+
+    def product_rows():
+        for product_id, brand, model, name, specifications in zip(
+                products['product_id'], products['brand'], products['model'],
+                products['product_name'], products['specifications']):
+            values = (product_id, brand, model, name, specifications if specifications is not None else '{}')
+            yield values + (row_hash(values), now, now, None)
+
+    def offer_rows():
+        for product_id, source, price, currency, condition, seller_type, url, scraped_at in zip(
+                offers['product_id'], offers['source'], offers['price'], offers['currency'],
+                offers['condition'], offers['seller_type'], offers['url'], offers['scraped_at']):
+            # scraped_at hors du hash: une offre seulement re-scrapée n'est pas modifiée
+            values = (product_id, source, price, currency if currency is not None else 'MAD',
+                      condition, seller_type, url)
+            key = offer_row_key(product_id, source, url)
+            yield (key,) + values + (scraped_at, row_hash(values), now, now, None)
+
+    return {'products': product_rows(), 'offers': offer_rows()}
+
+
+def lock_catalogue(cursor):
+    """Sérialise les chargements concurrents (backfills) jusqu'à la fin de la transaction"""
+    cursor.execute("SELECT pg_advisory_xact_lock(%s)", (CATALOGUE_LOCK_KEY,))
+
+
+def _staging_index(definition: str, staging_table: str) -> Tuple[str, str]:
+    """Définition d'index réécrite pour la table de staging (nom temporaire, table cible)"""
+    match = _INDEX_DEF.match(definition.strip())
+    if not match:
+        raise ValueError(f"Définition d'index non reconnue: {definition}")
+    unique, name, _, rest = match.groups()
+    name = name.split('.')[-1]
+    return name, f"CREATE {unique or ''}INDEX {name}{STAGING_SUFFIX} ON {staging_table} {rest}"
+
+
+class PostgresBulkLoader:
+    """Remplace des tables par COPY dans des tables de staging puis échange atomique"""
+
+    def __init__(self, engine, batch_rows: int = COPY_BATCH_ROWS):
+        self.engine = engine
+        self.batch_rows = batch_rows
+
+    def _index_definitions(self, cursor, table: str) -> List[Tuple[str, str]]:
+        """Index de la table en service, ou index par défaut si elle n'existe pas encore"""
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = %s ORDER BY indexname",
+            (table,)
+        )
+        existing = cursor.fetchall()
+        if not existing:
+            return DEFAULT_INDEXES.get(table, [])
+        # L'index unique de la clé sert aux upserts: toujours présent
+        names = {name for name, _ in existing}
+        key_index = DEFAULT_INDEXES[table][0]
+        return existing if key_index[0] in names else [key_index] + list(existing)
+
+    def _load_staging(self, cursor, table: str, rows: Iterable[Sequence]) -> int:
+        staging = f"{table}{STAGING_SUFFIX}"
+        columns = TABLES[table]
+        cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        cursor.execute(f"CREATE TABLE {staging} ({', '.join(f'{name} {kind}' for name, kind in columns)})")
+
+        copy_sql = f"COPY {staging} ({', '.join(name for name, _ in columns)}) FROM STDIN"
+        total = 0
+        for buffer, count in copy_batches(rows, self.batch_rows):
+            cursor.copy_expert(copy_sql, buffer)
+            total += count
+        return total
+
+    def load(self, tables: Dict[str, Iterable[Sequence]]) -> Dict[str, Dict]:
+        """
+        Charge chaque table ({nom: lignes dans l'ordre des colonnes de TABLES}) puis les
+        échange toutes ensemble. Retourne lignes, durée et débit par table.
+        """
+        results: Dict[str, Dict] = {}
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            lock_catalogue(cursor)
+            indexes: Dict[str, List[Tuple[str, str]]] = {}
+
+            for table, rows in tables.items():
+                start = time.perf_counter()
+                count = self._load_staging(cursor, table, rows)
+                copy_time = time.perf_counter() - start
+
+                # Index construits en une fois sur la table remplie (plus rapide qu'au fil des insertions)
+                indexes[table] = []
+                for _, definition in self._index_definitions(cursor, table):
+                    name, staging_definition = _staging_index(definition, f"{table}{STAGING_SUFFIX}")
+                    cursor.execute(staging_definition)
+                    indexes[table].append(name)
+                cursor.execute(f"ANALYZE {table}{STAGING_SUFFIX}")
+
+                elapsed = time.perf_counter() - start
+                results[table] = {
+                    'rows': count,
+                    'seconds': round(elapsed, 3),
+                    'rows_per_sec': round(count / copy_time) if copy_time > 0 else count,
+                }
+                logger.info(f"📥 {table}: {count} lignes copiées en {copy_time:.2f}s "
+                            f"({results[table]['rows_per_sec']} lignes/s), index en {elapsed - copy_time:.2f}s")
+
+            # Échange: les anciennes tables (et leurs index) disparaissent au commit
+            for table, index_names in indexes.items():
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                cursor.execute(f"ALTER TABLE {table}{STAGING_SUFFIX} RENAME TO {table}")
+                for name in index_names:
+                    cursor.execute(f"ALTER INDEX {name}{STAGING_SUFFIX} RENAME TO {name}")
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+        logger.info(f"🔁 Tables échangées: {', '.join(results)}")
+        return results
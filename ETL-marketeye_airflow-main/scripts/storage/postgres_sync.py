@@ -0,0 +1,130 @@
+# scripts/storage/postgres_sync.py
+"""
+Synchronisation incrémentale du catalogue dans PostgreSQL.
+
+Chaque ligne porte une clé (product_id, offer_key) et un hash de ses valeurs. Les hash en
+base sont lus une fois, seules les lignes nouvelles ou modifiées sont copiées (COPY) dans
+une table temporaire puis upsertées avec `INSERT ... ON CONFLICT`; les lignes disparues
+sont marquées `deleted_at`. Le volume écrit suit donc le changement quotidien, pas la taille
+du catalogue, et `created_at` reste celui de la première insertion.
+
+Mémoire: la comparaison se fait côté worker. La clé et le hash de chaque ligne en base sont
+gardés en mémoire pendant la synchronisation d'une table (environ 260 octets par ligne, soit
+~260 Mo pour un million d'offres), plus les clés des lignes du run et les lignes modifiées.
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .postgres_loader import COPY_BATCH_ROWS, DEFAULT_INDEXES, KEY_COLUMNS, TABLES, copy_batches, lock_catalogue
+
+logger = logging.getLogger(__name__)
+
+SOFT_DELETE_BATCH = 10_000
+
+
+class PostgresUpsertSync:
+    """Upsert des lignes modifiées et suppression logique des lignes disparues"""
+
+    def __init__(self, engine, batch_rows: int = COPY_BATCH_ROWS):
+        self.engine = engine
+        self.batch_rows = batch_rows
+
+    def _ensure_table(self, cursor, table: str):
+        """Crée la table ou ajoute les colonnes manquantes (tables issues du mode 'replace')"""
+        columns = TABLES[table]
+        key = KEY_COLUMNS[table]
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} "
+                       f"({', '.join(f'{name} {kind}' for name, kind in columns)})")
+        for name, kind in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {name} {kind}")
+        # Lignes chargées avant l'existence de la clé: remplacées par ce chargement
+        cursor.execute(f"DELETE FROM {table} WHERE {key} IS NULL")
+        if cursor.rowcount:
+            logger.info(f"🧹 {table}: {cursor.rowcount} lignes sans clé supprimées")
+        for _, definition in DEFAULT_INDEXES[table]:
+            cursor.execute(definition.replace('INDEX ', 'INDEX IF NOT EXISTS ', 1))
+
+    def _existing_hashes(self, cursor, table: str) -> Dict[str, Tuple[str, bool]]:
+        """{clé: (hash, supprimée)} de toutes les lignes en base (O(lignes) en mémoire)"""
+        cursor.execute(f"SELECT {KEY_COLUMNS[table]}, row_hash, deleted_at IS NOT NULL FROM {table}")
+        return {key: (hash_value, deleted) for key, hash_value, deleted in cursor.fetchall()}
+
+    def _upsert(self, cursor, table: str, rows: List[Sequence]) -> Tuple[int, int]:
+        """Upsert via une table temporaire remplie par COPY; retourne (insérées, mises à jour)"""
+        names = [name for name, _ in TABLES[table]]
+        key = KEY_COLUMNS[table]
+        temp = f"{table}_changes"
+        cursor.execute(f"CREATE TEMP TABLE {temp} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+        copy_sql = f"COPY {temp} ({', '.join(names)}) FROM STDIN"
+        for buffer, _ in copy_batches(rows, self.batch_rows):
+            cursor.copy_expert(copy_sql, buffer)
+
+        # created_at n'est jamais écrasé: il garde la date de première insertion
+        updates = ', '.join(f"{name} = EXCLUDED.{name}" for name in names if name not in (key, 'created_at'))
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(names)}) SELECT {', '.join(names)} FROM {temp} "
+            f"ON CONFLICT ({key}) DO UPDATE SET {updates} "
+            f"RETURNING (xmax = 0)"
+        )
+        inserted = sum(1 for (is_insert,) in cursor.fetchall() if is_insert)
+        return inserted, len(rows) - inserted
+
+    def _soft_delete(self, cursor, table: str, keys: List[str], now: datetime) -> int:
+        for start in range(0, len(keys), SOFT_DELETE_BATCH):
+            cursor.execute(
+                f"UPDATE {table} SET deleted_at = %s, updated_at = %s WHERE {KEY_COLUMNS[table]} = ANY(%s)",
+                (now, now, keys[start:start + SOFT_DELETE_BATCH])
+            )
+        return len(keys)
+
+    def sync(self, tables: Dict[str, Iterable[Sequence]], now: datetime) -> Dict[str, Dict]:
+        """
+        Synchronise chaque table ({nom: lignes dans l'ordre de TABLES}) dans une seule
+        transaction. Retourne par table: lignes, insérées, mises à jour, supprimées, inchangées.
+        """
+        results: Dict[str, Dict] = {}
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            lock_catalogue(cursor)
+            for table, rows in tables.items():
+                start = time.perf_counter()
+                names = [name for name, _ in TABLES[table]]
+                key_index, hash_index = names.index(KEY_COLUMNS[table]), names.index('row_hash')
+
+                self._ensure_table(cursor, table)
+                existing = self._existing_hashes(cursor, table)
+
+                changed, seen = [], set()
+                for row in rows:
+                    key = row[key_index]
+                    if key in seen:
+                        continue  # ON CONFLICT ne peut pas toucher deux fois la même ligne
+                    seen.add(key)
+                    previous = existing.get(key)
+                    if previous is None or previous[0] != row[hash_index] or previous[1]:
+                        changed.append(row)
+
+                inserted, updated = self._upsert(cursor, table, changed) if changed else (0, 0)
+                disappeared = [key for key, (_, deleted) in existing.items() if not deleted and key not in seen]
+                deleted = self._soft_delete(cursor, table, disappeared, now)
+
+                results[table] = {
+                    'rows': len(seen),
+                    'inserted': inserted,
+                    'updated': updated,
+                    'deleted': deleted,
+                    'unchanged': len(seen) - len(changed),
+                    'seconds': round(time.perf_counter() - start, 3),
+                }
+                logger.info(f"🔄 {table}: {inserted} insérées, {updated} modifiées, {deleted} supprimées, "
+                            f"{results[table]['unchanged']} inchangées ({results[table]['seconds']}s)")
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+        return results
@@ -0,0 +1,162 @@
+# scripts/storage/price_history.py
+"""
+Historique des prix: une ligne compacte par (offre, date de scraping, prix).
+
+- PostgreSQL: table `price_history` partitionnée par mois sur `scrape_date`, clé primaire
+  (offer_key, scrape_date) et index (product_id, scrape_date): une requête « prix du produit X
+  sur 90 jours » ne lit que trois ou quatre partitions, quelle que soit la taille de l'historique.
+- Fichiers: dataset Parquet partitionné à la Hive (`scrape_date=AAAA-MM-JJ/`), une partition
+  par jour réécrite à chaque run, lu avec élagage des partitions.
+"""
+import logging
+import shutil
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .postgres_loader import COPY_BATCH_ROWS, copy_batches, offer_row_key
+
+logger = logging.getLogger(__name__)
+
+PRICE_HISTORY_COLUMNS = ['offer_key', 'product_id', 'source', 'scrape_date', 'price']
+PARQUET_COMPRESSION = 'zstd'
+
+
+def price_rows(reader, scrape_date: date) -> Iterable[Tuple]:
+    """Lignes (offer_key, product_id, source, scrape_date, price) des offres avec un prix"""
+    offers = reader.columns('offers', ['product_id', 'source', 'url', 'price'])
+    for product_id, source, url, price in zip(offers['product_id'], offers['source'],
+                                              offers['url'], offers['price']):
+        if price is not None and price > 0:
+            yield offer_row_key(product_id, source, url), product_id, source, scrape_date, price
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+# ============================================
+# POSTGRESQL
+# ============================================
+
+class PostgresPriceHistory:
+    """Table price_history partitionnée par mois (partitions créées à la demande)"""
+
+    def __init__(self, engine, batch_rows: int = COPY_BATCH_ROWS):
+        self.engine = engine
+        self.batch_rows = batch_rows
+
+    def _ensure_table(self, cursor, scrape_date: date):
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS price_history ("
+            "offer_key TEXT NOT NULL, product_id TEXT, source TEXT, "
+            "scrape_date DATE NOT NULL, price DOUBLE PRECISION NOT NULL, "
+            "PRIMARY KEY (offer_key, scrape_date)"
+            ") PARTITION BY RANGE (scrape_date)"
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_price_history_product "
+                       "ON price_history (product_id, scrape_date)")
+        start = _month_start(scrape_date)
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS price_history_{start:%Y_%m} PARTITION OF price_history "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{_next_month(start).isoformat()}')"
+        )
+
+    def record(self, rows: Iterable[Tuple], scrape_date: date) -> int:
+        """Enregistre les prix du jour (un second run le même jour remplace les prix)"""
+        start = time.perf_counter()
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            self._ensure_table(cursor, scrape_date)
+            cursor.execute("CREATE TEMP TABLE price_history_day "
+                           "(LIKE price_history INCLUDING DEFAULTS) ON COMMIT DROP")
+            copy_sql = f"COPY price_history_day ({', '.join(PRICE_HISTORY_COLUMNS)}) FROM STDIN"
+            count = 0
+            for buffer, batch in copy_batches(rows, self.batch_rows):
+                cursor.copy_expert(copy_sql, buffer)
+                count += batch
+            # DISTINCT ON: une seule ligne par offre et par jour
+            cursor.execute(
+                f"INSERT INTO price_history ({', '.join(PRICE_HISTORY_COLUMNS)}) "
+                f"SELECT DISTINCT ON (offer_key) {', '.join(PRICE_HISTORY_COLUMNS)} FROM price_history_day "
+                f"ON CONFLICT (offer_key, scrape_date) DO UPDATE SET price = EXCLUDED.price"
+            )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+        logger.info(f"📈 Historique des prix: {count} prix du {scrape_date} en {time.perf_counter() - start:.2f}s")
+        return count
+
+    def product_history(self, product_id: str, days: int = 90) -> List[Tuple]:
+        """(scrape_date, source, offer_key, price) d'un produit sur les `days` derniers jours"""
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(
+                "SELECT scrape_date, source, offer_key, price FROM price_history "
+                "WHERE product_id = %s AND scrape_date >= CURRENT_DATE - %s "
+                "ORDER BY scrape_date, source",
+                (product_id, days)
+            )
+            return cursor.fetchall()
+        finally:
+            connection.close()
+
+
+# ============================================
+# PARQUET (CHEMIN FICHIERS)
+# ============================================
+
+def write_price_history_parquet(rows: Iterable[Tuple], root: Path, scrape_date: date) -> Path:
+    """Écrit (ou remplace) la partition du jour: <root>/scrape_date=AAAA-MM-JJ/part-0.parquet"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns: Dict[str, List] = {'offer_key': [], 'product_id': [], 'source': [], 'price': []}
+    for offer_key, product_id, source, _, price in rows:
+        columns['offer_key'].append(offer_key)
+        columns['product_id'].append(product_id)
+        columns['source'].append(source)
+        columns['price'].append(price)
+    table = pa.table({
+        'offer_key': pa.array(columns['offer_key'], pa.string()),
+        'product_id': pa.array(columns['product_id'], pa.string()),
+        'source': pa.array(columns['source'], pa.string()).dictionary_encode(),
+        'price': pa.array(columns['price'], pa.float64()),
+    })
+    # Trié par produit: les statistiques de row group permettent de sauter les blocs non concernés
+    table = table.sort_by([('product_id', 'ascending'), ('offer_key', 'ascending')])
+
+    partition = Path(root) / f"scrape_date={scrape_date.isoformat()}"
+    # Préfixe '.': ignoré par les lecteurs tant que la partition n'est pas complète
+    tmp_partition = partition.with_name(f".{partition.name}.tmp")
+    if tmp_partition.exists():
+        shutil.rmtree(tmp_partition)
+    tmp_partition.mkdir(parents=True)
+    pq.write_table(table, tmp_partition / "part-0.parquet", compression=PARQUET_COMPRESSION)
+    if partition.exists():
+        shutil.rmtree(partition)
+    tmp_partition.rename(partition)
+    logger.info(f"📈 Historique Parquet: {table.num_rows} prix dans {partition.name}")
+    return partition
+
+
+def read_price_history_parquet(root: Path, product_id: str, days: int = 90, today: Optional[date] = None):
+    """Historique d'un produit (table Arrow): seules les partitions des `days` derniers jours sont lues"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    since = (today or date.today()) - timedelta(days=days)
+    dataset = ds.dataset(str(root), format='parquet',
+                         partitioning=ds.partitioning(pa.schema([('scrape_date', pa.date32())]), flavor='hive'))
+    table = dataset.to_table(filter=(ds.field('scrape_date') >= since) & (ds.field('product_id') == product_id))
+    return table.sort_by([('scrape_date', 'ascending'), ('offer_key', 'ascending')])